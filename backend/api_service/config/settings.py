@@ -20,6 +20,12 @@ class Settings:
     # -------------------- Database --------------------
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
 
+    # Apply pending migrations at startup (local dev); deploys run
+    # `python migration.py` once instead and startup only checks
+    DB_MIGRATE_ON_STARTUP: bool = (
+        os.getenv("DB_MIGRATE_ON_STARTUP", "True").lower() == "true"
+    )
+
     # -------------------- Redis -----------------------
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
@@ -35,6 +41,23 @@ class Settings:
     RABBITMQ_PORT: int = int(os.getenv("RABBITMQ_PORT", "5672"))
     RABBITMQ_USER: str = os.getenv("RABBITMQ_USER", "guest")
     RABBITMQ_PASSWORD: str = os.getenv("RABBITMQ_PASSWORD", "guest")
+    # Publisher channels kept open and reused across publishes
+    RABBITMQ_CHANNEL_POOL_SIZE: int = int(
+        os.getenv("RABBITMQ_CHANNEL_POOL_SIZE", "8")
+    )
+    # Max publishes in flight per channel while waiting for confirms
+    RABBITMQ_CONFIRM_BATCH: int = int(os.getenv("RABBITMQ_CONFIRM_BATCH", "256"))
+
+    # Batched consumers (utils/consumer.py)
+    CONSUMER_BATCH_SIZE: int = int(os.getenv("CONSUMER_BATCH_SIZE", "500"))
+    CONSUMER_BATCH_TIMEOUT: float = float(os.getenv("CONSUMER_BATCH_TIMEOUT", "0.2"))
+    CONSUMER_CONCURRENCY: int = int(os.getenv("CONSUMER_CONCURRENCY", "4"))
+
+    # -------------------- Outbox ----------------------
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+    OUTBOX_POLL_INTERVAL: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0"))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+    OUTBOX_BACKOFF_BASE: float = float(os.getenv("OUTBOX_BACKOFF_BASE", "2"))
 
     # -------------------- JWT -------------------------
     SECRET_KEY: str = os.getenv(
@@ -50,6 +73,38 @@ class Settings:
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
     )
 
+    # Verified-token cache (entries expire at the token's own exp)
+    JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+    JWT_CACHE_SHARED: bool = (
+        os.getenv("JWT_CACHE_SHARED", "False").lower() == "true"
+    )
+
+    # Revoked-token bloom filter (per worker, synced from Redis)
+    REVOCATION_BLOOM_CAPACITY: int = int(
+        os.getenv("REVOCATION_BLOOM_CAPACITY", "100000")
+    )
+    REVOCATION_BLOOM_ERROR_RATE: float = float(
+        os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001")
+    )
+    REVOCATION_BLOOM_REBUILD_SECONDS: int = int(
+        os.getenv("REVOCATION_BLOOM_REBUILD_SECONDS", "900")
+    )
+
+    # -------------------- User cache ------------------
+    # User / profile read model: local LRU (short TTL) in front of Redis
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_LOCAL_TTL: float = float(os.getenv("USER_CACHE_LOCAL_TTL", "30"))
+    USER_CACHE_TTL: int = int(os.getenv("USER_CACHE_TTL", "300"))
+
+    # -------------------- Password hashing ------------
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_MAX_QUEUE: int = int(
+        os.getenv("PASSWORD_HASH_MAX_QUEUE", "64")
+    )
+    PASSWORD_HASH_RETRY_AFTER: int = int(
+        os.getenv("PASSWORD_HASH_RETRY_AFTER", "2")
+    )
+
     # -------------------- ClickHouse ------------------
     CLICKHOUSE_URL: str = os.getenv(
         "CLICKHOUSE_URL",
@@ -60,6 +115,89 @@ class Settings:
     CLICKHOUSE_USER: str = os.getenv("CLICKHOUSE_USER", "default")
     CLICKHOUSE_PASSWORD: str = os.getenv("CLICKHOUSE_PASSWORD", "")
 
+    # Buffered writer (utils/clickhouse_writer.py)
+    CLICKHOUSE_BATCH_SIZE: int = int(os.getenv("CLICKHOUSE_BATCH_SIZE", "10000"))
+    CLICKHOUSE_FLUSH_INTERVAL: float = float(os.getenv("CLICKHOUSE_FLUSH_INTERVAL", "1.0"))
+    CLICKHOUSE_MAX_PENDING: int = int(os.getenv("CLICKHOUSE_MAX_PENDING", "200000"))
+    CLICKHOUSE_SPILL_DIR: str = os.getenv("CLICKHOUSE_SPILL_DIR", "/tmp/cybersentinel/clickhouse-spill")
+
+    # Activity / audit events older than this are dropped by ClickHouse TTL
+    ACTIVITY_RETENTION_DAYS: int = int(os.getenv("ACTIVITY_RETENTION_DAYS", "365"))
+
+    # -------------------- Pagination ------------------
+    # Seconds a cached list total may be served before recounting
+    COUNT_CACHE_TTL: int = int(os.getenv("COUNT_CACHE_TTL", "30"))
+
+    # -------------------- Asset import ----------------
+    ASSET_IMPORT_BATCH_SIZE: int = int(os.getenv("ASSET_IMPORT_BATCH_SIZE", "1000"))
+    ASSET_IMPORT_MAX_ERRORS: int = int(os.getenv("ASSET_IMPORT_MAX_ERRORS", "1000"))
+    ASSET_EXPORT_BATCH_SIZE: int = int(os.getenv("ASSET_EXPORT_BATCH_SIZE", "2000"))
+
+    # -------------------- ASM -------------------------
+    ASM_DASHBOARD_CACHE_TTL: int = int(os.getenv("ASM_DASHBOARD_CACHE_TTL", "60"))
+    ASM_SCHEDULER_ENABLED: bool = (
+        os.getenv("ASM_SCHEDULER_ENABLED", "True").lower() == "true"
+    )
+    # Max sleep between checks of the due heap (seconds)
+    ASM_SCHEDULER_TICK: float = float(os.getenv("ASM_SCHEDULER_TICK", "1.0"))
+    # Only schedules due within this window are held in memory (seconds)
+    ASM_SCHEDULER_HORIZON: int = int(os.getenv("ASM_SCHEDULER_HORIZON", "300"))
+    # How often the window is reloaded from Postgres (seconds)
+    ASM_SCHEDULER_REFRESH: int = int(os.getenv("ASM_SCHEDULER_REFRESH", "60"))
+    ASM_SCHEDULER_BATCH_SIZE: int = int(os.getenv("ASM_SCHEDULER_BATCH_SIZE", "500"))
+
+    # -------------------- Tasks -----------------------
+    TASK_SWEEPER_ENABLED: bool = (
+        os.getenv("TASK_SWEEPER_ENABLED", "True").lower() == "true"
+    )
+    TASK_SWEEP_INTERVAL: float = float(os.getenv("TASK_SWEEP_INTERVAL", "60"))
+    # Max tasks flipped to overdue per statement; a full batch sweeps again
+    TASK_SWEEP_BATCH_SIZE: int = int(os.getenv("TASK_SWEEP_BATCH_SIZE", "1000"))
+
+    # -------------------- VS --------------------------
+    # Targets scanned within this window count towards coverage
+    VS_COVERAGE_WINDOW_DAYS: int = int(os.getenv("VS_COVERAGE_WINDOW_DAYS", "30"))
+    # Seconds between keep-alive comments on idle scan event streams
+    VS_SSE_HEARTBEAT: float = float(os.getenv("VS_SSE_HEARTBEAT", "15"))
+
+    # -------------------- Readiness -------------------
+    # Per-dependency ping timeout for GET /ready (seconds)
+    READY_CHECK_TIMEOUT: float = float(os.getenv("READY_CHECK_TIMEOUT", "2"))
+    # Dependencies that must answer for the pod to take traffic; the
+    # others are reported but the API degrades without them
+    READY_REQUIRED: list[str] = [
+        name.strip()
+        for name in os.getenv("READY_REQUIRED", "postgres,redis").split(",")
+        if name.strip()
+    ]
+    # Upper bound on each startup warm-up step (seconds)
+    WARMUP_TIMEOUT: float = float(os.getenv("WARMUP_TIMEOUT", "10"))
+    # Seconds between background retries of a failed startup step
+    STARTUP_RETRY_INTERVAL: float = float(os.getenv("STARTUP_RETRY_INTERVAL", "15"))
+
+    # -------------------- Metrics ---------------------
+    METRICS_ENABLED: bool = (
+        os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    )
+    # Max label sets per metric; extra ones are folded into "other"
+    METRICS_MAX_SERIES: int = int(os.getenv("METRICS_MAX_SERIES", "5000"))
+
+    # -------------------- Query profiler --------------
+    # Development aid (utils/query_profiler.py); adds per-statement work
+    QUERY_PROFILER_ENABLED: bool = (
+        os.getenv("QUERY_PROFILER_ENABLED", os.getenv("DEBUG", "False")).lower() == "true"
+    )
+    QUERY_SLOW_MS: float = float(os.getenv("QUERY_SLOW_MS", "200"))
+    # Same SELECT this many times in one request is reported as N+1
+    QUERY_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "10"))
+    QUERY_PROFILER_MAX_STATEMENTS: int = int(
+        os.getenv("QUERY_PROFILER_MAX_STATEMENTS", "2000")
+    )
+    # Run EXPLAIN ANALYZE once for each slow SELECT
+    QUERY_PROFILER_EXPLAIN: bool = (
+        os.getenv("QUERY_PROFILER_EXPLAIN", "True").lower() == "true"
+    )
+
     # -------------------- App -------------------------
     APP_NAME: str = "CyberSentinel API Service"
     APP_VERSION: str = "1.0.0"
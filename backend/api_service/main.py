@@ -1,13 +1,30 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from config.settings import settings
-from utils.database import init_db, close_db 
+from utils.database import close_db
+from utils.migrations import ensure_schema
 from utils.redis_client import  close_redis
-from utils.queue import close_queue, get_queue_connection
-from utils.clickhouse_client import close_clickhouse, get_clickhouse
+from utils.queue import close_queue
+from utils.clickhouse_client import close_clickhouse
+from utils.password_hasher import close_password_hasher
+from utils.token_revocation import start_token_revocation, close_token_revocation
+from utils.outbox import start_outbox_relay, close_outbox_relay
+from utils.asm_scheduler import start_asm_scheduler, close_asm_scheduler
+from utils.clickhouse_writer import start_clickhouse_writer, close_clickhouse_writer
+from utils.vs_findings import ensure_vs_schema
+from utils.vs_analytics import ensure_vs_analytics_schema
+from utils.activity import ensure_activity_schema
+from utils.vs_results import start_vs_results_consumer, close_vs_results_consumer
+from utils.scan_events import close_scan_events
+from utils.task_sweeper import start_task_sweeper, close_task_sweeper
+from utils.cache import start_cache_invalidation, close_cache_invalidation
+from utils.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from utils.query_profiler import QueryProfilerMiddleware, close_query_profiler
+from utils.readiness import check_readiness, mark_shutting_down, run_startup_step, warm_up
 
 # Import all routes
-from routes import auth, users, profile, accounts, billing, services, asm, vs, settings_route, activity, assets, tasks
+from routes import auth, users, profile, accounts, billing, services, asm, vs, settings_route, activity, assets, tasks, debug
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -23,33 +40,68 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.QUERY_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+# Outermost, so it also times CORS preflights and error responses
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     """Initialize connections on startup"""
-    try:
-        await init_db()
-    except Exception as e:
-        print(f"Warning: Database initialization failed: {e}")
-    
-    # Initialize other connections (optional)
-    try:
-        from utils import get_redis, get_clickhouse, get_queue_connection
-        # await get_redis()
-        # get_clickhouse()
-        # get_queue_connection()
-    except Exception as e:
-        print(f"Info: Some optional connections not available: {e}")
+    # Schema is migrated once per deploy (migration.py); a pending
+    # migration keeps /ready at 503 (re-checked in the background)
+    await run_startup_step("schema", ensure_schema)
+
+    # Fill the DB pool and open Redis / RabbitMQ / ClickHouse before
+    # the first request instead of on it
+    await warm_up()
+
+    # Revoked-token filter sync (retries in the background if Redis is down)
+    await start_token_revocation()
+
+    # Drops locally cached user/profile views when another worker writes
+    await start_cache_invalidation()
+
+    # Drains queued jobs (outbox_messages) to RabbitMQ in the background
+    await start_outbox_relay()
+
+    # Fires INTERVAL / CRON discoveries (one replica leads)
+    await start_asm_scheduler()
+
+    # Moves past-due tasks to "overdue"
+    await start_task_sweeper()
+
+    # ClickHouse tables (findings, analytics, activity), then the batched writer
+    await ensure_vs_schema()
+    await ensure_vs_analytics_schema()
+    await ensure_activity_schema()
+    await start_clickhouse_writer()
+
+    # Applies worker status / findings from results.vs
+    await start_vs_results_consumer()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close connections on shutdown"""
+    # /ready turns 503 first so no new traffic arrives while closing
+    mark_shutting_down()
+    await close_vs_results_consumer()
+    await close_scan_events()
+    await close_token_revocation()
+    await close_cache_invalidation()
+    await close_asm_scheduler()
+    await close_task_sweeper()
+    await close_outbox_relay()
+    await close_query_profiler()
     await close_db()
     await close_redis()
     await close_queue()
+    await close_clickhouse_writer()
     await close_clickhouse()
+    close_password_hasher()
 
 # ==================== ROOT ====================
 
@@ -59,8 +111,20 @@ async def root():
 
 @app.get("/health")
 async def health():
+    """Liveness: the process is up (dependencies are checked by /ready)"""
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    """Readiness: warm, not shutting down, required dependencies answering"""
+    is_ready, report = await check_readiness()
+    return JSONResponse(report, status_code=200 if is_ready else 503)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus exposition format (per worker process)"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 # ==================== REGISTER ALL ROUTES ====================
 
 app.include_router(auth.router)
@@ -77,6 +141,9 @@ app.include_router(activity.router)
 app.include_router(assets.router)
 app.include_router(tasks.router)
 
+if settings.QUERY_PROFILER_ENABLED:
+    app.include_router(debug.router)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,34 +1,45 @@
 """
 Database Migration Script
-Run this to create all tables in the database
+Run once per deploy (before the new pods start) to apply pending
+schema migrations:
+
+    python migration.py            # apply pending migrations
+    python migration.py --status   # list pending migrations only
 """
 
-from utils.database import init_db, engine, Base
-from models.auth_models import User, Company, Profile
+import asyncio
 import logging
+import sys
+
+from utils.database import close_db
+from utils.migrations import pending_migrations, run_migrations
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def migrate_database():
+
+async def migrate_database(status_only: bool = False):
     """
-    Create all database tables
+    Apply (or list) pending migrations
     """
     try:
+        if status_only:
+            pending = await pending_migrations()
+            for migration in pending:
+                logger.info(f"Pending: {migration} - {migration.description}")
+            logger.info(f"{len(pending)} migration(s) pending")
+            return
+
         logger.info("Starting database migration...")
-        
-        # Import all models to ensure they're registered with Base
-        from models.auth_models import User, Company, Profile
-        
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
-        
-        logger.info("✅ Database migration completed successfully!")
-        logger.info(f"Created tables: {', '.join(Base.metadata.tables.keys())}")
-        
+        applied = await run_migrations()
+        logger.info(f"✅ Database migration completed ({len(applied)} applied)")
+
     except Exception as e:
         logger.error(f"❌ Migration failed: {str(e)}")
         raise
+    finally:
+        await close_db()
+
 
 if __name__ == "__main__":
-    migrate_database()
\ No newline at end of file
+    asyncio.run(migrate_database(status_only="--status" in sys.argv[1:]))
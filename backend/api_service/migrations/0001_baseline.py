@@ -0,0 +1,31 @@
+"""
+Baseline: every table the models define, as create_all used to build
+them on each boot. Only creates what is missing, so it is a no-op on
+databases that already have the tables. Later migrations must stay
+idempotent (IF NOT EXISTS): on a fresh database this step has already
+created their columns and indexes from the current models.
+"""
+
+from sqlalchemy import text
+
+from utils.database import Base
+
+# Registers every table on Base.metadata
+from models import (  # noqa: F401
+    asm_models,
+    asset_models,
+    auth_models,
+    billing_model,
+    outbox_models,
+    task_models,
+    vs_models,
+)
+
+description = "create tables from the models"
+transactional = True
+
+
+async def upgrade(conn):
+    # Needed by the gin_trgm_ops indexes (asset / task search)
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await conn.run_sync(Base.metadata.create_all)
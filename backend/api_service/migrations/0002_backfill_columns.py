@@ -0,0 +1,23 @@
+"""
+Columns added to existing tables after they were first created;
+create_all never altered a table, so older databases lack them.
+"""
+
+from sqlalchemy import text
+
+description = "users.company_id, assets.search_vector"
+transactional = True
+
+
+async def upgrade(conn):
+    await conn.execute(text(
+        "ALTER TABLE users "
+        "ADD COLUMN IF NOT EXISTS company_id VARCHAR REFERENCES companies(id)"
+    ))
+    # Rewrites assets once to compute the stored column
+    await conn.execute(text(
+        "ALTER TABLE assets ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))"
+        ") STORED"
+    ))
@@ -0,0 +1,54 @@
+"""
+UNIQUE (user_id, type, name) on assets: the bulk-import upsert key.
+
+Existing duplicates are deleted first, keeping the newest row of each
+group, and asm_surface_stats is corrected by the same statement. The
+unique index is then built concurrently and attached as the constraint.
+If rows raced in between, the build fails and the next run dedupes
+again; that is why both steps share one migration.
+"""
+
+from sqlalchemy import text
+
+from utils.migrations import constraint_exists, create_index_concurrently
+
+description = "dedupe assets and add uq_assets_user_type_name"
+transactional = False
+
+CONSTRAINT = "uq_assets_user_type_name"
+
+
+async def upgrade(conn):
+    if await constraint_exists(conn, CONSTRAINT):
+        return
+
+    await conn.execute(text("""
+        WITH removed AS (
+            DELETE FROM assets a
+            USING assets b
+            WHERE a.user_id = b.user_id
+              AND a.type = b.type
+              AND a.name = b.name
+              AND (coalesce(a.created_at, 'epoch'), a.id)
+                < (coalesce(b.created_at, 'epoch'), b.id)
+            RETURNING a.user_id, a.risk_score
+        ),
+        delta AS (
+            SELECT user_id, count(*) AS n, coalesce(sum(risk_score), 0) AS risk
+            FROM removed
+            GROUP BY user_id
+        )
+        UPDATE asm_surface_stats s
+        SET asset_count = s.asset_count - d.n,
+            risk_sum = s.risk_sum - d.risk,
+            updated_at = now()
+        FROM delta d
+        WHERE s.user_id = d.user_id
+    """))
+
+    await create_index_concurrently(
+        conn, CONSTRAINT, "assets", "(user_id, type, name)", unique=True
+    )
+    await conn.execute(text(
+        f"ALTER TABLE assets ADD CONSTRAINT {CONSTRAINT} UNIQUE USING INDEX {CONSTRAINT}"
+    ))
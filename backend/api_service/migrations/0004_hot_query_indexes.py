@@ -0,0 +1,54 @@
+"""
+Composite / partial indexes behind the hot queries, built online.
+Tables created before an index was added to the models never got it
+from create_all.
+"""
+
+from utils.migrations import create_index_concurrently
+
+description = "keyset, dashboard, scheduler, sweeper and search indexes"
+transactional = False
+
+# (name, table, definition)
+INDEXES = [
+    # Keyset pagination: WHERE user_id = ? AND (created_at, id) < (?, ?)
+    ("ix_asm_discoveries_user_created_id", "asm_discoveries", "(user_id, created_at, id)"),
+    ("ix_assets_user_created_id", "assets", "(user_id, created_at, id)"),
+    ("ix_tasks_user_created_id", "tasks", "(user_id, created_at, id)"),
+    ("ix_vs_scans_user_created_id", "vs_scans", "(user_id, created_at, id)"),
+    # ASM dashboard: latest run per user
+    ("ix_asm_discovery_runs_user_started", "asm_discovery_runs", "(user_id, started_at)"),
+    # ASM scheduler: recurring discoveries due within the horizon
+    (
+        "ix_asm_discoveries_next_run",
+        "asm_discoveries",
+        "(next_run_at) WHERE schedule_type <> 'QUICK'",
+    ),
+    # Task list filters
+    ("ix_tasks_user_status_created", "tasks", "(user_id, status, created_at)"),
+    ("ix_tasks_user_priority_created", "tasks", "(user_id, priority, created_at)"),
+    ("ix_tasks_user_assignee", "tasks", "(user_id, assignee_id)"),
+    ("ix_task_messages_task_created", "task_messages", "(task_id, created_at)"),
+    # Overdue sweeper: open tasks by due date
+    (
+        "ix_tasks_open_due",
+        "tasks",
+        "(status, due_date) "
+        "WHERE status IN ('pending', 'in_progress') AND due_date IS NOT NULL",
+    ),
+    # Outbox relay
+    ("ix_outbox_messages_available", "outbox_messages", "(available_at, attempts)"),
+    # Company members
+    ("ix_users_company_id", "users", "(company_id)"),
+    # Search: full text, substring (pg_trgm) and tags
+    ("ix_assets_search_vector", "assets", "USING gin (search_vector)"),
+    ("ix_assets_name_trgm", "assets", "USING gin (name gin_trgm_ops)"),
+    ("ix_assets_tags", "assets", "USING gin (tags)"),
+    ("ix_tasks_title_trgm", "tasks", "USING gin (title gin_trgm_ops)"),
+    ("ix_tasks_assignee_name_trgm", "tasks", "USING gin (assignee_name gin_trgm_ops)"),
+]
+
+
+async def upgrade(conn):
+    for name, table, definition in INDEXES:
+        await create_index_concurrently(conn, name, table, definition)
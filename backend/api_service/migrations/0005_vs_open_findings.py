@@ -0,0 +1,57 @@
+"""
+vs_open_findings in Postgres: the open-findings state moves out of
+ClickHouse, where rows still in the writer buffer were invisible to the
+next diff. Seeded from the ClickHouse table when it is reachable, so
+first_seen survives the move; otherwise the state starts empty and the
+next scan of each target re-opens its findings.
+"""
+
+import logging
+
+from sqlalchemy import insert, select
+
+from models.vs_models import VsOpenFinding
+from utils.clickhouse_client import get_clickhouse
+
+logger = logging.getLogger(__name__)
+
+description = "move VS open-findings state to Postgres"
+transactional = True
+
+
+async def _clickhouse_open_rows() -> list[dict]:
+    client = await get_clickhouse()
+    if client is None:
+        logger.warning("ClickHouse not available, vs_open_findings starts empty")
+        return []
+
+    try:
+        result = await client.query("""
+            SELECT
+                user_id, target, cve,
+                argMax(severity, version),
+                argMax(first_seen, version)
+            FROM vs_open_findings
+            GROUP BY user_id, target, cve
+            HAVING argMax(is_open, version) = 1
+        """)
+    except Exception as e:
+        logger.warning(f"Could not read ClickHouse open findings ({e}), starting empty")
+        return []
+
+    return [
+        {
+            "user_id": user_id, "target": target, "cve": cve,
+            "severity": severity, "first_seen": first_seen.replace(tzinfo=None),
+        }
+        for user_id, target, cve, severity, first_seen in result.result_rows
+    ]
+
+
+async def upgrade(conn):
+    await conn.run_sync(VsOpenFinding.__table__.create, checkfirst=True)
+
+    rows = await _clickhouse_open_rows()
+    if rows and await conn.scalar(select(VsOpenFinding.user_id).limit(1)) is None:
+        await conn.execute(insert(VsOpenFinding), rows)
+        logger.info(f"Seeded {len(rows)} open findings from ClickHouse")
@@ -0,0 +1,5 @@
+"""
+Schema migrations, applied in version order by utils/migrations.py.
+Add a new NNNN_name.py for every schema change; never edit one that
+has shipped.
+"""
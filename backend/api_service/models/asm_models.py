@@ -1,7 +1,7 @@
 # models/asm_models.py
 
 import uuid
-from sqlalchemy import Column, String, DateTime, Enum, JSON
+from sqlalchemy import Column, String, DateTime, Enum, JSON, Index, Integer, BigInteger, text
 from sqlalchemy.sql import func
 
 from utils.database import Base
@@ -53,6 +53,17 @@ class AsmDiscovery(Base):
         onupdate=func.now(),
     )
 
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? AND (created_at, id) < (?, ?)
+        Index("ix_asm_discoveries_user_created_id", "user_id", "created_at", "id"),
+        # Scheduler: recurring discoveries due within the horizon
+        Index(
+            "ix_asm_discoveries_next_run",
+            "next_run_at",
+            postgresql_where=text("schedule_type <> 'QUICK'"),
+        ),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -99,6 +110,11 @@ class AsmDiscoveryRun(Base):
 
     created_at = Column(DateTime, server_default=func.now())
 
+    __table_args__ = (
+        # Dashboard: latest run per user
+        Index("ix_asm_discovery_runs_user_started", "user_id", "started_at"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -111,3 +127,21 @@ class AsmDiscoveryRun(Base):
             "summary": self.summary,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
+
+
+class AsmSurfaceStats(Base):
+    """
+    Per-user attack surface aggregate, maintained incrementally by the
+    asset routes so the dashboard never scans the assets table.
+    """
+    __tablename__ = "asm_surface_stats"
+
+    user_id = Column(String, primary_key=True)
+    asset_count = Column(Integer, nullable=False, default=0)
+    risk_sum = Column(BigInteger, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -2,8 +2,8 @@
 SQLAlchemy Models for Assets
 """
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, Index, UniqueConstraint, Computed
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.sql import func
 import uuid
 
@@ -38,6 +38,15 @@ class Asset(Base):
 
     description = Column(Text, nullable=True)
 
+    # Full-text search over name/description, maintained by Postgres on write
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+    )
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True),
@@ -46,6 +55,22 @@ class Asset(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? AND (created_at, id) < (?, ?)
+        Index("ix_assets_user_created_id", "user_id", "created_at", "id"),
+        # Upsert key for bulk import
+        UniqueConstraint("user_id", "type", "name", name="uq_assets_user_type_name"),
+        # Search: ranked prefix matching, substring matching, tag filtering
+        Index("ix_assets_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_assets_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index("ix_assets_tags", "tags", postgresql_using="gin"),
+    )
+
     def __repr__(self) -> str:
         return f"<Asset id={self.id} name={self.name} type={self.type}>"
 
@@ -20,6 +20,9 @@ class Company(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Relationships
+    members = relationship("User", back_populates="company")
+
 class User(Base):
     __tablename__ = "users"
     
@@ -28,12 +31,15 @@ class User(Base):
     name = Column(String, nullable=False)
     hashed_password = Column(String, nullable=False)
     role = Column(String, nullable=False)
+    # Nullable: users created by signup have no company yet
+    company_id = Column(String, ForeignKey("companies.id"), nullable=True, index=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     profile = relationship("Profile", back_populates="user", uselist=False)
+    company = relationship("Company", back_populates="members")
 
 class Profile(Base):
     __tablename__ = "profiles"
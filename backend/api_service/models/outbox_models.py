@@ -0,0 +1,32 @@
+"""
+SQLAlchemy Model for the Transactional Outbox
+"""
+
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, JSON, Index
+from sqlalchemy.sql import func
+
+from utils.database import Base
+
+
+class OutboxMessage(Base):
+    """
+    Queue message written in the same transaction as the row it belongs
+    to. The outbox relay publishes it to RabbitMQ and deletes it.
+    """
+    __tablename__ = "outbox_messages"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    queue_name = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, server_default=func.now())
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # Relay: WHERE available_at <= now() AND attempts < max ORDER BY id
+        Index("ix_outbox_messages_available", "available_at", "attempts"),
+    )
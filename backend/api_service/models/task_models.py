@@ -0,0 +1,136 @@
+"""
+SQLAlchemy Models for Remediation Tasks
+"""
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, Enum, Index, text
+from sqlalchemy.sql import func
+import uuid
+
+from utils.database import Base
+
+
+def generate_uuid() -> str:
+    return str(uuid.uuid4())
+
+
+class Task(Base):
+    __tablename__ = "tasks"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+
+    user_id = Column(
+        String,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    title = Column(String(500), nullable=False)
+    description = Column(Text, nullable=True)
+
+    priority = Column(
+        Enum("critical", "high", "medium", "low", name="task_priority"),
+        nullable=False,
+        default="medium",
+    )
+    status = Column(
+        Enum("pending", "in_progress", "completed", "overdue", name="task_status"),
+        nullable=False,
+        default="pending",
+    )
+
+    assignee_id = Column(String, nullable=True)
+    assignee_name = Column(String(255), nullable=True)
+    asset_name = Column(String(255), nullable=True)
+
+    due_date = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Kept in step with task_messages so lists never touch that table
+    message_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # List filters, newest first within each
+        Index("ix_tasks_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_tasks_user_priority_created", "user_id", "priority", "created_at"),
+        Index("ix_tasks_user_assignee", "user_id", "assignee_id"),
+        # Overdue sweeper: open tasks by due date (closed ones never indexed)
+        Index(
+            "ix_tasks_open_due",
+            "status",
+            "due_date",
+            postgresql_where=text("status IN ('pending', 'in_progress') AND due_date IS NOT NULL"),
+        ),
+        # Substring search (ILIKE '%q%') on title / assignee
+        Index(
+            "ix_tasks_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_tasks_assignee_name_trgm",
+            "assignee_name",
+            postgresql_using="gin",
+            postgresql_ops={"assignee_name": "gin_trgm_ops"},
+        ),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "priority": self.priority,
+            "status": self.status,
+            "assignee_id": self.assignee_id,
+            "assignee_name": self.assignee_name,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "due_date": self.due_date.isoformat() if self.due_date else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "asset_name": self.asset_name,
+            "message_count": self.message_count or 0,
+        }
+
+
+class TaskMessage(Base):
+    __tablename__ = "task_messages"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+
+    task_id = Column(
+        String,
+        ForeignKey("tasks.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    sender = Column(String(255), nullable=False)
+    message = Column(Text, nullable=False)
+    platform = Column(
+        Enum("internal", "slack", "jira", "email", name="task_message_platform"),
+        nullable=False,
+        default="internal",
+    )
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_task_messages_task_created", "task_id", "created_at"),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "sender": self.sender,
+            "message": self.message,
+            "timestamp": self.created_at.isoformat() if self.created_at else None,
+            "platform": self.platform,
+        }
@@ -0,0 +1,76 @@
+# models/vs_models.py
+
+import uuid
+from sqlalchemy import Column, String, DateTime, Enum, Integer, Index
+from sqlalchemy.sql import func
+
+from utils.database import Base
+
+
+class VsScan(Base):
+    """
+    Vulnerability scan job. Findings are stored in ClickHouse
+    (utils/vs_findings.py), keyed by this id.
+    """
+    __tablename__ = "vs_scans"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, nullable=False)
+
+    name = Column(String, nullable=False)
+    target = Column(String, nullable=False)
+    scan_type = Column(String, nullable=False, default="external")
+    frequency = Column(String, nullable=True)
+
+    status = Column(
+        Enum("queued", "running", "completed", "failed", name="vs_scan_status"),
+        nullable=False,
+        default="queued",
+    )
+    progress = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(
+        DateTime,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        Index("ix_vs_scans_user_created_id", "user_id", "created_at", "id"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "target": self.target,
+            "scan_type": self.scan_type,
+            "frequency": self.frequency,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class VsOpenFinding(Base):
+    """
+    Findings currently open on a target: the state each completed scan
+    is diffed against (utils/vs_analytics.py). Kept here, not in
+    ClickHouse, so the diff always sees the previous scan's result.
+    """
+    __tablename__ = "vs_open_findings"
+
+    user_id = Column(String, primary_key=True)
+    target = Column(String, primary_key=True)
+    cve = Column(String, primary_key=True)
+
+    severity = Column(String, nullable=False)
+    first_seen = Column(DateTime, nullable=False)
@@ -2,13 +2,16 @@
 Account Management Routes -
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from pydantic import BaseModel, EmailStr
-from typing import List
+from typing import List, Optional
 
 from utils.database import get_db
 from models.auth_models import Company, User
 from utils.auth_utils import get_current_user
+from utils.user_lookup import get_user_view, invalidate_user
 
 router = APIRouter(prefix="/api/v1/accounts", tags=["Accounts"])
 
@@ -17,32 +20,55 @@ class UserInfo(BaseModel):
     name: str
     email: str
     role: str
-    company_id: str
+    company_id: Optional[str] = None
 
 class AccountUpdate(BaseModel):
     name: str = None
     plan: str = None
 
+
+async def _load_actor(db: AsyncSession, current_user: dict) -> dict:
+    """
+    Caller's cached user view (role / company_id are not in the token)
+    """
+    actor = await get_user_view(db, current_user["user_id"])
+    if not actor:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return actor
+
+
+async def _get_account(db: AsyncSession, account_id: str, with_members: bool = False) -> Company:
+    query = select(Company).where(Company.id == account_id)
+    if with_members:
+        query = query.options(selectinload(Company.members))
+    result = await db.execute(query)
+    account = result.scalar_one_or_none()
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+    return account
+
 @router.get("/{account_id}")
 async def get_account(
     account_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get account/company details"""
     # Verify user belongs to this company
-    if current_user["company_id"] != account_id:
+    actor = await _load_actor(db, current_user)
+    if actor["company_id"] != account_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this account"
         )
     
-    account = db.query(Company).filter(Company.id == account_id).first()
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Account not found"
-        )
+    account = await _get_account(db, account_id)
     
     return {
         "id": account.id,
@@ -56,36 +82,32 @@ async def update_account(
     account_id: str,
     account_data: AccountUpdate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update account details"""
     # Only admins can update account
-    if current_user.get("role") != "admin":
+    actor = await _load_actor(db, current_user)
+    if actor["role"] != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can update account"
         )
     
-    if current_user["company_id"] != account_id:
+    if actor["company_id"] != account_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this account"
         )
     
-    account = db.query(Company).filter(Company.id == account_id).first()
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Account not found"
-        )
+    account = await _get_account(db, account_id)
     
     # Update fields
     update_data = account_data.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(account, key, value)
     
-    db.commit()
-    db.refresh(account)
+    await db.commit()
+    await db.refresh(account)
     
     return {
         "message": "Account updated successfully",
@@ -100,18 +122,20 @@ async def update_account(
 async def list_account_members(
     account_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List all members of an account"""
     # Verify user belongs to this company
-    if current_user["company_id"] != account_id:
+    actor = await _load_actor(db, current_user)
+    if actor["company_id"] != account_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view members"
         )
     
-    users = db.query(User).filter(User.company_id == account_id).all()
-    
+    account = await _get_account(db, account_id, with_members=True)
+    users = account.members
+
     return [
         UserInfo(
             id=u.id,
@@ -129,17 +153,18 @@ async def invite_member(
     email: EmailStr,
     role: str = "reader",
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Invite a new member to the account"""
     # Only admins can invite members
-    if current_user.get("role") != "admin":
+    actor = await _load_actor(db, current_user)
+    if actor["role"] != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can invite members"
         )
     
-    if current_user["company_id"] != account_id:
+    if actor["company_id"] != account_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to invite to this account"
@@ -158,41 +183,47 @@ async def remove_member(
     account_id: str,
     member_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Remove a member from the account"""
     # Only admins can remove members
-    if current_user.get("role") != "admin":
+    actor = await _load_actor(db, current_user)
+    if actor["role"] != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can remove members"
         )
     
-    if current_user["company_id"] != account_id:
+    if actor["company_id"] != account_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized"
         )
     
     # Prevent self-removal
-    if current_user["id"] == member_id:
+    if actor["id"] == member_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot remove yourself"
         )
     
-    user = db.query(User).filter(
-        User.id == member_id,
-        User.company_id == account_id
-    ).first()
-    
+    result = await db.execute(
+        select(User)
+        .options(selectinload(User.profile))
+        .where(User.id == member_id, User.company_id == account_id)
+    )
+    user = result.scalar_one_or_none()
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Member not found"
         )
     
-    db.delete(user)
-    db.commit()
+    if user.profile is not None:
+        await db.delete(user.profile)
+    await db.delete(user)
+    await db.commit()
+    await invalidate_user(member_id)
     
     return {"message": "Member removed successfully"}
\ No newline at end of file
@@ -1,23 +1,49 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from datetime import datetime
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/v1", tags=["Activity"])
 
 from utils.auth_utils import get_current_user
+from utils.activity import query_events
+
+
+async def _page(current_user: dict, audit_only: bool, **filters):
+    page = await query_events(current_user["user_id"], audit_only=audit_only, **filters)
+    if page is None:
+        raise HTTPException(status_code=503, detail="Activity store unavailable")
+    return page
+
 
 @router.get("/activity")
-async def get_activity(skip: int = 0, limit: int = 50, current_user: dict = Depends(get_current_user)):
-    return {
-        "activities": [{
-            "id": "1",
-            "type": "login",
-            "description": "User logged in",
-            "timestamp": datetime.utcnow().isoformat()
-        }],
-        "total": 1
-    }
+async def get_activity(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    type: Optional[List[str]] = Query(None, description="Action (asset.created) or category (asset)"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Newest first; pass ``next_cursor`` back as ``cursor`` for older events
+    """
+    events, next_cursor = await _page(
+        current_user, False,
+        since=since, until=until, types=type, cursor=cursor, limit=limit,
+    )
+    return {"activities": events, "next_cursor": next_cursor}
 
 @router.get("/audit-logs")
-async def get_audit_logs(skip: int = 0, limit: int = 100, current_user: dict = Depends(get_current_user)):
-    return {"logs": [], "total": 0}
-
+async def get_audit_logs(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    type: Optional[List[str]] = Query(None, description="Action (auth.login) or category (auth)"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: dict = Depends(get_current_user),
+):
+    logs, next_cursor = await _page(
+        current_user, True,
+        since=since, until=until, types=type, cursor=cursor, limit=limit,
+    )
+    return {"logs": logs, "next_cursor": next_cursor}
@@ -1,17 +1,20 @@
 # api/asm.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from datetime import datetime
+from typing import Literal, Optional
+import uuid
 
 from utils.database import get_db
-from utils.queue import publish_message
+from utils.outbox import enqueue, outbox_relay
 from utils.auth_utils import get_current_user
-from models.asm_models import (
-    AsmDiscovery as AsmDiscoveryModel,
-    AsmDiscoveryRun as AsmDiscoveryRunModel,
-)
+from utils.activity import emit_event
+from utils.pagination import keyset_paginate, cached_count, invalidate_count
+from utils.asm_stats import get_dashboard_snapshot, invalidate_dashboard
+from utils.schedule import compute_next_run
+from models.asm_models import AsmDiscovery as AsmDiscoveryModel
 
 # -------------------- Schemas -------------------- #
 from schemas.asm_schema import (
@@ -26,6 +29,13 @@ from schemas.asm_schema import (
 router = APIRouter(prefix="/api/v1/asm", tags=["ASM"])
 
 
+def _next_run_or_400(schedule_type: str, schedule_value: Optional[str]) -> Optional[datetime]:
+    try:
+        return compute_next_run(schedule_type, schedule_value, datetime.utcnow())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid schedule: {e}")
+
+
 # ---------------------------------------------------
 # Create Discovery
 # ---------------------------------------------------
@@ -35,7 +45,12 @@ async def create_discovery(
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
+    # First run is dispatched right away; recurring ones are then picked
+    # up by the scheduler at next_run_at
+    next_run_at = _next_run_or_400(payload.schedule_type, payload.schedule_value)
+
     discovery = AsmDiscoveryModel(
+        id=str(uuid.uuid4()),
         user_id=current_user["user_id"],
         name=payload.name,
         asset_type=payload.asset_type,
@@ -45,22 +60,16 @@ async def create_discovery(
         intensity=payload.intensity,
         schedule_type=payload.schedule_type,
         schedule_value=payload.schedule_value,
-        next_run_at=datetime.utcnow(),
+        last_run_at=datetime.utcnow(),
+        next_run_at=next_run_at,
         status="PENDING",
     )
 
-    # add() is NOT async
-    db.add(discovery)
-    await db.commit()
-    await db.refresh(discovery)
-
-    discovery_data = discovery.to_dict()
-
-    # PUSH TO QUEUE
+    # QUEUE MESSAGE (sent by the outbox relay once this transaction commits)
     queue_message = {
         "type":"asm",
         "user_id": current_user["user_id"],
-        "id": discovery_data["id"],
+        "id": discovery.id,
         "asset_type": payload.asset_type,
         "target_source": payload.target_source,
         "intensity": payload.intensity,
@@ -68,13 +77,24 @@ async def create_discovery(
 
     queue_name = "jobs.asm"
 
-    if not await publish_message(queue_name, queue_message):
-        raise HTTPException(
-            status_code=500,
-            detail="Not able to schedule this discovery",
-        )
+    # add() is NOT async
+    db.add(discovery)
+    enqueue(db, queue_name, queue_message)
+    await db.commit()
+    await db.refresh(discovery)
 
-    return discovery_data
+    outbox_relay.wake()
+
+    await invalidate_count(f"asm_discoveries:{current_user['user_id']}")
+    await invalidate_dashboard(current_user["user_id"])
+
+    emit_event(
+        current_user["user_id"], "discovery.created", "asm_discovery", discovery.id,
+        {"name": discovery.name, "asset_type": discovery.asset_type},
+        user_name=current_user["email"],
+    )
+
+    return discovery.to_dict()
 
 
 # ---------------------------------------------------
@@ -83,25 +103,44 @@ async def create_discovery(
 @router.get("/discoveries", response_model=AsmDiscoveryListResponse)
 async def list_discoveries(
     page: int = 1,
-    page_size: int = 20,
+    page_size: int = Query(20, ge=1, le=200),
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
+    user_id = current_user["user_id"]
+
     base_query = select(AsmDiscoveryModel).where(
-        AsmDiscoveryModel.user_id == current_user["user_id"]
+        AsmDiscoveryModel.user_id == user_id
     )
 
-    # Total count
-    total_query = select(func.count()).select_from(
-        base_query.subquery()
-    )
-    total_result = await db.execute(total_query)
-    total = total_result.scalar() or 0
+    # Total count (cached, approximate within COUNT_CACHE_TTL)
+    total = None
+    if include_total:
+        total = await cached_count(db, f"asm_discoveries:{user_id}", base_query)
+
+    if pagination == "cursor" or cursor:
+        discoveries, next_cursor = await keyset_paginate(
+            db,
+            base_query,
+            AsmDiscoveryModel.created_at,
+            AsmDiscoveryModel.id,
+            cursor,
+            page_size,
+        )
+        return AsmDiscoveryListResponse(
+            items=[d.to_dict() for d in discoveries],
+            total=total,
+            page_size=page_size,
+            next_cursor=next_cursor,
+        )
 
     # Paginated results
     paginated_query = (
         base_query
-        .order_by(AsmDiscoveryModel.created_at.desc())
+        .order_by(AsmDiscoveryModel.created_at.desc(), AsmDiscoveryModel.id.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
     )
@@ -138,12 +177,27 @@ async def update_discovery(
     if not discovery:
         raise HTTPException(status_code=404, detail="Discovery not found")
 
-    for key, value in payload.dict(exclude_unset=True).items():
+    changes = payload.dict(exclude_unset=True)
+    for key, value in changes.items():
         setattr(discovery, key, value)
 
+    if "schedule_type" in changes or "schedule_value" in changes:
+        discovery.next_run_at = _next_run_or_400(
+            discovery.schedule_type,
+            discovery.schedule_value,
+        )
+
     await db.commit()
     await db.refresh(discovery)
 
+    if payload.status is not None:
+        await invalidate_dashboard(current_user["user_id"])
+
+    emit_event(
+        current_user["user_id"], "discovery.updated", "asm_discovery", discovery.id,
+        {"fields": sorted(changes)}, user_name=current_user["email"],
+    )
+
     return discovery.to_dict()
 
 
@@ -170,6 +224,14 @@ async def delete_discovery(
     await db.delete(discovery)
     await db.commit()
 
+    await invalidate_count(f"asm_discoveries:{current_user['user_id']}")
+    await invalidate_dashboard(current_user["user_id"])
+
+    emit_event(
+        current_user["user_id"], "discovery.deleted", "asm_discovery", discovery_id,
+        {"name": discovery.name}, user_name=current_user["email"], audit=True,
+    )
+
     return discovery.to_dict()  
 
 # ---------------------------------------------------
@@ -180,42 +242,6 @@ async def asm_dashboard(
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    user_id = current_user["user_id"]
+    snapshot = await get_dashboard_snapshot(db, current_user["user_id"])
 
-    # Total discoveries
-    total_query = select(func.count()).select_from(
-        select(AsmDiscoveryModel)
-        .where(AsmDiscoveryModel.user_id == user_id)
-        .subquery()
-    )
-    total_result = await db.execute(total_query)
-    total = total_result.scalar() or 0
-
-    # Active discoveries
-    active_query = select(func.count()).select_from(
-        select(AsmDiscoveryModel)
-        .where(
-            AsmDiscoveryModel.user_id == user_id,
-            AsmDiscoveryModel.status == "RUNNING",
-        )
-        .subquery()
-    )
-    active_result = await db.execute(active_query)
-    active = active_result.scalar() or 0
-
-    # Last discovery run
-    last_run_query = (
-        select(AsmDiscoveryRunModel)
-        .where(AsmDiscoveryRunModel.user_id == user_id)
-        .order_by(AsmDiscoveryRunModel.started_at.desc())
-        .limit(1)
-    )
-    last_run_result = await db.execute(last_run_query)
-    last_run = last_run_result.scalar_one_or_none()
-
-    return AsmDashboardResponse(
-        attack_surface_score=75,  # placeholder
-        total_discoveries=total,
-        active_discoveries=active,
-        last_discovery_run=last_run.started_at if last_run else None,
-    )
+    return AsmDashboardResponse(**snapshot)
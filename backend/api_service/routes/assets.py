@@ -1,20 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Literal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, not_
+from sqlalchemy import select, func, and_, not_, or_
+from sqlalchemy.exc import IntegrityError
 
 from utils.database import get_db
 from utils.auth_utils import get_current_user
+from utils.activity import emit_event
+from utils.pagination import keyset_paginate, cached_count, invalidate_count
+from utils.asset_import import AssetImporter, iter_csv, iter_ndjson, load_progress
+from utils.asset_export import stream_assets
+from utils.asm_stats import apply_asset_delta, invalidate_dashboard
 from models.asset_models import Asset as AssetModel
 
 
 # -------------------- Schemas --------------------
-from schemas.asset_schema import AssetCreateRequest, AssetUpdateRequest, AssetResponse, AssetListResponse
+from schemas.asset_schema import (
+    AssetCreateRequest,
+    AssetUpdateRequest,
+    AssetResponse,
+    AssetListResponse,
+    AssetBulkImportResponse,
+    AssetImportProgress,
+)
 
 # -------------------- Routes --------------------
 router = APIRouter(prefix="/api/v1/assets", tags=["Assets"])
 
+def _prefix_tsquery(q: str) -> Optional[str]:
+    """
+    'acme prod' → 'acme:* & prod:*' (every word, prefix matched)
+    """
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return None
+    return " & ".join(f"{w}:*" for w in words)
+
+
+async def _flush_or_409(db: AsyncSession, type: str, name: str) -> None:
+    """
+    Flush the pending asset; a duplicate (type, name) becomes a 409
+    """
+    try:
+        await db.flush()
+    except IntegrityError as e:
+        await db.rollback()
+        if "uq_assets_user_type_name" in str(e.orig):
+            raise HTTPException(
+                status_code=409,
+                detail=f"An asset of type '{type}' named '{name}' already exists",
+            )
+        raise
+
+
 # ---------------------------------------------------
 # List Assets
 # ---------------------------------------------------
@@ -23,17 +65,46 @@ async def list_assets(
     q: Optional[str] = Query(None),
     type: Optional[str] = Query(None),
     exposure: Optional[str] = Query(None),
+    tags: Optional[List[str]] = Query(None),
+    sort: Optional[Literal["relevance", "recent"]] = None,
     page: int = 1,
-    page_size: int = 50,
+    page_size: int = Query(50, ge=1, le=500),
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = Query(None),
+    include_total: bool = True,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
+    """
+    List assets. ``pagination=cursor`` switches to keyset paging on
+    (created_at, id): pass back ``next_cursor`` to get the following page.
+    Totals come from a short-lived cached counter.
+
+    ``q`` matches word prefixes in name/description (full-text) or any
+    substring of name (trigram); with ``q`` results are ranked by relevance
+    unless ``sort=recent`` or cursor paging is used. ``tags`` keeps assets
+    carrying all given tags.
+    """
+    user_id = current_user["user_id"]
+
     query = select(AssetModel).filter(
-        AssetModel.user_id == current_user["user_id"]
+        AssetModel.user_id == user_id
     )
 
+    rank = None
     if q:
-        query = query.filter(AssetModel.name.ilike(f"%{q}%"))
+        conditions = [AssetModel.name.icontains(q, autoescape=True)]
+
+        tsquery = _prefix_tsquery(q)
+        if tsquery:
+            ts = func.to_tsquery("simple", tsquery)
+            conditions.append(AssetModel.search_vector.op("@@")(ts))
+            rank = func.ts_rank(AssetModel.search_vector, ts)
+
+        query = query.filter(or_(*conditions))
+
+    if tags:
+        query = query.filter(AssetModel.tags.contains(tags))
 
     if type:
         query = query.filter(AssetModel.type == type)
@@ -41,15 +112,39 @@ async def list_assets(
     if exposure:
         query = query.filter(AssetModel.exposure == exposure)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    # Total count (cached, approximate within COUNT_CACHE_TTL)
+    total = None
+    if include_total:
+        total = await cached_count(
+            db,
+            f"assets:{user_id}",
+            query,
+            {"q": q, "type": type, "exposure": exposure, "tags": tags},
+        )
+
+    if pagination == "cursor" or cursor:
+        assets, next_cursor = await keyset_paginate(
+            db,
+            query,
+            AssetModel.created_at,
+            AssetModel.id,
+            cursor,
+            page_size,
+        )
+        return AssetListResponse(
+            items=[asset.to_dict() for asset in assets],
+            total=total,
+            page_size=page_size,
+            next_cursor=next_cursor,
+        )
 
     # Get paginated results
+    if rank is not None and sort != "recent":
+        query = query.order_by(rank.desc())
+
     query = (
         query
-        .order_by(AssetModel.created_at.desc())
+        .order_by(AssetModel.created_at.desc(), AssetModel.id.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
     )
@@ -86,12 +181,115 @@ async def create_asset(
     )
 
     db.add(asset)
+    await _flush_or_409(db, payload.type, payload.name)
+    await apply_asset_delta(db, current_user["user_id"], count_delta=1)
     await db.commit()
     await db.refresh(asset)
 
+    await invalidate_count(f"assets:{current_user['user_id']}")
+    await invalidate_dashboard(current_user["user_id"])
+
+    emit_event(
+        current_user["user_id"], "asset.created", "asset", asset.id,
+        {"name": asset.name, "type": asset.type}, user_name=current_user["email"],
+    )
+
     return asset.to_dict()
 
 
+# ---------------------------------------------------
+# Bulk Import Assets (streamed NDJSON / CSV)
+# ---------------------------------------------------
+@router.post("/bulk", response_model=AssetBulkImportResponse)
+async def bulk_import_assets(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = Query(None),
+    import_id: Optional[str] = Query(None, max_length=64),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Upsert assets from a streamed request body, keyed on (type, name).
+
+    Format comes from ``format`` or the Content-Type (text/csv → CSV,
+    anything else → NDJSON). Pass your own ``import_id`` to poll
+    ``GET /bulk/{import_id}`` while a long upload is still running.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+
+    parser = iter_csv if format == "csv" else iter_ndjson
+
+    importer = AssetImporter(db, current_user["user_id"], import_id)
+    summary = await importer.run(parser(request.stream()))
+
+    if summary["inserted"]:
+        await invalidate_count(f"assets:{current_user['user_id']}")
+        await invalidate_dashboard(current_user["user_id"])
+
+    emit_event(
+        current_user["user_id"], "asset.imported", "asset", None,
+        {
+            "import_id": summary["import_id"],
+            "inserted": summary["inserted"],
+            "updated": summary["updated"],
+            "failed": summary["failed"],
+        },
+        user_name=current_user["email"],
+    )
+
+    return summary
+
+
+@router.get("/bulk/{import_id}", response_model=AssetImportProgress)
+async def get_bulk_import_progress(
+    import_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    progress = await load_progress(current_user["user_id"], import_id)
+
+    if not progress or progress.get("user_id") != current_user["user_id"]:
+        raise HTTPException(status_code=404, detail="Import not found")
+
+    return progress
+
+
+# ---------------------------------------------------
+# Export Assets (streamed NDJSON / CSV)
+# ---------------------------------------------------
+@router.get("/export")
+async def export_assets(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    type: Optional[str] = Query(None),
+    exposure: Optional[str] = Query(None),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Stream the full asset inventory. Rows come from a server-side cursor
+    so memory stays flat regardless of inventory size.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"assets.{format}"
+
+    if gzip:
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        stream_assets(
+            current_user["user_id"],
+            fmt=format,
+            compress=gzip,
+            type=type,
+            exposure=exposure,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # ---------------------------------------------------
 # Get Asset
 # ---------------------------------------------------
@@ -136,12 +334,29 @@ async def update_asset(
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
-    for key, value in payload.dict(exclude_unset=True).items():
+    old_risk = asset.risk_score or 0
+
+    changes = payload.dict(exclude_unset=True)
+    for key, value in changes.items():
         setattr(asset, key, value)
 
+    if "name" in changes:
+        await _flush_or_409(db, asset.type, asset.name)
+
+    risk_delta = (asset.risk_score or 0) - old_risk
+    await apply_asset_delta(db, current_user["user_id"], risk_delta=risk_delta)
+
     await db.commit()
     await db.refresh(asset)
 
+    if risk_delta:
+        await invalidate_dashboard(current_user["user_id"])
+
+    emit_event(
+        current_user["user_id"], "asset.updated", "asset", asset.id,
+        {"fields": sorted(changes)}, user_name=current_user["email"],
+    )
+
     return asset.to_dict()
 
 
@@ -167,6 +382,20 @@ async def delete_asset(
     
     #TODO check for the asset in uising in any discovey 
     await db.delete(asset)
+    await apply_asset_delta(
+        db,
+        current_user["user_id"],
+        count_delta=-1,
+        risk_delta=-(asset.risk_score or 0),
+    )
     await db.commit()
 
+    await invalidate_count(f"assets:{current_user['user_id']}")
+    await invalidate_dashboard(current_user["user_id"])
+
+    emit_event(
+        current_user["user_id"], "asset.deleted", "asset", asset_id,
+        {"name": asset.name}, user_name=current_user["email"], audit=True,
+    )
+
     return {"message": "Asset deleted successfully"}
\ No newline at end of file
@@ -2,7 +2,7 @@
 Authentication API
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import EmailStr
@@ -12,11 +12,14 @@ import uuid
 from utils.database import get_db
 from models.auth_models import User, Profile
 from utils.auth_utils import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     get_current_user,
 )
+from utils.token_revocation import revocation_list
+from utils.user_lookup import get_user_view
+from utils.activity import emit_event
 
 from schemas.auth_schema import (
     UserSignup,
@@ -28,12 +31,20 @@ from schemas.auth_schema import (
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 
 
+def _client_info(request: Request) -> dict:
+    return {
+        "ip_address": request.client.host if request.client else None,
+        "user_agent": request.headers.get("user-agent"),
+    }
+
+
 # ---------------------------------------------------
 # Signup
 # ---------------------------------------------------
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
 async def signup(
     user_data: UserSignup,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -52,13 +63,17 @@ async def signup(
             detail="Email already registered",
         )
 
+    # Hash outside the try block so a 503 from the hasher is not
+    # turned into a 500 below
+    hashed_password = await hash_password_async(user_data.password)
+
     try:
         # Create user
         user = User(
             id=str(uuid.uuid4()),
             email=user_data.email,
             name=user_data.full_name,
-            hashed_password=hash_password(user_data.password),
+            hashed_password=hashed_password,
             role=user_data.role,
             is_active=True,
             created_at=datetime.utcnow(),
@@ -80,6 +95,11 @@ async def signup(
         await db.commit()
         await db.refresh(user)
 
+        emit_event(
+            user.id, "auth.signup", "user", user.id,
+            user_name=user.email, audit=True, **_client_info(request),
+        )
+
         return {
             "message": "User created successfully",
             "user_id": user.id,
@@ -99,6 +119,7 @@ async def signup(
 @router.post("/login", response_model=Token)
 async def login(
     credentials: UserLogin,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -110,10 +131,15 @@ async def login(
     )
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(
+    if not user or not await verify_password_async(
         credentials.password,
         user.hashed_password,
     ):
+        if user:
+            emit_event(
+                user.id, "auth.login_failed", "user", user.id,
+                user_name=user.email, audit=True, **_client_info(request),
+            )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -133,6 +159,11 @@ async def login(
         }
     )
 
+    emit_event(
+        user.id, "auth.login", "user", user.id,
+        user_name=user.email, audit=True, **_client_info(request),
+    )
+
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -146,12 +177,21 @@ async def login(
 # ---------------------------------------------------
 @router.post("/logout", response_model=MessageResponse)
 async def logout(
+    request: Request,
     current_user: dict = Depends(get_current_user),
 ):
     """
     Logout current user
     """
-    # Token invalidation can be added via Redis blacklist later
+    # Tokens issued before jti was added cannot be revoked; they simply expire
+    if current_user.get("jti") and current_user.get("exp"):
+        await revocation_list.revoke(current_user["jti"], current_user["exp"])
+
+    emit_event(
+        current_user["user_id"], "auth.logout", "user", current_user["user_id"],
+        user_name=current_user["email"], audit=True, **_client_info(request),
+    )
+
     return {"message": "Logged out successfully"}
 
 
@@ -245,10 +285,7 @@ async def verify_token(
     Verify current access token and return user info
     """
 
-    result = await db.execute(
-        select(User).where(User.id == current_user["user_id"])
-    )
-    user = result.scalar_one_or_none()
+    user = await get_user_view(db, current_user["user_id"])
 
     if not user:
         raise HTTPException(
@@ -259,9 +296,9 @@ async def verify_token(
     return {
         "valid": True,
         "user": {
-            "id": user.id,
-            "email": user.email,
-            "name": user.name,
-            "role": user.role,
+            "id": user["id"],
+            "email": user["email"],
+            "name": user["name"],
+            "role": user["role"],
         },
     }
@@ -5,6 +5,7 @@ from typing import List
 
 from utils.database import get_db
 from utils.auth_utils import get_current_user
+from utils.activity import emit_event
 from models.billing_model import Subscription, Invoice
 from schemas.billing_schema import (
     SubscriptionRequest,
@@ -73,6 +74,12 @@ async def subscribe(
 
     await db.commit()
 
+    emit_event(
+        user_id, "billing.subscribed", "subscription", user_id,
+        {"plan": request.plan, "billing_period": request.billing_period},
+        user_name=current_user["email"], audit=True,
+    )
+
     return {
         "message": "Subscription updated",
         "plan": request.plan,
@@ -102,9 +109,16 @@ async def upgrade_plan(
     if not sub:
         raise HTTPException(status_code=404, detail="Subscription not found")
 
+    old_plan = sub.plan
     sub.plan = new_plan
     await db.commit()
 
+    emit_event(
+        user_id, "billing.upgraded", "subscription", user_id,
+        {"from": old_plan, "to": new_plan},
+        user_name=current_user["email"], audit=True,
+    )
+
     return {"message": "Plan upgraded", "plan": new_plan}
 
 
@@ -129,6 +143,11 @@ async def cancel_subscription(
     sub.status = "cancelled"
     await db.commit()
 
+    emit_event(
+        user_id, "billing.cancelled", "subscription", user_id,
+        {"plan": sub.plan}, user_name=current_user["email"], audit=True,
+    )
+
     return {"message": "Subscription cancelled"}
 
 
@@ -0,0 +1,34 @@
+"""
+Debug Routes (development only)
+Mounted when QUERY_PROFILER_ENABLED is set
+"""
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from utils.auth_utils import get_current_user
+from utils.query_profiler import query_profiler
+
+router = APIRouter(prefix="/api/v1/debug", tags=["Debug"])
+
+
+@router.get("/queries")
+async def top_queries(
+    order_by: Literal["total_ms", "mean_ms", "max_ms", "calls", "slow", "n_plus_one"] = "total_ms",
+    limit: int = Query(20, ge=1, le=500),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Statements grouped by fingerprint, most expensive first, with any
+    captured EXPLAIN ANALYZE plan
+    """
+    return {
+        "requests": query_profiler.requests,
+        "statements": query_profiler.top(limit, order_by),
+    }
+
+
+@router.delete("/queries")
+async def reset_queries(current_user: dict = Depends(get_current_user)):
+    query_profiler.reset()
+    return {"message": "Query stats cleared"}
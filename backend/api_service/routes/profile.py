@@ -2,14 +2,20 @@
 Profile Management Routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
 from utils.database import get_db
-from models.auth_models import Profile, User
-from utils.auth_utils import get_current_user, hash_password, verify_password
+from utils.auth_utils import get_current_user, hash_password_async, verify_password_async
+from utils.activity import emit_event
+from utils.user_lookup import (
+    get_profile_by_user_id,
+    get_profile_view,
+    get_user_by_id,
+    invalidate_user,
+)
 
 router = APIRouter(prefix="/api/v1/profile", tags=["Profile"])
 
@@ -25,37 +31,26 @@ class PasswordChange(BaseModel):
 @router.get("")
 async def get_profile(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get current user's profile"""
-    profile = db.query(Profile).filter(Profile.user_id == current_user["id"]).first()
+    """Get current user's profile (cached read model)"""
+    profile = await get_profile_view(db, current_user["user_id"])
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Profile not found"
         )
-    
-    return {
-        "id": profile.id,
-        "user_id": profile.user_id,
-        "full_name": profile.full_name,
-        "email": profile.email,
-        "role": profile.role,
-        "country": profile.country,
-        "phone": profile.phone,
-        "avatar_url": profile.avatar_url,
-        "created_at": profile.created_at.isoformat() if profile.created_at else None,
-        "updated_at": profile.updated_at.isoformat() if profile.updated_at else None,
-    }
+
+    return profile
 
 @router.put("")
 async def update_profile(
     profile_data: ProfileUpdate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update current user's profile"""
-    profile = db.query(Profile).filter(Profile.user_id == current_user["id"]).first()
+    profile = await get_profile_by_user_id(db, current_user["user_id"])
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -69,9 +64,10 @@ async def update_profile(
     
     profile.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(profile)
-    
+    await db.commit()
+    await db.refresh(profile)
+    await invalidate_user(current_user["user_id"])
+
     return {
         "message": "Profile updated successfully",
         "profile": {
@@ -87,10 +83,10 @@ async def update_profile(
 async def update_avatar(
     avatar_url: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user's avatar URL"""
-    profile = db.query(Profile).filter(Profile.user_id == current_user["id"]).first()
+    profile = await get_profile_by_user_id(db, current_user["user_id"])
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -100,7 +96,8 @@ async def update_avatar(
     profile.avatar_url = avatar_url
     profile.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
+    await invalidate_user(current_user["user_id"])
     
     return {
         "message": "Avatar updated successfully",
@@ -111,10 +108,10 @@ async def update_avatar(
 async def change_password(
     password_data: PasswordChange,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Change user's password"""
-    user = db.query(User).filter(User.id == current_user["id"]).first()
+    user = await get_user_by_id(db, current_user["user_id"])
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -122,16 +119,22 @@ async def change_password(
         )
     
     # Verify current password
-    if not verify_password(password_data.current_password, user.hashed_password):
+    if not await verify_password_async(password_data.current_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    user.hashed_password = hash_password(password_data.new_password)
+    user.hashed_password = await hash_password_async(password_data.new_password)
     user.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
+    await invalidate_user(current_user["user_id"])
+
+    emit_event(
+        current_user["user_id"], "auth.password_changed", "user", current_user["user_id"],
+        user_name=current_user["email"], audit=True,
+    )
     
     return {"message": "Password changed successfully"}
\ No newline at end of file
@@ -1,14 +1,23 @@
 # tasks.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Optional, Literal, Dict, Any
-from datetime import datetime
-import uuid
+from typing import List, Optional, Literal
+from datetime import datetime, timezone
 
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.task_models import Task as TaskModel, TaskMessage as TaskMessageModel
+from utils.activity import emit_event
 from utils.auth_utils import get_current_user
+from utils.database import get_db
+from utils.pagination import cached_count, invalidate_count
 
 router = APIRouter(prefix="/api/v1/tasks", tags=["Tasks"])
 
+TaskPriority = Literal["critical", "high", "medium", "low"]
+TaskStatus = Literal["pending", "in_progress", "completed", "overdue"]
+
 
 class TaskMessage(BaseModel):
   id: str
@@ -18,195 +27,217 @@ class TaskMessage(BaseModel):
   platform: Literal["internal", "slack", "jira", "email"] = "internal"
 
 
-class Task(BaseModel):
+class TaskSummary(BaseModel):
   id: str
   title: str
   description: Optional[str] = None
-  priority: Literal["critical", "high", "medium", "low"] = "medium"
-  status: Literal["pending", "in_progress", "completed", "overdue"] = "pending"
+  priority: TaskPriority = "medium"
+  status: TaskStatus = "pending"
   assignee_id: Optional[str] = None
   assignee_name: Optional[str] = None
   created_at: str
   due_date: Optional[str] = None
   completed_at: Optional[str] = None
   asset_name: Optional[str] = None
+  message_count: int = 0
+
+
+class Task(TaskSummary):
   messages: List[TaskMessage] = []
 
 
 class TaskListResponse(BaseModel):
-  items: List[Task]
+  items: List[TaskSummary]
   total: int
   page: int
   page_size: int
 
 
-tasks_db: Dict[str, Dict[str, Any]] = {}
-messages_db: Dict[str, List[Dict[str, Any]]] = {}
-
-
-def _seed_tasks_if_empty() -> None:
-  if tasks_db:
-    return
-
-  now = datetime.utcnow().isoformat()
-  example_tasks = [
-    {
-      "id": "1",
-      "title": "Patch CVE-2024-1234 on web server",
-      "description": "Critical vulnerability requires immediate attention",
-      "priority": "critical",
-      "status": "in_progress",
-      "assignee_id": "2",
-      "assignee_name": "Sarah Johnson",
-      "created_at": now,
-      "due_date": now,
-      "completed_at": None,
-      "asset_name": "api.company.com",
-    },
-    {
-      "id": "2",
-      "title": "Update TLS configuration",
-      "description": "Upgrade to TLS 1.3 across all endpoints",
-      "priority": "high",
-      "status": "pending",
-      "assignee_id": "3",
-      "assignee_name": "Mike Chen",
-      "created_at": now,
-      "due_date": now,
-      "completed_at": None,
-      "asset_name": "*.company.com",
-    },
-  ]
-
-  for t in example_tasks:
-    tasks_db[t["id"]] = t
-    messages_db[t["id"]] = []
+async def _get_owned_task(db: AsyncSession, task_id: str, user_id: str) -> TaskModel:
+  result = await db.execute(
+    select(TaskModel).where(TaskModel.id == task_id, TaskModel.user_id == user_id)
+  )
+  task = result.scalar_one_or_none()
+  if not task:
+    raise HTTPException(status_code=404, detail="Task not found")
+  return task
+
+
+async def _load_messages(db: AsyncSession, task_id: str) -> List[dict]:
+  result = await db.execute(
+    select(TaskMessageModel)
+    .where(TaskMessageModel.task_id == task_id)
+    .order_by(TaskMessageModel.created_at, TaskMessageModel.id)
+  )
+  return [m.to_dict() for m in result.scalars().all()]
 
 
 @router.get("", response_model=TaskListResponse)
 async def list_tasks(
   q: Optional[str] = Query(default=None, description="Search by title or assignee"),
-  status: Optional[str] = Query(default=None),
-  priority: Optional[str] = Query(default=None),
-  page: int = 1,
-  page_size: int = 50,
+  status: Optional[TaskStatus] = Query(default=None),
+  priority: Optional[TaskPriority] = Query(default=None),
+  assignee_id: Optional[str] = Query(default=None),
+  page: int = Query(1, ge=1),
+  page_size: int = Query(50, ge=1, le=100),
   current_user: dict = Depends(get_current_user),
+  db: AsyncSession = Depends(get_db),
 ):
-  _seed_tasks_if_empty()
+  """
+  Task summaries only; messages are counted, not embedded
+  (``GET /{task_id}/messages`` loads them).
+  """
+  user_id = current_user["user_id"]
 
-  items = list(tasks_db.values())
+  query = select(TaskModel).where(TaskModel.user_id == user_id)
 
   if q:
-    q_lower = q.lower()
-    items = [
-      t
-      for t in items
-      if q_lower in t["title"].lower()
-      or (t.get("assignee_name") and q_lower in t["assignee_name"].lower())
-    ]
+    query = query.where(or_(
+      TaskModel.title.icontains(q, autoescape=True),
+      TaskModel.assignee_name.icontains(q, autoescape=True),
+    ))
 
   if status:
-    items = [t for t in items if t.get("status") == status]
+    query = query.where(TaskModel.status == status)
 
   if priority:
-    items = [t for t in items if t.get("priority") == priority]
+    query = query.where(TaskModel.priority == priority)
 
-  total = len(items)
-  start = max((page - 1) * page_size, 0)
-  end = start + page_size
+  if assignee_id:
+    query = query.where(TaskModel.assignee_id == assignee_id)
 
-  enriched: List[Task] = []
-  for t in items[start:end]:
-    msgs = [TaskMessage(**m) for m in messages_db.get(t["id"], [])]
-    enriched.append(Task(messages=msgs, **t))
+  total = await cached_count(
+    db,
+    f"tasks:{user_id}",
+    query,
+    {"q": q, "status": status, "priority": priority, "assignee_id": assignee_id},
+  )
 
-  return TaskListResponse(items=enriched, total=total, page=page, page_size=page_size)
+  result = await db.execute(
+    query
+    .order_by(TaskModel.created_at.desc(), TaskModel.id.desc())
+    .offset((page - 1) * page_size)
+    .limit(page_size)
+  )
+  items = [t.to_dict() for t in result.scalars().all()]
+
+  return TaskListResponse(items=items, total=total, page=page, page_size=page_size)
 
 
 class TaskCreateRequest(BaseModel):
   title: str
   description: Optional[str] = None
-  priority: Literal["critical", "high", "medium", "low"] = "medium"
+  priority: TaskPriority = "medium"
   assignee_id: Optional[str] = None
   assignee_name: Optional[str] = None
-  due_date: Optional[str] = None
+  due_date: Optional[datetime] = None
   asset_name: Optional[str] = None
 
 
 @router.post("", response_model=Task)
 async def create_task(
-  payload: TaskCreateRequest, current_user: dict = Depends(get_current_user)
+  payload: TaskCreateRequest,
+  current_user: dict = Depends(get_current_user),
+  db: AsyncSession = Depends(get_db),
 ):
-  _seed_tasks_if_empty()
-  task_id = str(uuid.uuid4())
-  now = datetime.utcnow().isoformat()
-
-  record: Dict[str, Any] = {
-    "id": task_id,
-    "title": payload.title,
-    "description": payload.description,
-    "priority": payload.priority,
-    "status": "pending",
-    "assignee_id": payload.assignee_id,
-    "assignee_name": payload.assignee_name,
-    "created_at": now,
-    "due_date": payload.due_date,
-    "completed_at": None,
-    "asset_name": payload.asset_name,
-  }
-  tasks_db[task_id] = record
-  messages_db[task_id] = []
-  return Task(messages=[], **record)
+  task = TaskModel(
+    user_id=current_user["user_id"],
+    title=payload.title,
+    description=payload.description,
+    priority=payload.priority,
+    status="pending",
+    assignee_id=payload.assignee_id,
+    assignee_name=payload.assignee_name,
+    due_date=payload.due_date,
+    asset_name=payload.asset_name,
+    message_count=0,
+  )
+  db.add(task)
+  await db.commit()
+  await db.refresh(task)
+
+  await invalidate_count(f"tasks:{current_user['user_id']}")
+
+  emit_event(
+    current_user["user_id"], "task.created", "task", task.id,
+    {"title": task.title, "priority": task.priority}, user_name=current_user["email"],
+  )
+
+  return Task(messages=[], **task.to_dict())
 
 
 @router.get("/{task_id}", response_model=Task)
-async def get_task(task_id: str, current_user: dict = Depends(get_current_user)):
-  _seed_tasks_if_empty()
-  task = tasks_db.get(task_id)
-  if not task:
-    raise HTTPException(status_code=404, detail="Task not found")
-  msgs = [TaskMessage(**m) for m in messages_db.get(task_id, [])]
-  return Task(messages=msgs, **task)
+async def get_task(
+  task_id: str,
+  current_user: dict = Depends(get_current_user),
+  db: AsyncSession = Depends(get_db),
+):
+  task = await _get_owned_task(db, task_id, current_user["user_id"])
+  messages = await _load_messages(db, task_id) if task.message_count else []
+  return Task(messages=messages, **task.to_dict())
 
 
 class TaskUpdateRequest(BaseModel):
   title: Optional[str] = None
   description: Optional[str] = None
-  priority: Optional[Literal["critical", "high", "medium", "low"]] = None
-  status: Optional[Literal["pending", "in_progress", "completed", "overdue"]] = None
+  priority: Optional[TaskPriority] = None
+  status: Optional[TaskStatus] = None
   assignee_id: Optional[str] = None
   assignee_name: Optional[str] = None
-  due_date: Optional[str] = None
+  due_date: Optional[datetime] = None
   asset_name: Optional[str] = None
 
 
 @router.patch("/{task_id}", response_model=Task)
 async def update_task(
-  task_id: str, payload: TaskUpdateRequest, current_user: dict = Depends(get_current_user)
+  task_id: str,
+  payload: TaskUpdateRequest,
+  current_user: dict = Depends(get_current_user),
+  db: AsyncSession = Depends(get_db),
 ):
-  _seed_tasks_if_empty()
-  task = tasks_db.get(task_id)
-  if not task:
-    raise HTTPException(status_code=404, detail="Task not found")
+  task = await _get_owned_task(db, task_id, current_user["user_id"])
 
   data = payload.dict(exclude_unset=True)
   # Auto-set completed_at when marking complete
-  if data.get("status") == "completed":
-    data.setdefault("completed_at", datetime.utcnow().isoformat())
+  if data.get("status") == "completed" and task.completed_at is None:
+    data["completed_at"] = datetime.now(timezone.utc)
+
+  for field, value in data.items():
+    setattr(task, field, value)
+
+  await db.commit()
+  await db.refresh(task)
+
+  if "status" in data or "priority" in data or "assignee_id" in data:
+    await invalidate_count(f"tasks:{current_user['user_id']}")
 
-  task.update(data)
-  tasks_db[task_id] = task
-  msgs = [TaskMessage(**m) for m in messages_db.get(task_id, [])]
-  return Task(messages=msgs, **task)
+  emit_event(
+    current_user["user_id"], "task.updated", "task", task_id,
+    {"fields": sorted(data)}, user_name=current_user["email"],
+  )
+
+  messages = await _load_messages(db, task_id) if task.message_count else []
+  return Task(messages=messages, **task.to_dict())
 
 
 @router.delete("/{task_id}")
-async def delete_task(task_id: str, current_user: dict = Depends(get_current_user)):
-  _seed_tasks_if_empty()
-  if task_id not in tasks_db:
-    raise HTTPException(status_code=404, detail="Task not found")
-  del tasks_db[task_id]
-  messages_db.pop(task_id, None)
+async def delete_task(
+  task_id: str,
+  current_user: dict = Depends(get_current_user),
+  db: AsyncSession = Depends(get_db),
+):
+  task = await _get_owned_task(db, task_id, current_user["user_id"])
+  # task_messages go with it (ON DELETE CASCADE)
+  await db.delete(task)
+  await db.commit()
+
+  await invalidate_count(f"tasks:{current_user['user_id']}")
+
+  emit_event(
+    current_user["user_id"], "task.deleted", "task", task_id,
+    {"title": task.title}, user_name=current_user["email"],
+  )
+
   return {"message": "Task deleted successfully"}
 
 
@@ -217,12 +248,12 @@ class MessageCreateRequest(BaseModel):
 
 @router.get("/{task_id}/messages", response_model=List[TaskMessage])
 async def list_messages(
-  task_id: str, current_user: dict = Depends(get_current_user)
+  task_id: str,
+  current_user: dict = Depends(get_current_user),
+  db: AsyncSession = Depends(get_db),
 ):
-  _seed_tasks_if_empty()
-  if task_id not in tasks_db:
-    raise HTTPException(status_code=404, detail="Task not found")
-  return [TaskMessage(**m) for m in messages_db.get(task_id, [])]
+  await _get_owned_task(db, task_id, current_user["user_id"])
+  return await _load_messages(db, task_id)
 
 
 @router.post("/{task_id}/messages", response_model=TaskMessage)
@@ -230,19 +261,29 @@ async def create_message(
   task_id: str,
   payload: MessageCreateRequest,
   current_user: dict = Depends(get_current_user),
+  db: AsyncSession = Depends(get_db),
 ):
-  _seed_tasks_if_empty()
-  if task_id not in tasks_db:
-    raise HTTPException(status_code=404, detail="Task not found")
-
-  msg_id = str(uuid.uuid4())
-  record = {
-    "id": msg_id,
-    "sender": current_user.get("name", "System"),
-    "message": payload.message,
-    "timestamp": datetime.utcnow().isoformat(),
-    "platform": payload.platform,
-  }
-  messages_db.setdefault(task_id, []).append(record)
-  return TaskMessage(**record)
-
+  await _get_owned_task(db, task_id, current_user["user_id"])
+
+  message = TaskMessageModel(
+    task_id=task_id,
+    sender=current_user.get("email") or "System",
+    message=payload.message,
+    platform=payload.platform,
+  )
+  db.add(message)
+  # Atomic increment, no read-modify-write race between writers
+  await db.execute(
+    update(TaskModel)
+    .where(TaskModel.id == task_id)
+    .values(message_count=TaskModel.message_count + 1)
+  )
+  await db.commit()
+  await db.refresh(message)
+
+  emit_event(
+    current_user["user_id"], "task.commented", "task", task_id,
+    {"platform": payload.platform}, user_name=current_user["email"],
+  )
+
+  return message.to_dict()
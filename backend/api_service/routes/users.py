@@ -2,12 +2,14 @@
 User Management Routes - PostgreSQL Version
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from pydantic import BaseModel
 from utils.database import get_db
 from models.auth_models import User as UserModel
 from utils.auth_utils import get_current_user
+from utils.user_lookup import get_user_by_id, get_user_view, invalidate_user, user_view
 
 router = APIRouter(prefix="/api/v1/users", tags=["Users"])
 
@@ -16,44 +18,74 @@ class User(BaseModel):
     name: str
     email: str
     role: str
-    company_id: str
+    company_id: Optional[str] = None
 
 class UserUpdate(BaseModel):
     name: str = None
     role: str = None
 
+
+def _to_user(user: dict) -> User:
+    return User(
+        id=user["id"],
+        name=user["name"],
+        email=user["email"],
+        role=user["role"],
+        company_id=user["company_id"]
+    )
+
+
+async def _require_user_view(db: AsyncSession, user_id: str) -> dict:
+    user = await get_user_view(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+
+async def _require_user(
+    db: AsyncSession,
+    user_id: str,
+    with_profile: bool = False,
+) -> UserModel:
+    user = await get_user_by_id(db, user_id, with_profile=with_profile)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
 @router.get("/me", response_model=User)
-async def get_current_user_info(current_user: dict = Depends(get_current_user)):
+async def get_current_user_info(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Get current authenticated user information
     """
-    return User(
-        id=current_user["id"],
-        name=current_user["name"],
-        email=current_user["email"],
-        role=current_user["role"],
-        company_id=current_user["company_id"]
-    )
+    return _to_user(await _require_user_view(db, current_user["user_id"]))
 
 @router.get("", response_model=List[User])
 async def list_users(
-    skip: int = 0, 
-    limit: int = 100, 
+    skip: int = 0,
+    limit: int = 100,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     List all users (paginated)
     """
     try:
-        users = db.query(UserModel).offset(skip).limit(limit).all()
-        return [User(
-            id=u.id,
-            name=u.name,
-            email=u.email,
-            role=u.role,
-            company_id=u.company_id
-        ) for u in users]
+        result = await db.execute(
+            select(UserModel)
+            .order_by(UserModel.created_at, UserModel.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return [_to_user(user_view(u)) for u in result.scalars().all()]
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -62,100 +94,86 @@ async def list_users(
 
 @router.get("/{user_id}", response_model=User)
 async def get_user(
-    user_id: str, 
+    user_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a specific user by ID
     """
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return User(
-        id=user.id,
-        name=user.name,
-        email=user.email,
-        role=user.role,
-        company_id=user.company_id
-    )
+    return _to_user(await _require_user_view(db, user_id))
 
 @router.put("/{user_id}", response_model=User)
 async def update_user(
-    user_id: str, 
-    user_data: UserUpdate, 
+    user_id: str,
+    user_data: UserUpdate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update user information
     """
     # Find user
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
+    user = await _require_user(db, user_id)
+
     # Check permission - users can only update their own profile unless admin
-    if current_user["id"] != user_id and current_user.get("role") != "admin":
+    actor = await get_user_view(db, current_user["user_id"])
+    is_admin = actor is not None and actor["role"] == "admin"
+
+    if current_user["user_id"] != user_id and not is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this user"
         )
-    
+
+    if user_data.role is not None and not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can change roles"
+        )
+
     # Update user data
     update_data = user_data.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(user, key, value)
-    
-    db.commit()
-    db.refresh(user)
-    
-    return User(
-        id=user.id,
-        name=user.name,
-        email=user.email,
-        role=user.role,
-        company_id=user.company_id
-    )
+
+    await db.commit()
+    await db.refresh(user)
+    await invalidate_user(user_id)
+
+    return _to_user(user_view(user))
 
 @router.delete("/{user_id}")
 async def delete_user(
-    user_id: str, 
+    user_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a user
     """
     # Only admins can delete users
-    if current_user.get("role") != "admin":
+    actor = await get_user_view(db, current_user["user_id"])
+    if not actor or actor["role"] != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can delete users"
         )
-    
-    # Find user
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
+
     # Prevent self-deletion
-    if current_user["id"] == user_id:
+    if current_user["user_id"] == user_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete your own account"
         )
-    
-    db.delete(user)
-    db.commit()
-    
-    return {"message": "User deleted successfully", "user_id": user_id}
\ No newline at end of file
+
+    # Find user (profile loaded so it can go with it)
+    user = await _require_user(db, user_id, with_profile=True)
+
+    if user.profile is not None:
+        await db.delete(user.profile)
+    await db.delete(user)
+    await db.commit()
+    await invalidate_user(user_id)
+
+    return {"message": "User deleted successfully", "user_id": user_id}
@@ -1,17 +1,48 @@
 # vs.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional
+import asyncio
+import json
 import uuid
 
 router = APIRouter(prefix="/api/v1/scans", tags=["Vulnerability Scanning"])
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from models.vs_models import VsScan
 from utils.auth_utils import get_current_user
+from utils.database import AsyncSessionLocal, get_db
+from utils.outbox import enqueue, outbox_relay
+from utils.scan_events import scan_event_hub
+from utils.vs_results import TERMINAL_STATUSES, VS_JOBS_QUEUE, scan_event
+from utils.asm_stats import get_asset_count
+from utils.vs_analytics import coverage_percent, get_mttr, get_scanned_target_count
+from utils.vs_findings import delete_scan_findings, get_scan_findings, get_severity_counts
+
+
+async def _get_owned_scan(db: AsyncSession, scan_id: str, user_id: str) -> VsScan:
+    result = await db.execute(
+        select(VsScan).where(VsScan.id == scan_id, VsScan.user_id == user_id)
+    )
+    scan = result.scalar_one_or_none()
+    if not scan:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    return scan
+
+
+def _job_message(scan: VsScan) -> dict:
+    return {
+        "type": "vs",
+        "user_id": scan.user_id,
+        "scan_id": scan.id,
+        "target": scan.target,
+        "scan_type": scan.scan_type,
+    }
 
-# Mock databases
-scans_db: Dict[str, Dict[str, Any]] = {}
-results_db: Dict[str, Dict[str, Any]] = {}
 
 class ScanRequest(BaseModel):
     name: str
@@ -42,6 +73,8 @@ class VSDashboard(BaseModel):
     medium: int
     low: int
     avg_mttr_days: float
+    mttr_p50_days: float = 0.0
+    mttr_p90_days: float = 0.0
     scan_coverage: int
 
 
@@ -49,142 +82,174 @@ vs_router = APIRouter(prefix="/api/v1/vs", tags=["Vulnerability Scanning (VS)"])
 
 
 @vs_router.get("/dashboard", response_model=VSDashboard)
-async def get_vs_dashboard(current_user: dict = Depends(get_current_user)):
+async def get_vs_dashboard(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Minimal VS dashboard endpoint derived from in-memory scans/results.
+    VS dashboard. Every number is a read of pre-aggregated state:
+    severity rollup, MTTR aggregate states, daily scanned-target states.
     """
-    # Ensure at least one completed scan result exists so UI has data
-    if not scans_db:
-        scan_id = "example-scan"
-        scans_db[scan_id] = {
-            "id": scan_id,
-            "name": "Example Scan",
-            "target": "api.company.com",
-            "scan_type": "external",
-            "frequency": "weekly",
-            "status": "completed",
-            "created_at": datetime.utcnow().isoformat(),
-        }
-
-    # Populate a synthetic results entry for each scan if missing
-    for scan_id, scan in scans_db.items():
-        if scan_id not in results_db:
-            results_db[scan_id] = {
-                "id": scan_id,
-                "scan_type": scan["scan_type"],
-                "target": scan["target"],
-                "status": "completed",
-                "results": [
-                    {
-                        "cve": "CVE-2024-0001",
-                        "severity": "critical",
-                        "exploitability_score": 9.8,
-                        "description": "Remote code execution vulnerability",
-                        "remediation": "Update to version 2.0.1",
-                    }
-                ],
-                "created_at": scan["created_at"],
-            }
-
-    # Aggregate severity counts
-    critical = high = medium = low = 0
-    for result in results_db.values():
-        for v in result.get("results", []):
-            sev = v.get("severity", "").lower()
-            if sev == "critical":
-                critical += 1
-            elif sev == "high":
-                high += 1
-            elif sev == "medium":
-                medium += 1
-            elif sev == "low":
-                low += 1
-
-    total = critical + high + medium + low
-    if total == 0:
-        # Avoid division by zero and just return zeros
-        return VSDashboard(
-            total_vulnerabilities=0,
-            critical=0,
-            high=0,
-            medium=0,
-            low=0,
-            avg_mttr_days=0.0,
-            scan_coverage=0,
-        )
-
-    # Synthetic MTTR and coverage for now
-    avg_mttr_days = 4.2
-    scan_coverage = 87
+    user_id = current_user["user_id"]
+
+    counts = await get_severity_counts(user_id)
+    mttr = await get_mttr(user_id)
+    scanned = await get_scanned_target_count(user_id)
+    if counts is None or mttr is None or scanned is None:
+        raise HTTPException(status_code=503, detail="Findings store unavailable")
+
+    asset_count = await get_asset_count(db, user_id)
 
     return VSDashboard(
-        total_vulnerabilities=total,
-        critical=critical,
-        high=high,
-        medium=medium,
-        low=low,
-        avg_mttr_days=avg_mttr_days,
-        scan_coverage=scan_coverage,
+        total_vulnerabilities=sum(counts.values()),
+        critical=counts["critical"],
+        high=counts["high"],
+        medium=counts["medium"],
+        low=counts["low"],
+        avg_mttr_days=mttr["avg_days"],
+        mttr_p50_days=mttr["p50_days"],
+        mttr_p90_days=mttr["p90_days"],
+        scan_coverage=coverage_percent(scanned, asset_count),
     )
 
+# ---------------------------------------------------
+# Scans
+# ---------------------------------------------------
 @router.post("")
-async def create_scan(request: ScanRequest, current_user: dict = Depends(get_current_user)):
-    scan_id = str(uuid.uuid4())
-    scans_db[scan_id] = {
-        "id": scan_id,
-        "name": request.name,
-        "target": request.target,
-        "scan_type": request.scan_type,
-        "frequency": request.frequency,
-        "status": "running",
-        "created_at": datetime.utcnow().isoformat()
-    }
-    # TODO: Queue scan job for background worker
-    return {"scan_id": scan_id, "status": "running"}
+async def create_scan(
+    request: ScanRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    scan = VsScan(
+        id=str(uuid.uuid4()),
+        user_id=current_user["user_id"],
+        name=request.name,
+        target=request.target,
+        scan_type=request.scan_type,
+        frequency=request.frequency,
+        status="queued",
+        progress=0,
+    )
+    db.add(scan)
+    # Published by the outbox relay once this commits
+    enqueue(db, VS_JOBS_QUEUE, _job_message(scan))
+    await db.commit()
+    outbox_relay.wake()
+
+    return {"scan_id": scan.id, "status": scan.status}
 
 @router.get("", response_model=List[dict])
-async def list_scans(skip: int = 0, limit: int = 100, current_user: dict = Depends(get_current_user)):
-    scans = list(scans_db.values())[skip:skip+limit]
-    return scans
+async def list_scans(
+    skip: int = 0,
+    limit: int = 100,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        select(VsScan)
+        .where(VsScan.user_id == current_user["user_id"])
+        .order_by(VsScan.created_at.desc(), VsScan.id.desc())
+        .offset(skip)
+        .limit(min(limit, 100))
+    )
+    return [scan.to_dict() for scan in result.scalars().all()]
 
 @router.get("/{scan_id}", response_model=ScanResult)
-async def get_scan(scan_id: str, current_user: dict = Depends(get_current_user)):
-    scan = scans_db.get(scan_id)
-    if not scan:
-        raise HTTPException(status_code=404, detail="Scan not found")
-    
-    if scan_id not in results_db:
-        results_db[scan_id] = {
-            "id": scan_id,
-            "scan_type": scan["scan_type"],
-            "target": scan["target"],
-            "status": "completed",
-            "results": [
-                {
-                    "cve": "CVE-2024-0001",
-                    "severity": "critical",
-                    "exploitability_score": 9.8,
-                    "description": "Remote code execution vulnerability",
-                    "remediation": "Update to version 2.0.1"
-                }
-            ],
-            "created_at": scan["created_at"]
-        }
-    
-    return ScanResult(**results_db[scan_id])
+async def get_scan(
+    scan_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    scan = await _get_owned_scan(db, scan_id, current_user["user_id"])
+
+    findings = await get_scan_findings(current_user["user_id"], scan_id)
+    if findings is None:
+        raise HTTPException(status_code=503, detail="Findings store unavailable")
+
+    return ScanResult(
+        id=scan.id,
+        scan_type=scan.scan_type,
+        target=scan.target,
+        status=scan.status,
+        results=findings,
+        created_at=scan.created_at.isoformat() if scan.created_at else "",
+    )
+
+@router.get("/{scan_id}/events")
+async def stream_scan_events(
+    scan_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Server-Sent Events: current state first, then every status/progress
+    change until the scan completes or fails.
+    """
+    user_id = current_user["user_id"]
+
+    # Own short-lived session: a request-scoped one would pin a pool
+    # connection for as long as the stream stays open
+    async with AsyncSessionLocal() as session:
+        await _get_owned_scan(session, scan_id, user_id)
+
+    async def event_stream():
+        async with scan_event_hub.subscribe(scan_id) as queue:
+            # Snapshot after subscribing, so no update falls in between
+            async with AsyncSessionLocal() as session:
+                scan = await _get_owned_scan(session, scan_id, user_id)
+                snapshot = scan_event(scan)
+
+            yield f"data: {json.dumps(snapshot)}\n\n"
+            if snapshot["status"] in TERMINAL_STATUSES:
+                return
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), settings.VS_SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield ": ping\n\n"
+                    continue
+
+                yield f"data: {json.dumps(event)}\n\n"
+                if event.get("status") in TERMINAL_STATUSES:
+                    return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/{scan_id}/retest")
-async def retest_scan(scan_id: str, current_user: dict = Depends(get_current_user)):
-    scan = scans_db.get(scan_id)
-    if not scan:
-        raise HTTPException(status_code=404, detail="Scan not found")
-    scan["status"] = "running"
-    return {"scan_id": scan_id, "status": "running"}
+async def retest_scan(
+    scan_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    scan = await _get_owned_scan(db, scan_id, current_user["user_id"])
+    if scan.status in ("queued", "running"):
+        raise HTTPException(status_code=409, detail="Scan already in progress")
+
+    scan.status = "queued"
+    scan.progress = 0
+    scan.error = None
+    enqueue(db, VS_JOBS_QUEUE, _job_message(scan))
+    await db.commit()
+    outbox_relay.wake()
+
+    return {"scan_id": scan_id, "status": scan.status}
 
 @router.delete("/{scan_id}")
-async def delete_scan(scan_id: str, current_user: dict = Depends(get_current_user)):
-    if scan_id not in scans_db:
-        raise HTTPException(status_code=404, detail="Scan not found")
-    del scans_db[scan_id]
+async def delete_scan(
+    scan_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    scan = await _get_owned_scan(db, scan_id, current_user["user_id"])
+    if not await delete_scan_findings(current_user["user_id"], scan_id):
+        raise HTTPException(status_code=503, detail="Findings store unavailable")
+    await db.delete(scan)
+    await db.commit()
     return {"message": "Scan deleted successfully"}
-
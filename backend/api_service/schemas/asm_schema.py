@@ -54,9 +54,10 @@ class AsmDiscoveryResponse(BaseModel):
 # ---------------------------------------------------
 class AsmDiscoveryListResponse(BaseModel):
     items: List[AsmDiscoveryResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 # ---------------------------------------------------
@@ -24,9 +24,10 @@ class AssetResponse(BaseModel):
 # ---------------------------------------------------
 class AssetListResponse(BaseModel):
     items: List[AssetResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 # ---------------------------------------------------
@@ -50,3 +51,26 @@ class AssetUpdateRequest(BaseModel):
     status: Optional[str] = None
     risk_score: Optional[int] = None
     description: Optional[str] = None
+
+
+# ---------------------------------------------------
+# Asset Bulk Import
+# ---------------------------------------------------
+class AssetImportError(BaseModel):
+    line: int
+    error: str
+
+
+class AssetImportProgress(BaseModel):
+    import_id: str
+    state: Literal["running", "completed", "aborted", "failed"]
+    processed: int
+    inserted: int
+    updated: int
+    failed: int
+    elapsed_seconds: float
+
+
+class AssetBulkImportResponse(AssetImportProgress):
+    errors: List[AssetImportError]
+    errors_truncated: bool
@@ -0,0 +1,176 @@
+import asyncio
+import json
+
+from utils.consumer import BatchConsumer
+
+
+class FakeMessage:
+    def __init__(self, log: list, payload: dict):
+        self.log = log
+        self.body = json.dumps(payload).encode()
+        self.payload = payload
+
+    async def ack(self, multiple: bool = False):
+        self.log.append(("ack", self.payload["n"], multiple))
+
+    async def nack(self, requeue: bool = True):
+        self.log.append(("nack", self.payload["n"], requeue))
+
+
+class FakeQueue:
+    def __init__(self):
+        self.callback = None
+
+    async def consume(self, callback, no_ack=False):
+        self.callback = callback
+        return "tag"
+
+    async def cancel(self, tag):
+        self.callback = None
+
+
+class FakeChannel:
+    def __init__(self, log: list):
+        self.log = log
+        self.queue = FakeQueue()
+        self.is_closed = False
+
+    async def set_qos(self, prefetch_count):
+        pass
+
+    async def declare_queue(self, name, durable=True):
+        return self.queue
+
+    async def close(self):
+        self.log.append(("close",))
+        self.is_closed = True
+
+
+class FakeConnection:
+    def __init__(self, log: list):
+        self.log = log
+        self.channels: list[FakeChannel] = []
+
+    async def channel(self):
+        channel = FakeChannel(self.log)
+        self.channels.append(channel)
+        return channel
+
+
+def test_stop_finishes_in_flight_batch_and_partial_batch_before_closing():
+    async def scenario():
+        log: list = []
+        connection = FakeConnection(log)
+        release = asyncio.Event()
+        handled: list[list[int]] = []
+
+        async def handler(payloads):
+            handled.append([p["n"] for p in payloads])
+            if len(handled) == 1:
+                await release.wait()
+
+        async def factory():
+            return connection
+
+        consumer = BatchConsumer(
+            "jobs.test", handler,
+            batch_size=2, batch_timeout=30, concurrency=1,
+            connection_factory=factory,
+        )
+        assert await consumer.start()
+        deliver = connection.channels[0].queue.callback
+
+        for n in (1, 2, 3):
+            await deliver(FakeMessage(log, {"n": n}))
+        # batch [1, 2] is in the handler, 3 sits in a partial batch
+        while not handled:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+
+        stopping = asyncio.create_task(consumer.stop())
+        await asyncio.sleep(0.01)
+        assert ("close",) not in log
+
+        release.set()
+        await stopping
+
+        assert handled == [[1, 2], [3]]
+        assert log == [("ack", 2, True), ("ack", 3, True), ("close",)]
+
+    asyncio.run(scenario())
+
+
+def test_poison_message_is_dead_lettered_and_rest_acked(monkeypatch):
+    async def scenario():
+        log: list = []
+        connection = FakeConnection(log)
+        dead: list = []
+
+        async def handler(payloads):
+            if any(p["n"] == 2 for p in payloads):
+                raise ValueError("bad")
+
+        async def publish_many(queue_name, messages):
+            dead.append((queue_name, [m["payload"]["n"] for m in messages]))
+            return [True] * len(messages)
+
+        async def factory():
+            return connection
+
+        from utils import consumer as consumer_module
+        monkeypatch.setattr(consumer_module.publisher, "publish_many", publish_many)
+
+        consumer = BatchConsumer(
+            "jobs.test", handler,
+            batch_size=3, batch_timeout=30, concurrency=1,
+            connection_factory=factory,
+        )
+        await consumer.start()
+        deliver = connection.channels[0].queue.callback
+        for n in (1, 2, 3):
+            await deliver(FakeMessage(log, {"n": n}))
+        await consumer.stop()
+
+        assert dead == [("jobs.test.dead", [2])]
+        assert ("ack", 3, True) in log
+        assert consumer.stats["dead_lettered"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_worker_survives_a_batch_that_cannot_be_settled(monkeypatch):
+    async def scenario():
+        log: list = []
+        connection = FakeConnection(log)
+        handled: list[list[int]] = []
+
+        async def handler(payloads):
+            handled.append([p["n"] for p in payloads])
+            if payloads[0]["n"] == 1:
+                raise ValueError("bad")
+
+        async def publish_many(queue_name, messages):
+            raise ConnectionError("broker gone")
+
+        async def factory():
+            return connection
+
+        from utils import consumer as consumer_module
+        monkeypatch.setattr(consumer_module.publisher, "publish_many", publish_many)
+
+        consumer = BatchConsumer(
+            "jobs.test", handler,
+            batch_size=1, batch_timeout=30, concurrency=1,
+            connection_factory=factory,
+        )
+        await consumer.start()
+        deliver = connection.channels[0].queue.callback
+        await deliver(FakeMessage(log, {"n": 1}))
+        await deliver(FakeMessage(log, {"n": 2}))
+        await asyncio.wait_for(consumer.stop(), timeout=5)
+
+        # message 1 is requeued, the worker went on to 2
+        assert handled == [[1], [2]]
+        assert log == [("nack", 1, True), ("ack", 2, True), ("close",)]
+
+    asyncio.run(scenario())
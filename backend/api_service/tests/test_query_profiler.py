@@ -0,0 +1,25 @@
+from utils.query_profiler import _analyzable, _explainable, normalize
+
+
+def test_normalize_collapses_literals_and_lists():
+    assert (
+        normalize("SELECT * FROM t WHERE id IN ($1, $2, $3) AND x = 'a' AND n > 10")
+        == "SELECT * FROM t WHERE id IN (...) AND x = ? AND n > ?"
+    )
+
+
+def test_only_plain_reads_are_explain_analyzed():
+    assert _analyzable(normalize("SELECT id FROM users WHERE email = $1"))
+    for sql in (
+        "SELECT pg_advisory_lock($1)",
+        "SELECT pg_try_advisory_xact_lock(hashtext($1))",
+        "SELECT nextval('tasks_seq')",
+        "SELECT setval('tasks_seq', 10)",
+        "SELECT * FROM tasks WHERE id = $1 FOR UPDATE",
+    ):
+        normalized = normalize(sql)
+        assert _explainable(normalized)
+        assert not _analyzable(normalized), sql
+
+    assert not _explainable(normalize("UPDATE tasks SET status = $1"))
+    assert not _explainable(normalize("WITH x AS (DELETE FROM t RETURNING id) SELECT * FROM x"))
@@ -0,0 +1,122 @@
+import asyncio
+
+from utils.queue import ChannelPool, QueuePublisher
+
+
+class FakeExchange:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def publish(self, message, routing_key):
+        if self.channel.broker.reject:
+            raise ConnectionError("nacked")
+        self.channel.broker.published.append(routing_key)
+
+
+class FakeChannel:
+    def __init__(self, broker):
+        self.broker = broker
+        self.is_closed = False
+        self.default_exchange = FakeExchange(self)
+
+    async def declare_queue(self, name, durable=True):
+        self.broker.declared.append(name)
+
+    async def close(self):
+        self.is_closed = True
+
+
+class FakeBroker:
+    """
+    Stand-in connection: counts channels and records publishes
+    """
+
+    def __init__(self):
+        self.opened: list[FakeChannel] = []
+        self.published: list[str] = []
+        self.declared: list[str] = []
+        self.reject = False
+        self.down = False
+
+    async def channel(self, publisher_confirms=True):
+        channel = FakeChannel(self)
+        self.opened.append(channel)
+        return channel
+
+    async def connect(self):
+        return None if self.down else self
+
+
+def test_waiter_wakes_when_a_closed_channel_is_released():
+    async def scenario():
+        broker = FakeBroker()
+        pool = ChannelPool(1, broker.connect)
+
+        first = await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        # broker reset while the channel was in use
+        first.is_closed = True
+        pool.release(first)
+
+        second = await asyncio.wait_for(waiter, timeout=1)
+        assert second is not first and not second.is_closed
+        assert len(broker.opened) == 2
+        pool.release(second)
+
+    asyncio.run(scenario())
+
+
+def test_pool_reuses_channels_up_to_size():
+    async def scenario():
+        broker = FakeBroker()
+        pool = ChannelPool(2, broker.connect)
+
+        assert await pool.fill() == 2
+        channels = [await pool.acquire(), await pool.acquire()]
+        assert set(channels) == set(broker.opened)
+
+        third = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        assert not third.done()
+        pool.release(channels[0])
+        assert await asyncio.wait_for(third, timeout=1) is channels[0]
+        assert len(broker.opened) == 2
+
+    asyncio.run(scenario())
+
+
+def test_unavailable_broker_gives_back_capacity():
+    async def scenario():
+        broker = FakeBroker()
+        broker.down = True
+        pool = ChannelPool(1, broker.connect)
+
+        assert await pool.acquire() is None
+        broker.down = False
+        channel = await asyncio.wait_for(pool.acquire(), timeout=1)
+        assert channel is not None
+
+    asyncio.run(scenario())
+
+
+def test_publisher_declares_once_and_reports_per_message():
+    async def scenario():
+        broker = FakeBroker()
+        publisher = QueuePublisher(pool_size=1, confirm_batch=2, connection_factory=broker.connect)
+
+        assert await publisher.publish_many("jobs.a", [{"n": n} for n in range(3)]) == [True] * 3
+        assert await publisher.publish("jobs.a", {"n": 3})
+        assert broker.declared == ["jobs.a"]
+        assert broker.published == ["jobs.a"] * 4
+
+        broker.reject = True
+        assert await publisher.publish_many("jobs.a", [{"n": 4}, {"n": 5}]) == [False, False]
+
+        broker.down = True
+        await publisher.close()
+        assert await publisher.publish("jobs.a", {"n": 6}) is False
+
+    asyncio.run(scenario())
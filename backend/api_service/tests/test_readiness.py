@@ -0,0 +1,25 @@
+import asyncio
+
+from utils import readiness
+
+
+def test_failed_startup_step_is_retried_in_the_background(monkeypatch):
+    monkeypatch.setattr(readiness.settings, "STARTUP_RETRY_INTERVAL", 0.01)
+
+    async def scenario():
+        calls = 0
+
+        async def step():
+            nonlocal calls
+            calls += 1
+            if calls < 3:
+                raise RuntimeError("schema pending")
+
+        assert not await readiness.run_startup_step("schema", step)
+        assert "schema" in readiness._failed_steps
+
+        await asyncio.wait_for(readiness._retry_task, timeout=1)
+        assert calls == 3
+        assert "schema" not in readiness._failed_steps
+
+    asyncio.run(scenario())
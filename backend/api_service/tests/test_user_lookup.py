@@ -0,0 +1,113 @@
+"""
+User / profile lookups must only await I/O: N concurrent lookups against
+a session with fixed latency take about one round trip, and the event
+loop keeps ticking meanwhile.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from models.auth_models import Profile, User
+from utils import cache, user_lookup
+
+LATENCY = 0.05
+CONCURRENCY = 50
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def scalar_one_or_none(self):
+        return self.row
+
+
+class SlowSession:
+    """
+    AsyncSession stand-in: every statement takes LATENCY on the "network"
+    """
+
+    def __init__(self):
+        self.statements = 0
+
+    async def execute(self, statement):
+        self.statements += 1
+        await asyncio.sleep(LATENCY)
+        entity = statement.column_descriptions[0]["entity"]
+        if entity is User:
+            return FakeResult(User(id="u1", email="a@b.c", name="A", role="admin", is_active=True))
+        return FakeResult(Profile(id="p1", user_id="u1", full_name="A", email="a@b.c"))
+
+
+async def _measure(lookups) -> tuple[float, float]:
+    """
+    (wall time, longest event loop stall) while running ``lookups``
+    """
+    stall = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.005)
+            last = now
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.perf_counter()
+    await asyncio.gather(*lookups)
+    elapsed = time.perf_counter() - started
+    done = True
+    await beat
+    return elapsed, stall
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    async def get_redis():
+        return None
+
+    monkeypatch.setattr(cache, "get_redis", get_redis)
+    user_lookup.user_cache._local.clear()
+    user_lookup.profile_cache._local.clear()
+
+
+def test_concurrent_user_lookups_do_not_block_the_loop():
+    async def scenario():
+        session = SlowSession()
+        elapsed, stall = await _measure(
+            user_lookup.get_user_by_id(session, f"u{n}") for n in range(CONCURRENCY)
+        )
+        assert session.statements == CONCURRENCY
+        # serialized would be CONCURRENCY * LATENCY = 2.5s
+        assert elapsed < LATENCY * 5
+        assert stall < LATENCY
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_profile_views_share_one_load():
+    async def scenario():
+        session = SlowSession()
+        elapsed, stall = await _measure(
+            user_lookup.get_profile_view(session, "u1") for _ in range(CONCURRENCY)
+        )
+        # single-flight: one query for the whole burst
+        assert session.statements == 1
+        assert elapsed < LATENCY * 5
+        assert stall < LATENCY
+
+        views = await asyncio.gather(
+            user_lookup.get_user_view(session, "u1"),
+            user_lookup.get_profile_view(session, "u1"),
+        )
+        assert views[0]["role"] == "admin"
+        assert views[1]["full_name"] == "A"
+        # user view loaded once, profile served from the local cache
+        assert session.statements == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,198 @@
+"""
+Activity Feed & Audit Log (ClickHouse)
+
+Routes call ``emit_event`` - a synchronous append to the ClickHouse
+writer's in-memory buffer (no I/O, never raises), so recording an event
+adds nothing measurable to the request. The writer bulk-inserts into
+``activity_events``, ordered by (user_id, created_at) so a user's feed is
+one contiguous range read.
+"""
+
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from config.settings import settings
+from utils.clickhouse_client import get_clickhouse
+from utils.clickhouse_writer import clickhouse_writer
+from utils.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_TABLE = "activity_events"
+
+ACTIVITY_COLUMNS = [
+    "id",
+    "user_id",
+    "user_name",
+    "action",
+    "category",
+    "resource_type",
+    "resource_id",
+    "details",
+    "ip_address",
+    "user_agent",
+    "audit",
+    "created_at",
+]
+
+SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {ACTIVITY_TABLE} (
+        id String,
+        user_id String,
+        user_name String,
+        action LowCardinality(String),
+        category LowCardinality(String),
+        resource_type LowCardinality(String),
+        resource_id String,
+        details String,
+        ip_address String,
+        user_agent String,
+        audit UInt8,
+        created_at DateTime64(3, 'UTC')
+    )
+    ENGINE = MergeTree
+    PARTITION BY toYYYYMM(created_at)
+    ORDER BY (user_id, created_at, id)
+    TTL toDateTime(created_at) + INTERVAL {settings.ACTIVITY_RETENTION_DAYS} DAY
+    """,
+]
+
+clickhouse_writer.register_table(ACTIVITY_TABLE, ACTIVITY_COLUMNS)
+
+
+async def ensure_activity_schema() -> bool:
+    client = await get_clickhouse()
+    if client is None:
+        logger.warning("ClickHouse not available, activity schema not ensured")
+        return False
+
+    try:
+        for statement in SCHEMA:
+            await client.command(statement)
+    except Exception as e:
+        logger.error(f"Failed to create activity schema: {e}")
+        return False
+    return True
+
+
+# -------------------------------------------------------------------
+# Emit
+# -------------------------------------------------------------------
+def emit_event(
+    user_id: str,
+    action: str,
+    resource_type: str = "",
+    resource_id: Optional[str] = None,
+    details: Optional[dict] = None,
+    user_name: Optional[str] = None,
+    audit: bool = False,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> None:
+    """
+    Record an event, e.g. emit_event(uid, "asset.created", "asset", asset.id).
+    ``action`` is "<category>.<verb>"; ``audit=True`` also lists it in the
+    audit log. Dropped (and counted) if the writer is saturated.
+    """
+    try:
+        clickhouse_writer.write_nowait(ACTIVITY_TABLE, {
+            "id": uuid.uuid4().hex,
+            "user_id": user_id or "",
+            "user_name": user_name or "",
+            "action": action,
+            "category": action.split(".", 1)[0],
+            "resource_type": resource_type or "",
+            "resource_id": resource_id or "",
+            "details": json.dumps(details, default=str) if details else "",
+            "ip_address": ip_address or "",
+            "user_agent": user_agent or "",
+            "audit": 1 if audit else 0,
+            "created_at": datetime.utcnow(),
+        })
+    except Exception:
+        logger.exception(f"Failed to record {action} event")
+
+
+# -------------------------------------------------------------------
+# Query
+# -------------------------------------------------------------------
+def _row_to_event(row: tuple) -> dict:
+    (event_id, user_id, user_name, action, _category, resource_type,
+     resource_id, details, ip_address, user_agent, _audit, created_at) = row
+    return {
+        "id": event_id,
+        "user_id": user_id,
+        "user_name": user_name,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id or None,
+        "details": json.loads(details) if details else None,
+        "ip_address": ip_address or None,
+        "user_agent": user_agent or None,
+        "created_at": created_at.isoformat(),
+    }
+
+
+async def query_events(
+    user_id: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    types: Optional[list[str]] = None,
+    audit_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Optional[tuple[list[dict], Optional[str]]]:
+    """
+    Newest-first page of a user's events and the cursor for the next one.
+    ``types`` matches a full action ("asset.created") or a category
+    ("asset"). None if ClickHouse is down.
+    """
+    client = await get_clickhouse()
+    if client is None:
+        return None
+
+    conditions = ["user_id = {user_id:String}"]
+    params: dict = {"user_id": user_id, "limit": limit + 1}
+
+    if audit_only:
+        conditions.append("audit = 1")
+    if since is not None:
+        conditions.append("created_at >= {since:DateTime64(3)}")
+        params["since"] = since
+    if until is not None:
+        conditions.append("created_at < {until:DateTime64(3)}")
+        params["until"] = until
+    if types:
+        conditions.append("(action IN {types:Array(String)} OR category IN {types:Array(String)})")
+        params["types"] = types
+    if cursor:
+        cursor_at, cursor_id = decode_cursor(cursor)
+        conditions.append(
+            "(created_at, id) < ({cursor_at:DateTime64(3)}, {cursor_id:String})"
+        )
+        params["cursor_at"] = cursor_at
+        params["cursor_id"] = cursor_id
+
+    result = await client.query(
+        f"""
+        SELECT {", ".join(ACTIVITY_COLUMNS)}
+        FROM {ACTIVITY_TABLE}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY created_at DESC, id DESC
+        LIMIT {{limit:UInt32}}
+        """,
+        parameters=params,
+    )
+
+    rows = result.result_rows
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last[-1], last[0])
+
+    return [_row_to_event(row) for row in rows], next_cursor
@@ -0,0 +1,300 @@
+"""
+ASM Discovery Scheduler
+Fires INTERVAL / CRON discoveries. One replica leads (Postgres advisory
+lock); it keeps the discoveries due within a short horizon in a min-heap,
+so each tick costs O(log n) per fired schedule instead of a table scan.
+Jobs go out through the outbox, in the same transaction that advances
+next_run_at.
+"""
+
+import asyncio
+import heapq
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from config.settings import settings
+from models.asm_models import (
+    AsmDiscovery as AsmDiscoveryModel,
+    AsmDiscoveryRun as AsmDiscoveryRunModel,
+)
+from utils.database import AsyncSessionLocal, engine
+from utils.outbox import enqueue, outbox_relay
+from utils.schedule import compute_next_run
+
+logger = logging.getLogger(__name__)
+
+# pg advisory lock id for scheduler leadership ("ASMS")
+SCHEDULER_LOCK_KEY = 0x41534D53
+
+SCHEDULED_TYPES = ("INTERVAL", "CRON")
+INACTIVE_STATUSES = ("PAUSED", "DELETED")
+
+ASM_QUEUE = "jobs.asm"
+
+
+class AsmScheduler:
+    def __init__(
+        self,
+        tick: float,
+        horizon: int,
+        refresh: int,
+        batch_size: int,
+    ):
+        self.tick = tick
+        self.horizon = timedelta(seconds=horizon)
+        self.refresh = refresh
+        self.batch_size = batch_size
+
+        # (next_run_at, discovery_id); stale entries are skipped lazily
+        self._heap: list[tuple[datetime, str]] = []
+        self._scheduled: dict[str, datetime] = {}
+
+        self._lock_conn = None
+        self._lock_checked = 0.0
+        self._task: asyncio.Task | None = None
+        self._last_load = 0.0
+        self.stats = {"leader": False, "dispatched": 0, "loads": 0, "heap_size": 0}
+
+    # ---------------- leadership ----------------
+    async def _ensure_leader(self) -> bool:
+        now = asyncio.get_running_loop().time()
+
+        if self._lock_conn is not None:
+            # Dispatch re-checks rows under FOR UPDATE SKIP LOCKED, so a
+            # briefly stale leader cannot double fire; probe only per refresh
+            if now - self._lock_checked < self.refresh:
+                return True
+            try:
+                # The lock lives as long as this connection does
+                await self._lock_conn.execute(text("SELECT 1"))
+                # Not idle in transaction, or idle_in_transaction_session_timeout
+                # could end the session and drop the lock
+                await self._lock_conn.commit()
+                self._lock_checked = now
+                return True
+            except Exception:
+                logger.warning("Scheduler lost its lock connection")
+                await self._release_leadership()
+
+        conn = await engine.connect()
+        try:
+            result = await conn.execute(
+                select(func.pg_try_advisory_lock(SCHEDULER_LOCK_KEY))
+            )
+            acquired = bool(result.scalar())
+            # Commit so the connection is not left idle in transaction
+            await conn.commit()
+        except Exception:
+            await conn.close()
+            raise
+
+        if not acquired:
+            await conn.close()
+            return False
+
+        self._lock_conn = conn
+        self._lock_checked = now
+        self._heap.clear()
+        self._scheduled.clear()
+        self._last_load = 0.0
+        self.stats["leader"] = True
+        logger.info("ASM scheduler acquired leadership")
+        return True
+
+    async def _release_leadership(self) -> None:
+        conn, self._lock_conn = self._lock_conn, None
+        self.stats["leader"] = False
+        if conn is not None:
+            try:
+                await conn.execute(select(func.pg_advisory_unlock(SCHEDULER_LOCK_KEY)))
+                await conn.commit()
+            except Exception:
+                pass
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+    # ---------------- heap ----------------
+    def _push(self, discovery_id: str, run_at: datetime) -> None:
+        if self._scheduled.get(discovery_id) == run_at:
+            return
+        self._scheduled[discovery_id] = run_at
+        heapq.heappush(self._heap, (run_at, discovery_id))
+
+    async def _load(self) -> None:
+        """
+        Pull schedules due within the horizon (index range scan on next_run_at)
+        """
+        until = datetime.utcnow() + self.horizon
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(AsmDiscoveryModel.id, AsmDiscoveryModel.next_run_at)
+                .where(
+                    AsmDiscoveryModel.schedule_type.in_(SCHEDULED_TYPES),
+                    AsmDiscoveryModel.next_run_at <= until,
+                    AsmDiscoveryModel.status.not_in(INACTIVE_STATUSES),
+                )
+                .order_by(AsmDiscoveryModel.next_run_at)
+            )
+            for discovery_id, run_at in result.all():
+                self._push(discovery_id, run_at)
+
+        self._last_load = asyncio.get_running_loop().time()
+        self.stats["loads"] += 1
+
+    def _pop_due(self, now: datetime) -> list[str]:
+        due: list[str] = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            run_at, discovery_id = heapq.heappop(self._heap)
+            if self._scheduled.get(discovery_id) != run_at:
+                continue
+            del self._scheduled[discovery_id]
+            due.append(discovery_id)
+        return due
+
+    # ---------------- dispatch ----------------
+    async def _dispatch(self, discovery_ids: list[str]) -> None:
+        """
+        Re-check the due rows under lock, record runs, advance next_run_at
+        and enqueue jobs - all in one transaction
+        """
+        now = datetime.utcnow()
+        dispatched = 0
+
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(AsmDiscoveryModel)
+                    .where(
+                        AsmDiscoveryModel.id.in_(discovery_ids),
+                        AsmDiscoveryModel.schedule_type.in_(SCHEDULED_TYPES),
+                        AsmDiscoveryModel.next_run_at <= now,
+                        AsmDiscoveryModel.status.not_in(INACTIVE_STATUSES),
+                    )
+                    .with_for_update(skip_locked=True)
+                )
+
+                for discovery in result.scalars().all():
+                    try:
+                        # Step from the planned time so intervals don't drift;
+                        # after downtime, skip missed fires instead of replaying
+                        next_run = compute_next_run(
+                            discovery.schedule_type,
+                            discovery.schedule_value,
+                            discovery.next_run_at,
+                        )
+                        if next_run <= now:
+                            next_run = compute_next_run(
+                                discovery.schedule_type,
+                                discovery.schedule_value,
+                                now,
+                            )
+                    except ValueError as e:
+                        logger.error(f"Discovery {discovery.id} has a bad schedule: {e}")
+                        discovery.status = "FAILED"
+                        continue
+
+                    run = AsmDiscoveryRunModel(
+                        id=str(uuid.uuid4()),
+                        asm_discovery_id=discovery.id,
+                        user_id=discovery.user_id,
+                        triggered_by="CRON",
+                        run_mode="SCHEDULED",
+                        status="PENDING",
+                    )
+                    session.add(run)
+
+                    enqueue(session, ASM_QUEUE, {
+                        "type": "asm",
+                        "user_id": discovery.user_id,
+                        "id": discovery.id,
+                        "run_id": run.id,
+                        "asset_type": discovery.asset_type,
+                        "target_source": discovery.target_source,
+                        "intensity": discovery.intensity,
+                    })
+
+                    discovery.last_run_at = now
+                    discovery.next_run_at = next_run
+                    dispatched += 1
+
+                    if next_run - now <= self.horizon:
+                        self._push(discovery.id, next_run)
+
+        if dispatched:
+            outbox_relay.wake()
+            self.stats["dispatched"] += dispatched
+            logger.info(f"ASM scheduler dispatched {dispatched} discoveries")
+
+    # ---------------- loop ----------------
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                if not await self._ensure_leader():
+                    await asyncio.sleep(self.refresh)
+                    continue
+
+                if loop.time() - self._last_load >= self.refresh:
+                    await self._load()
+
+                due = self._pop_due(datetime.utcnow())
+                if due:
+                    await self._dispatch(due)
+                    if len(due) >= self.batch_size:
+                        continue
+
+                self.stats["heap_size"] = len(self._scheduled)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("ASM scheduler tick failed")
+
+            # Sleep until the next due entry, but at most one tick
+            delay = self.tick
+            if self._heap:
+                until_next = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                delay = max(0.0, min(delay, until_next))
+            await asyncio.sleep(delay)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._release_leadership()
+
+
+# -------------------------------------------------------------------
+# Global scheduler
+# -------------------------------------------------------------------
+asm_scheduler = AsmScheduler(
+    tick=settings.ASM_SCHEDULER_TICK,
+    horizon=settings.ASM_SCHEDULER_HORIZON,
+    refresh=settings.ASM_SCHEDULER_REFRESH,
+    batch_size=settings.ASM_SCHEDULER_BATCH_SIZE,
+)
+
+
+async def start_asm_scheduler():
+    if settings.ASM_SCHEDULER_ENABLED:
+        await asm_scheduler.start()
+        logger.info("ASM scheduler started")
+
+
+async def close_asm_scheduler():
+    await asm_scheduler.stop()
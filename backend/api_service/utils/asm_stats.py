@@ -0,0 +1,190 @@
+"""
+ASM Dashboard Aggregates
+Incrementally maintained attack surface stats + cached dashboard snapshot
+"""
+
+import json
+import logging
+from typing import Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from models.asm_models import (
+    AsmDiscovery as AsmDiscoveryModel,
+    AsmDiscoveryRun as AsmDiscoveryRunModel,
+    AsmSurfaceStats,
+)
+from models.asset_models import Asset as AssetModel
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_PREFIX = "asm:dashboard:"
+
+
+# -------------------------------------------------------------------
+# Surface stats (incremental)
+# -------------------------------------------------------------------
+async def apply_asset_delta(
+    db: AsyncSession,
+    user_id: str,
+    count_delta: int = 0,
+    risk_delta: int = 0,
+) -> None:
+    """
+    Adjust a user's asset count / risk sum. Runs inside the caller's
+    transaction, so the stats commit (or roll back) with the asset change.
+    """
+    if not count_delta and not risk_delta:
+        return
+
+    stmt = insert(AsmSurfaceStats).values(
+        user_id=user_id,
+        asset_count=count_delta,
+        risk_sum=risk_delta,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AsmSurfaceStats.user_id],
+        set_={
+            "asset_count": AsmSurfaceStats.asset_count + stmt.excluded.asset_count,
+            "risk_sum": AsmSurfaceStats.risk_sum + stmt.excluded.risk_sum,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def rebuild_surface_stats(db: AsyncSession, user_id: str) -> None:
+    """
+    Recompute a user's stats from the assets table (backfill / repair)
+    """
+    result = await db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(AssetModel.risk_score), 0),
+        ).where(AssetModel.user_id == user_id)
+    )
+    count, risk_sum = result.one()
+
+    stmt = insert(AsmSurfaceStats).values(
+        user_id=user_id,
+        asset_count=count,
+        risk_sum=risk_sum,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AsmSurfaceStats.user_id],
+        set_={
+            "asset_count": stmt.excluded.asset_count,
+            "risk_sum": stmt.excluded.risk_sum,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def get_asset_count(db: AsyncSession, user_id: str) -> int:
+    """
+    Inventory size from the stats row (primary key lookup, no COUNT(*))
+    """
+    result = await db.execute(
+        select(AsmSurfaceStats.asset_count).where(AsmSurfaceStats.user_id == user_id)
+    )
+    count = result.scalar_one_or_none()
+    if count is None:
+        await rebuild_surface_stats(db, user_id)
+        result = await db.execute(
+            select(AsmSurfaceStats.asset_count).where(AsmSurfaceStats.user_id == user_id)
+        )
+        count = result.scalar_one_or_none()
+    return count or 0
+
+
+# -------------------------------------------------------------------
+# Dashboard snapshot
+# -------------------------------------------------------------------
+async def _query_dashboard(db: AsyncSession, user_id: str) -> dict:
+    """
+    All dashboard numbers in one round trip
+    """
+    last_run = (
+        select(func.max(AsmDiscoveryRunModel.started_at))
+        .where(AsmDiscoveryRunModel.user_id == user_id)
+        .scalar_subquery()
+    )
+    score = (
+        select(
+            case(
+                (AsmSurfaceStats.asset_count > 0,
+                 func.round(AsmSurfaceStats.risk_sum * 1.0 / AsmSurfaceStats.asset_count)),
+                else_=0,
+            )
+        )
+        .where(AsmSurfaceStats.user_id == user_id)
+        .scalar_subquery()
+    )
+
+    result = await db.execute(
+        select(
+            func.count().label("total"),
+            func.count().filter(AsmDiscoveryModel.status == "RUNNING").label("active"),
+            last_run.label("last_run"),
+            score.label("score"),
+        ).where(AsmDiscoveryModel.user_id == user_id)
+    )
+    row = result.one()
+
+    return {
+        "attack_surface_score": int(row.score) if row.score is not None else None,
+        "total_discoveries": row.total,
+        "active_discoveries": row.active,
+        "last_discovery_run": row.last_run.isoformat() if row.last_run else None,
+    }
+
+
+async def get_dashboard_snapshot(db: AsyncSession, user_id: str) -> dict:
+    """
+    Read-through cached dashboard (invalidated on discovery/asset writes)
+    """
+    redis = await get_redis()
+    key = DASHBOARD_PREFIX + user_id
+
+    if redis:
+        try:
+            cached = await redis.get(key)
+            if cached is not None:
+                return json.loads(cached)
+        except Exception as e:
+            logger.warning(f"Dashboard cache lookup failed: {e}")
+            redis = None
+
+    snapshot = await _query_dashboard(db, user_id)
+
+    if snapshot["attack_surface_score"] is None:
+        # No stats row yet (user predates incremental stats) → backfill once
+        await rebuild_surface_stats(db, user_id)
+        snapshot = await _query_dashboard(db, user_id)
+        snapshot["attack_surface_score"] = snapshot["attack_surface_score"] or 0
+
+    if redis:
+        try:
+            await redis.set(key, json.dumps(snapshot), ex=settings.ASM_DASHBOARD_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Dashboard cache store failed: {e}")
+
+    return snapshot
+
+
+async def invalidate_dashboard(user_id: Optional[str]) -> None:
+    if not user_id:
+        return
+
+    redis = await get_redis()
+    if redis:
+        try:
+            await redis.delete(DASHBOARD_PREFIX + user_id)
+        except Exception as e:
+            logger.warning(f"Dashboard cache invalidation failed: {e}")
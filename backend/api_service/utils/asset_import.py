@@ -0,0 +1,325 @@
+"""
+Streaming Asset Import
+Parses NDJSON / CSV request bodies incrementally and upserts assets in
+batched INSERT ... ON CONFLICT statements. Memory use is bounded by the
+batch size, not by the size of the upload.
+"""
+
+import csv
+import json
+import logging
+import time
+import uuid
+from typing import AsyncIterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from models.asset_models import Asset as AssetModel
+from schemas.asset_schema import AssetCreateRequest
+from utils.redis_client import get_redis
+from utils.asm_stats import apply_asset_delta
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_PREFIX = "assets:import:"
+PROGRESS_TTL = 24 * 3600
+
+# Guard against a single unterminated "line" eating all memory
+MAX_LINE_BYTES = 64 * 1024
+
+# Fallback progress store when Redis is not available
+_local_progress: dict[str, dict] = {}
+
+
+class ImportAbort(Exception):
+    """Raised when the upload itself is malformed (not a single bad row)"""
+
+
+# -------------------------------------------------------------------
+# Incremental parsing
+# -------------------------------------------------------------------
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """
+    Split a byte stream into (line_number, text) without buffering the body
+    """
+    pending = b""
+    line_no = 0
+
+    async for chunk in stream:
+        if not chunk:
+            continue
+
+        parts = (pending + chunk).split(b"\n")
+        pending = parts.pop()
+        if len(pending) > MAX_LINE_BYTES:
+            raise ImportAbort(f"Line {line_no + 1} exceeds {MAX_LINE_BYTES} bytes")
+
+        for part in parts:
+            line_no += 1
+            yield line_no, _decode(part, line_no)
+
+    if pending:
+        line_no += 1
+        yield line_no, _decode(pending, line_no)
+
+
+def _decode(raw: bytes, line_no: int) -> str:
+    try:
+        # utf-8-sig drops a BOM on the first line (Excel CSV exports)
+        return raw.decode("utf-8-sig" if line_no == 1 else "utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        raise ImportAbort(f"Line {line_no} is not valid UTF-8")
+
+
+async def iter_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, object]]:
+    """
+    Yield (line_number, parsed object or exception) per non-blank line
+    """
+    async for line_no, line in _iter_lines(stream):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+
+async def iter_csv(stream: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, object]]:
+    """
+    Yield (line_number, row dict) per CSV record. The first record is the
+    header; quoted fields may span lines. Tags are ';' separated.
+    """
+    header: Optional[list[str]] = None
+    record = ""
+    record_start = 0
+
+    async for line_no, line in _iter_lines(stream):
+        if not record:
+            if not line.strip():
+                continue
+            record_start = line_no
+            record = line
+        else:
+            record += "\n" + line
+
+        # An odd number of quotes means a quoted field continues
+        if record.count('"') % 2:
+            if len(record) > MAX_LINE_BYTES:
+                raise ImportAbort(f"Unterminated quoted field at line {record_start}")
+            continue
+
+        values = next(csv.reader([record]))
+        record = ""
+
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            if "name" not in header or "type" not in header:
+                raise ImportAbort("CSV header must include 'name' and 'type'")
+            continue
+
+        row = dict(zip(header, values))
+        if row.get("tags"):
+            row["tags"] = [t.strip() for t in row["tags"].split(";") if t.strip()]
+        else:
+            row.pop("tags", None)
+        for key in ("exposure", "description"):
+            if key in row and row[key] == "":
+                row.pop(key)
+
+        yield record_start, row
+
+    if record:
+        raise ImportAbort(f"Unterminated quoted field at line {record_start}")
+
+
+# -------------------------------------------------------------------
+# Progress
+# -------------------------------------------------------------------
+def _progress_key(user_id: str, import_id: str) -> str:
+    # import_id is client-chosen, so it is only unique per user
+    return f"{PROGRESS_PREFIX}{user_id}:{import_id}"
+
+
+async def save_progress(user_id: str, import_id: str, progress: dict) -> None:
+    key = _progress_key(user_id, import_id)
+    redis = await get_redis()
+    if redis:
+        try:
+            await redis.set(key, json.dumps(progress), ex=PROGRESS_TTL)
+            return
+        except Exception as e:
+            logger.warning(f"Import progress store failed: {e}")
+
+    _local_progress[key] = progress
+
+
+async def load_progress(user_id: str, import_id: str) -> Optional[dict]:
+    key = _progress_key(user_id, import_id)
+    redis = await get_redis()
+    if redis:
+        try:
+            raw = await redis.get(key)
+            if raw is not None:
+                return json.loads(raw)
+        except Exception as e:
+            logger.warning(f"Import progress lookup failed: {e}")
+
+    return _local_progress.get(key)
+
+
+# -------------------------------------------------------------------
+# Importer
+# -------------------------------------------------------------------
+class AssetImporter:
+    def __init__(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        import_id: Optional[str] = None,
+        batch_size: int = settings.ASSET_IMPORT_BATCH_SIZE,
+        max_errors: int = settings.ASSET_IMPORT_MAX_ERRORS,
+    ):
+        self.db = db
+        self.user_id = user_id
+        self.import_id = import_id or str(uuid.uuid4())
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+        self.errors_truncated = False
+        self.state = "running"
+
+        # (type, name) → (line_no, row); dedupes keys inside a batch since
+        # ON CONFLICT DO UPDATE cannot touch the same row twice
+        self._batch: dict[tuple[str, str], tuple[int, dict]] = {}
+        self._started = time.monotonic()
+
+    def _error(self, line_no: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line_no, "error": message})
+        else:
+            self.errors_truncated = True
+
+    def summary(self) -> dict:
+        return {
+            "import_id": self.import_id,
+            "user_id": self.user_id,
+            "state": self.state,
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "elapsed_seconds": round(time.monotonic() - self._started, 2),
+        }
+
+    async def add(self, line_no: int, record: object) -> None:
+        self.processed += 1
+
+        if isinstance(record, Exception):
+            self._error(line_no, f"Invalid JSON: {record}")
+            return
+        if not isinstance(record, dict):
+            self._error(line_no, "Row must be an object")
+            return
+
+        try:
+            payload = AssetCreateRequest(**record)
+        except ValidationError as e:
+            details = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                for err in e.errors()
+            )
+            self._error(line_no, details)
+            return
+
+        self._batch[(payload.type, payload.name)] = (
+            line_no,
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": self.user_id,
+                "name": payload.name,
+                "type": payload.type,
+                "exposure": payload.exposure,
+                "tags": payload.tags or [],
+                "description": payload.description,
+                "status": "active",
+                "risk_score": 0,
+            },
+        )
+
+        if len(self._batch) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._batch:
+            return
+
+        batch = list(self._batch.values())
+        self._batch = {}
+
+        stmt = insert(AssetModel).values([row for _, row in batch])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_assets_user_type_name",
+            set_={
+                "exposure": stmt.excluded.exposure,
+                "tags": stmt.excluded.tags,
+                "description": stmt.excluded.description,
+                "updated_at": func.now(),
+            },
+        ).returning(literal_column("xmax = 0").label("inserted"))
+
+        try:
+            result = await self.db.execute(stmt)
+            flags = result.scalars().all()
+            # New rows start at risk 0, updates keep their risk score
+            await apply_asset_delta(self.db, self.user_id, count_delta=sum(1 for f in flags if f))
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.exception(f"Asset import batch failed ({self.import_id})")
+            for line_no, _ in batch:
+                self._error(line_no, f"Batch insert failed: {e.__class__.__name__}")
+        else:
+            inserted = sum(1 for f in flags if f)
+            self.inserted += inserted
+            self.updated += len(flags) - inserted
+
+        await save_progress(self.user_id, self.import_id, self.summary())
+
+    async def run(self, records: AsyncIterator[tuple[int, object]]) -> dict:
+        await save_progress(self.user_id, self.import_id, self.summary())
+
+        try:
+            async for line_no, record in records:
+                await self.add(line_no, record)
+            await self.flush()
+            self.state = "completed"
+        except ImportAbort as e:
+            await self.flush()
+            self.state = "aborted"
+            self._error(0, str(e))
+        except Exception:
+            self.state = "failed"
+            await save_progress(self.user_id, self.import_id, self.summary())
+            raise
+
+        await save_progress(self.user_id, self.import_id, self.summary())
+        logger.info(
+            f"Asset import {self.import_id}: {self.inserted} inserted, "
+            f"{self.updated} updated, {self.failed} failed"
+        )
+
+        return {
+            **self.summary(),
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
@@ -1,3 +1,8 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
 
@@ -7,6 +12,12 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from config.settings import settings  # 👈 recommended
+from utils.password_hasher import password_hasher
+from utils.cache import TTLCache
+from utils.redis_client import get_redis
+from utils.token_revocation import revocation_list
+
+logger = logging.getLogger(__name__)
 
 # -------------------------------------------------------------------
 # Config
@@ -26,7 +37,9 @@ pwd_context = CryptContext(
 security = HTTPBearer(auto_error=True)
 
 # -------------------------------------------------------------------
-# Password utils (CPU only → safe in async)
+# Password utils
+# bcrypt is CPU bound (~100-300 ms) → sync versions block the event loop,
+# async handlers must use the *_async variants (bounded worker pool)
 # -------------------------------------------------------------------
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -35,6 +48,16 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run("hash", hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(
+        "verify", verify_password, plain_password, hashed_password
+    )
+
 # -------------------------------------------------------------------
 # JWT utils
 # -------------------------------------------------------------------
@@ -53,7 +76,12 @@ async def create_access_token(
         else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
 
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation (logout)
+    to_encode.update({
+        "exp": expire,
+        "iat": datetime.now(timezone.utc),
+        "jti": uuid.uuid4().hex,
+    })
     encoded_jwt = jwt.encode(
         to_encode,
         SECRET_KEY,
@@ -61,6 +89,112 @@ async def create_access_token(
     )
     return encoded_jwt
 
+# -------------------------------------------------------------------
+# Verified-token cache
+# Keyed by sha256(token); entries expire at the token's own exp so a
+# cache hit is never more permissive than a full decode
+# -------------------------------------------------------------------
+TOKEN_CACHE_PREFIX = "auth:jwt:"
+
+_token_cache = TTLCache(maxsize=settings.JWT_CACHE_SIZE)
+_shared_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def _shared_cache_get(digest: str) -> Optional[dict]:
+    redis = await get_redis()
+    if not redis:
+        return None
+
+    try:
+        raw = await redis.get(TOKEN_CACHE_PREFIX + digest)
+    except Exception as e:
+        logger.warning(f"Token cache lookup failed: {e}")
+        return None
+
+    if raw is None:
+        _shared_cache_stats["misses"] += 1
+        return None
+
+    _shared_cache_stats["hits"] += 1
+    return json.loads(raw)
+
+
+async def _shared_cache_set(digest: str, claims: dict, ttl: int) -> None:
+    redis = await get_redis()
+    if not redis:
+        return
+
+    try:
+        await redis.set(TOKEN_CACHE_PREFIX + digest, json.dumps(claims), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Token cache store failed: {e}")
+
+
+def token_cache_stats() -> dict:
+    """
+    Hit/miss counters for the verified-token cache
+    """
+    return {
+        "local": _token_cache.stats(),
+        "shared": dict(_shared_cache_stats, enabled=settings.JWT_CACHE_SHARED),
+    }
+
+
+async def _verify_token(token: str) -> dict:
+    """
+    Return the verified claims for a token, decoding it only on cache miss
+    """
+    digest = _token_digest(token)
+
+    claims = _token_cache.get(digest)
+    if claims is not None:
+        return claims
+
+    if settings.JWT_CACHE_SHARED:
+        claims = await _shared_cache_get(digest)
+        if claims is not None and claims["exp"] > time.time():
+            _token_cache.set(digest, claims, expires_at=claims["exp"])
+            return claims
+
+    payload = jwt.decode(
+        token,
+        SECRET_KEY,
+        algorithms=[ALGORITHM],
+    )
+
+    email: str | None = payload.get("sub")
+    user_id: str | None = payload.get("user_id")
+
+    if not email or not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token",
+        )
+
+    claims = {
+        "email": email,
+        "user_id": user_id,
+        "jti": payload.get("jti"),
+        "exp": payload.get("exp"),
+    }
+
+    # Tokens without exp are never cached - there is no safe expiry
+    if claims["exp"] is None:
+        return claims
+
+    _token_cache.set(digest, claims, expires_at=claims["exp"])
+
+    if settings.JWT_CACHE_SHARED:
+        ttl = int(claims["exp"] - time.time())
+        if ttl > 0:
+            await _shared_cache_set(digest, claims, ttl)
+
+    return claims
+
 # -------------------------------------------------------------------
 # Dependency: Get current user
 # -------------------------------------------------------------------
@@ -73,24 +207,20 @@ async def get_current_user(
     token = credentials.credentials
 
     try:
-        payload = jwt.decode(
-            token,
-            SECRET_KEY,
-            algorithms=[ALGORITHM],
-        )
-
-        email: str | None = payload.get("sub")
-        user_id: str | None = payload.get("user_id")
+        claims = await _verify_token(token)
 
-        if not email or not user_id:
+        # Checked on cache hits too - a cached token can still be revoked
+        if claims["jti"] and await revocation_list.is_revoked(claims["jti"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
+                detail="Token has been revoked",
             )
 
         return {
-            "email": email,
-            "user_id": user_id,
+            "email": claims["email"],
+            "user_id": claims["user_id"],
+            "jti": claims["jti"],
+            "exp": claims["exp"],
         }
 
     except JWTError:
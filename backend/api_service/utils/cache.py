@@ -0,0 +1,251 @@
+"""
+In-process LRU cache with per-entry expiry, and a read-through
+local + Redis cache built on it
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Bounded LRU cache. Each entry carries an absolute (wall clock)
+    expiry; expired entries are dropped lazily on read.
+
+    Not thread safe - meant to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int, default_ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[Hashable, tuple[Any, Optional[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        if expires_at is None:
+            ttl = ttl if ttl is not None else self.default_ttl
+            expires_at = time.time() + ttl if ttl is not None else None
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# -------------------------------------------------------------------
+# Read-through cache (local LRU → Redis → loader)
+# -------------------------------------------------------------------
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+_caches: dict[str, "ReadThroughCache"] = {}
+
+
+class ReadThroughCache:
+    """
+    Two-level cache for JSON-serialisable values.
+
+    Concurrent misses for one key in this process share a single loader
+    call (single-flight). ``invalidate`` drops the key from Redis and tells
+    every process, through pub/sub, to drop its local copy.
+    """
+
+    def __init__(self, name: str, maxsize: int, local_ttl: float, redis_ttl: int):
+        self.name = name
+        self.redis_ttl = redis_ttl
+        self._local = TTLCache(maxsize, default_ttl=local_ttl)
+        self._inflight: dict[str, asyncio.Future] = {}
+        # Bumped by invalidate(); a load that started before it is not stored
+        self._generation = 0
+        self.loads = 0
+        _caches[name] = self
+
+    def _redis_key(self, key: str) -> str:
+        return f"cache:{self.name}:{key}"
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self._local.get(key)
+        if value is not None:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The leading request was cancelled, not us → load ourselves
+                if inflight.cancelled():
+                    return await self.get(key, loader)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fetch(key, loader)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _fetch(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        redis = await get_redis()
+        if redis:
+            try:
+                cached = await redis.get(self._redis_key(key))
+                if cached is not None:
+                    value = json.loads(cached)
+                    if generation == self._generation:
+                        self._local.set(key, value)
+                    return value
+            except Exception as e:
+                logger.warning(f"{self.name} cache lookup failed: {e}")
+                redis = None
+
+        self.loads += 1
+        value = await loader()
+        if value is None or generation != self._generation:
+            return value
+
+        self._local.set(key, value)
+        if redis:
+            try:
+                await redis.set(self._redis_key(key), json.dumps(value), ex=self.redis_ttl)
+            except Exception as e:
+                logger.warning(f"{self.name} cache store failed: {e}")
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        self._generation += 1
+        self._local.delete(key)
+
+        redis = await get_redis()
+        if not redis:
+            return
+        try:
+            await redis.delete(self._redis_key(key))
+            await redis.publish(INVALIDATION_CHANNEL, f"{self.name}:{key}")
+        except Exception as e:
+            logger.warning(f"{self.name} cache invalidation failed: {e}")
+
+    def stats(self) -> dict:
+        return {**self._local.stats(), "loads": self.loads, "inflight": len(self._inflight)}
+
+
+async def _listen_invalidations() -> None:
+    backoff = 1
+    while True:
+        pubsub = None
+        try:
+            redis = await get_redis()
+            if not redis:
+                raise ConnectionError("Redis not available")
+
+            pubsub = redis.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            backoff = 1
+
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=1.0,
+                )
+                if message and message["type"] == "message":
+                    name, _, key = message["data"].partition(":")
+                    cache = _caches.get(name)
+                    if cache is not None:
+                        cache._generation += 1
+                        cache._local.delete(key)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Local entries still expire after local_ttl meanwhile
+            logger.warning(f"Cache invalidation listener error: {e} - retrying in {backoff}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+
+_listener: Optional[asyncio.Task] = None
+
+
+async def start_cache_invalidation():
+    global _listener
+    if _listener is None:
+        _listener = asyncio.create_task(_listen_invalidations())
+
+
+async def close_cache_invalidation():
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
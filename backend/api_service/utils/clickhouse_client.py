@@ -4,10 +4,38 @@ Async ClickHouse Connection
 
 import logging
 from config.settings import settings
+from utils.metrics import timed
 import clickhouse_connect
 
 logger = logging.getLogger(__name__)
 
+# -------------------------------------------------------------------
+# Timed client
+# -------------------------------------------------------------------
+class _TimedClient:
+    """
+    Times query / command / insert; everything else passes through
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    async def query(self, *args, **kwargs):
+        with timed("clickhouse", "query"):
+            return await self._client.query(*args, **kwargs)
+
+    async def command(self, *args, **kwargs):
+        with timed("clickhouse", "command"):
+            return await self._client.command(*args, **kwargs)
+
+    async def insert(self, *args, **kwargs):
+        with timed("clickhouse", "insert"):
+            return await self._client.insert(*args, **kwargs)
+
+
 # -------------------------------------------------------------------
 # Global client
 # -------------------------------------------------------------------
@@ -25,7 +53,7 @@ async def get_clickhouse():
 
     if clickhouse_client is None:
         try:
-            clickhouse_client = await clickhouse_connect.get_async_client(
+            client = await clickhouse_connect.get_async_client(
                 host=settings.CLICKHOUSE_HOST,
                 port=settings.CLICKHOUSE_PORT,
                 database="cybersentinel",
@@ -34,7 +62,8 @@ async def get_clickhouse():
             )
 
             # Test connection
-            await clickhouse_client.query("SELECT 1")
+            await client.query("SELECT 1")
+            clickhouse_client = _TimedClient(client)
             logger.info("ClickHouse connected successfully")
 
         except ImportError:
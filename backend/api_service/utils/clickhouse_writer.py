@@ -0,0 +1,264 @@
+"""
+Buffered ClickHouse Writer
+Rows are appended to per-table columnar buffers and flushed as one
+column-oriented native insert when a table reaches the batch size or
+the flush interval elapses. ClickHouse handles a few large inserts far
+better than many single-row ones.
+
+If ClickHouse is down, batches are pickled to the spill directory and
+replayed once it is back. When too many rows are pending, ``write``
+waits (backpressure) and ``write_nowait`` drops and counts.
+"""
+
+import asyncio
+import logging
+import os
+import pickle
+import time
+import uuid
+from typing import Optional
+
+from config.settings import settings
+from utils.clickhouse_client import get_clickhouse
+
+logger = logging.getLogger(__name__)
+
+
+class _TableBuffer:
+    def __init__(self, columns: list[str]):
+        self.columns = columns
+        self.data: list[list] = [[] for _ in columns]
+        self.rows = 0
+
+    def append(self, row: dict) -> None:
+        for column, values in zip(self.columns, self.data):
+            values.append(row.get(column))
+        self.rows += 1
+
+    def take(self) -> list[list]:
+        data = self.data
+        self.data = [[] for _ in self.columns]
+        self.rows = 0
+        return data
+
+
+class ClickHouseWriter:
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: int,
+        spill_dir: str,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.spill_dir = spill_dir
+
+        self._buffers: dict[str, _TableBuffer] = {}
+        self._pending = 0
+        self._flush_now = asyncio.Event()
+        self._space = asyncio.Condition()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "rows_written": 0,
+            "inserts": 0,
+            "dropped": 0,
+            "spilled_batches": 0,
+            "replayed_batches": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    # ---------------- tables ----------------
+    def register_table(self, table: str, columns: list[str]) -> None:
+        """
+        Declare the column order for a table; rows are dicts keyed by column
+        """
+        if table not in self._buffers:
+            self._buffers[table] = _TableBuffer(list(columns))
+
+    def _buffer(self, table: str) -> _TableBuffer:
+        try:
+            return self._buffers[table]
+        except KeyError:
+            raise ValueError(f"ClickHouse table not registered: {table}")
+
+    # ---------------- writes ----------------
+    def write_nowait(self, table: str, row: dict) -> bool:
+        """
+        Buffer a row without waiting; False (row dropped) when saturated
+        """
+        buffer = self._buffer(table)
+        if self._pending >= self.max_pending:
+            self.stats["dropped"] += 1
+            return False
+
+        buffer.append(row)
+        self._pending += 1
+        if buffer.rows >= self.batch_size:
+            self._flush_now.set()
+        return True
+
+    async def write(self, table: str, row: dict) -> None:
+        await self.write_many(table, [row])
+
+    async def write_many(self, table: str, rows: list[dict]) -> None:
+        """
+        Buffer rows, waiting for a flush whenever the buffer is full
+        """
+        buffer = self._buffer(table)
+        for row in rows:
+            if self._pending >= self.max_pending:
+                self._flush_now.set()
+                async with self._space:
+                    await self._space.wait_for(lambda: self._pending < self.max_pending)
+
+            buffer.append(row)
+            self._pending += 1
+
+        if buffer.rows >= self.batch_size:
+            self._flush_now.set()
+
+    # ---------------- flush ----------------
+    async def _insert(self, table: str, columns: list[str], data: list[list]) -> bool:
+        client = await get_clickhouse()
+        if client is None:
+            return False
+        try:
+            await client.insert(
+                table,
+                data,
+                column_names=columns,
+                column_oriented=True,
+            )
+        except Exception as e:
+            logger.error(f"ClickHouse insert into {table} failed: {e}")
+            return False
+
+        self.stats["inserts"] += 1
+        self.stats["rows_written"] += len(data[0]) if data else 0
+        return True
+
+    def _spill(self, table: str, columns: list[str], data: list[list]) -> None:
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            name = f"{int(time.time() * 1000)}-{table}-{uuid.uuid4().hex[:8]}.pkl"
+            tmp_path = os.path.join(self.spill_dir, name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"table": table, "columns": columns, "data": data}, f)
+            # Atomic rename so replay never reads a half-written file
+            os.replace(tmp_path, os.path.join(self.spill_dir, name))
+            self.stats["spilled_batches"] += 1
+            logger.warning(f"Spilled {len(data[0]) if data else 0} rows for {table} to disk")
+        except Exception:
+            self.stats["dropped"] += len(data[0]) if data else 0
+            logger.exception(f"Failed to spill rows for {table}, dropped")
+
+    async def _replay_spilled(self) -> None:
+        """
+        Re-insert spilled batches, oldest first; stop at the first failure
+        """
+        try:
+            names = sorted(n for n in os.listdir(self.spill_dir) if n.endswith(".pkl"))
+        except FileNotFoundError:
+            return
+
+        for name in names:
+            path = os.path.join(self.spill_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    batch = pickle.load(f)
+            except Exception:
+                logger.exception(f"Unreadable spill file {name}, skipping")
+                os.replace(path, path + ".bad")
+                continue
+
+            if not await self._insert(batch["table"], batch["columns"], batch["data"]):
+                return
+
+            os.remove(path)
+            self.stats["replayed_batches"] += 1
+
+    async def flush(self) -> None:
+        """
+        Insert everything buffered now (one insert per table)
+        """
+        async with self._flush_lock:
+            started = time.perf_counter()
+            inserted_all = True
+
+            for table, buffer in self._buffers.items():
+                if not buffer.rows:
+                    continue
+
+                rows = buffer.rows
+                columns = buffer.columns
+                data = buffer.take()
+                self._pending -= rows
+
+                if not await self._insert(table, columns, data):
+                    inserted_all = False
+                    self._spill(table, columns, data)
+
+            async with self._space:
+                self._space.notify_all()
+
+            if inserted_all:
+                await self._replay_spilled()
+
+            self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("ClickHouse writer flush failed")
+
+    # ---------------- lifecycle ----------------
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("ClickHouse writer started")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Final flush; anything ClickHouse refuses ends up on disk
+        await self.flush()
+        logger.info("ClickHouse writer stopped")
+
+
+# -------------------------------------------------------------------
+# Global writer
+# -------------------------------------------------------------------
+clickhouse_writer = ClickHouseWriter(
+    batch_size=settings.CLICKHOUSE_BATCH_SIZE,
+    flush_interval=settings.CLICKHOUSE_FLUSH_INTERVAL,
+    max_pending=settings.CLICKHOUSE_MAX_PENDING,
+    spill_dir=settings.CLICKHOUSE_SPILL_DIR,
+)
+
+
+async def start_clickhouse_writer():
+    await clickhouse_writer.start()
+
+
+async def close_clickhouse_writer():
+    await clickhouse_writer.stop()
@@ -0,0 +1,243 @@
+"""
+Batched RabbitMQ Consumer Runtime
+
+Each worker owns a channel, buffers deliveries and hands them to the
+handler in batches (up to ``batch_size`` messages or ``batch_timeout``
+seconds). A processed batch is acknowledged with a single
+``ack(multiple=True)``. Failed messages are routed to ``<queue>.dead``.
+Delivery is at-least-once: a failed batch is retried message by message,
+so handlers must be idempotent.
+
+handler signature:
+    async def handler(payloads: list[dict]) -> None
+"""
+
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Optional
+
+from config.settings import settings
+from utils.queue import get_queue_connection, publisher
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[list[dict]], Awaitable[None]]
+
+# Put on a worker's buffer by stop(): everything delivered before it is
+# still batched and acked, then the loop returns
+_STOP = object()
+
+
+class _Worker:
+    def __init__(self, consumer: "BatchConsumer", index: int):
+        self.consumer = consumer
+        self.index = index
+        self.channel = None
+        self.queue = None
+        self.consumer_tag: Optional[str] = None
+        self.buffer: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self, connection) -> None:
+        c = self.consumer
+        self.channel = await connection.channel()
+        await self.channel.set_qos(prefetch_count=c.prefetch)
+        self.queue = await self.channel.declare_queue(c.queue_name, durable=True)
+        self.consumer_tag = await self.queue.consume(self.buffer.put, no_ack=False)
+        self.task = asyncio.create_task(self._run())
+
+    async def _next_batch(self) -> tuple[list, bool]:
+        """
+        (batch, stopping); the batch may be empty once stop() was called
+        """
+        first = await self.buffer.get()
+        if first is _STOP:
+            return [], True
+
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.consumer.batch_timeout
+
+        while len(batch) < self.consumer.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(self.buffer.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if message is _STOP:
+                return batch, True
+            batch.append(message)
+
+        return batch, False
+
+    async def _process(self, batch: list) -> None:
+        try:
+            await self.consumer._process(batch)
+        except Exception:
+            # e.g. the DLQ publish raised. Requeue the batch so a later
+            # ack(multiple=True) cannot settle these messages too
+            logger.exception(
+                f"Worker {self.index} on {self.consumer.queue_name} "
+                f"failed to settle a batch of {len(batch)}, requeueing it"
+            )
+            for message in batch:
+                try:
+                    await message.nack(requeue=True)
+                except Exception:
+                    pass
+
+    async def _run(self) -> None:
+        # Never cancelled: stop() ends the loop with _STOP, so a batch is
+        # never abandoned half-acked
+        while True:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._process(batch)
+            if stopping:
+                return
+
+    async def stop(self) -> None:
+        # 1. stop new deliveries
+        if self.queue is not None and self.consumer_tag is not None:
+            try:
+                await self.queue.cancel(self.consumer_tag)
+            except Exception:
+                pass
+
+        # 2. let the loop finish the current batch and everything buffered
+        if self.task is not None:
+            self.buffer.put_nowait(_STOP)
+            await self.task
+
+        # 3. deliveries that raced the cancel landed after _STOP
+        leftover = []
+        while not self.buffer.empty():
+            leftover.append(self.buffer.get_nowait())
+        for start in range(0, len(leftover), self.consumer.batch_size):
+            await self._process(leftover[start:start + self.consumer.batch_size])
+
+        # 4. only now is nothing left to ack on the channel
+        if self.channel is not None and not self.channel.is_closed:
+            await self.channel.close()
+
+
+class BatchConsumer:
+    def __init__(
+        self,
+        queue_name: str,
+        handler: BatchHandler,
+        batch_size: int = settings.CONSUMER_BATCH_SIZE,
+        batch_timeout: float = settings.CONSUMER_BATCH_TIMEOUT,
+        concurrency: int = settings.CONSUMER_CONCURRENCY,
+        prefetch: Optional[int] = None,
+        dead_letter_queue: Optional[str] = None,
+        connection_factory=None,
+    ):
+        self.queue_name = queue_name
+        self.handler = handler
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.concurrency = concurrency
+        # Enough prefetch to fill a batch without waiting on the broker
+        self.prefetch = prefetch or batch_size
+        self.dead_letter_queue = dead_letter_queue or f"{queue_name}.dead"
+        self._connection_factory = connection_factory or get_queue_connection
+
+        self._workers: list[_Worker] = []
+        self.stats = {"batches": 0, "processed": 0, "dead_lettered": 0, "requeued": 0}
+
+    # ---------------- processing ----------------
+    async def _dead_letter(self, items: list[tuple], error: str) -> list:
+        """
+        Publish (message, payload) pairs to the DLQ.
+        Returns the messages that could not be dead-lettered.
+        """
+        if not items:
+            return []
+
+        flags = await publisher.publish_many(self.dead_letter_queue, [
+            {
+                "queue": self.queue_name,
+                "error": error,
+                "payload": payload if payload is not None else message.body.decode(errors="replace"),
+            }
+            for message, payload in items
+        ])
+
+        self.stats["dead_lettered"] += sum(flags)
+        return [message for (message, _), ok in zip(items, flags) if not ok]
+
+    async def _process(self, batch: list) -> None:
+        decoded: list[tuple] = []
+        invalid: list[tuple] = []
+        for message in batch:
+            try:
+                decoded.append((message, json.loads(message.body)))
+            except ValueError:
+                invalid.append((message, None))
+
+        failed: list[tuple] = []
+        if decoded:
+            try:
+                await self.handler([payload for _, payload in decoded])
+            except Exception:
+                logger.exception(
+                    f"Batch of {len(decoded)} from {self.queue_name} failed, retrying one by one"
+                )
+                # Isolate the poison message(s) instead of dead-lettering the batch
+                if len(decoded) > 1:
+                    for item in decoded:
+                        try:
+                            await self.handler([item[1]])
+                        except Exception:
+                            failed.append(item)
+                else:
+                    failed = decoded
+
+        undelivered = await self._dead_letter(invalid, "invalid JSON")
+        undelivered += await self._dead_letter(failed, "handler failed")
+
+        if undelivered:
+            # Could not park them → requeue those, ack the rest one by one
+            requeue = set(id(m) for m in undelivered)
+            for message in batch:
+                if id(message) in requeue:
+                    await message.nack(requeue=True)
+                else:
+                    await message.ack()
+            self.stats["requeued"] += len(undelivered)
+        else:
+            # One ack frame for the whole batch (deliveries are in order per channel)
+            await batch[-1].ack(multiple=True)
+
+        self.stats["batches"] += 1
+        self.stats["processed"] += len(batch)
+
+    # ---------------- lifecycle ----------------
+    async def start(self) -> bool:
+        connection = await self._connection_factory()
+        if not connection:
+            logger.warning(f"Queue not available, consumer for {self.queue_name} not started")
+            return False
+
+        for index in range(self.concurrency):
+            worker = _Worker(self, index)
+            await worker.start(connection)
+            self._workers.append(worker)
+
+        logger.info(
+            f"Consuming {self.queue_name} with {self.concurrency} workers "
+            f"(batch {self.batch_size} / {self.batch_timeout}s)"
+        )
+        return True
+
+    async def stop(self) -> None:
+        """
+        Graceful drain: stop deliveries, finish in-flight and buffered batches
+        """
+        await asyncio.gather(*(w.stop() for w in self._workers), return_exceptions=True)
+        self._workers = []
+        logger.info(f"Consumer for {self.queue_name} stopped")
@@ -10,6 +10,8 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import declarative_base
 from config.settings import settings
+from utils.metrics import instrument_engine
+from utils.query_profiler import query_profiler
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,13 @@ engine = create_async_engine(
     echo=settings.DEBUG,
 )
 
+# Statement count / time per request (see utils/metrics.py)
+instrument_engine(engine)
+
+# Fingerprints, N+1 and slow-query detection (development only)
+if settings.QUERY_PROFILER_ENABLED:
+    query_profiler.install(engine)
+
 # -------------------------------------------------------------------
 # Async Session Factory
 # -------------------------------------------------------------------
@@ -53,17 +62,6 @@ async def get_db():
         finally:
             await session.close()
 
-# -------------------------------------------------------------------
-# Initialize Database
-# -------------------------------------------------------------------
-async def init_db():
-    """
-    Initialize database - create all tables
-    """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("Database initialized")
-
 # -------------------------------------------------------------------
 # Close Database
 # -------------------------------------------------------------------
@@ -0,0 +1,376 @@
+"""
+Prometheus Metrics
+A small in-process registry (counters, gauges, fixed-bucket histograms)
+rendered in the text exposition format at ``/metrics``.
+
+- ``MetricsMiddleware`` times every HTTP request, labelled by method,
+  route *template* (``/api/v1/assets/{asset_id}``, never the raw path)
+  and status.
+- ``timed(dependency, operation)`` wraps calls to Postgres (via engine
+  hooks), Redis, ClickHouse, RabbitMQ and bcrypt. Each observation also
+  lands in the current request's ``RequestStats``, so per-route
+  histograms show how much of a request went to each dependency.
+
+Overhead is one ``perf_counter`` pair, a bisect and a few dict updates
+per observation. Label sets per metric are capped (METRICS_MAX_SERIES);
+anything past the cap is folded into an ``other`` series.
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; Prometheus client defaults plus a finer low end for cache hits
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+# -------------------------------------------------------------------
+# Registry
+# -------------------------------------------------------------------
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: dict[tuple, object] = {}
+        self._overflow = ("other",) * len(self.labelnames)
+
+    def _key(self, labels: tuple) -> tuple:
+        if labels in self._series or len(self._series) < settings.METRICS_MAX_SERIES:
+            return labels
+        return self._overflow
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        self._series[key] = self._series.get(key, 0.0) + amount
+
+    def _samples(self):
+        for labels, value in self._series.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float) -> None:
+        self._series[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            # per-bucket counts (+Inf last), sum
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def _samples(self):
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield (
+                    f"{self.name}_bucket"
+                    f"{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_str = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_str} {_format_value(total)}"
+            yield f"{self.name}_count{label_str} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ("method", "route", "status"),
+))
+HTTP_REQUESTS_IN_PROGRESS = registry.register(Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ("method",),
+))
+DEPENDENCY_SECONDS = registry.register(Histogram(
+    "dependency_duration_seconds",
+    "Time spent in calls to Postgres, Redis, ClickHouse, RabbitMQ and bcrypt",
+    ("dependency", "operation"),
+))
+DEPENDENCY_ERRORS = registry.register(Counter(
+    "dependency_errors_total",
+    "Dependency calls that raised",
+    ("dependency", "operation"),
+))
+REQUEST_DEPENDENCY_SECONDS = registry.register(Histogram(
+    "http_request_dependency_seconds",
+    "Total time one request spent in a dependency",
+    ("route", "dependency"),
+))
+REQUEST_DEPENDENCY_CALLS = registry.register(Histogram(
+    "http_request_dependency_calls",
+    "Calls one request made to a dependency (Postgres: statements)",
+    ("route", "dependency"),
+    buckets=COUNT_BUCKETS,
+))
+
+
+def render_metrics() -> str:
+    return registry.render()
+
+
+# -------------------------------------------------------------------
+# Per-request stats
+# -------------------------------------------------------------------
+class RequestStats:
+    """
+    Dependency calls / seconds accumulated while serving one request
+    """
+
+    __slots__ = ("timings",)
+
+    def __init__(self):
+        self.timings: dict[str, list] = {}
+
+    def add(self, dependency: str, seconds: float) -> None:
+        timing = self.timings.get(dependency)
+        if timing is None:
+            self.timings[dependency] = [1, seconds]
+        else:
+            timing[0] += 1
+            timing[1] += seconds
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """
+    Stats of the request being served (None in background tasks)
+    """
+    return _request_stats.get()
+
+
+def observe_dependency(dependency: str, operation: str, seconds: float) -> None:
+    DEPENDENCY_SECONDS.observe(seconds, dependency, operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add(dependency, seconds)
+
+
+@contextmanager
+def timed(dependency: str, operation: str):
+    """
+    with timed("redis", "get"): ...
+    ``operation`` must come from a small fixed set (command, queue name)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DEPENDENCY_ERRORS.inc(dependency, operation)
+        raise
+    finally:
+        observe_dependency(dependency, operation, time.perf_counter() - started)
+
+
+# -------------------------------------------------------------------
+# SQLAlchemy hooks
+# -------------------------------------------------------------------
+_STATEMENT_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def _statement_kind(statement: str) -> str:
+    words = statement.lstrip()[:7].split(None, 1)
+    kind = words[0].upper() if words else ""
+    return kind.lower() if kind in _STATEMENT_KINDS else "other"
+
+
+def instrument_engine(engine) -> None:
+    """
+    Time every statement run through ``engine`` (an AsyncEngine)
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        observe_dependency("postgres", _statement_kind(statement), time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is None or not conn.info.get("metrics_started"):
+            return
+        started = conn.info["metrics_started"].pop()
+        kind = _statement_kind(exception_context.statement or "")
+        DEPENDENCY_ERRORS.inc("postgres", kind)
+        observe_dependency("postgres", kind, time.perf_counter() - started)
+
+
+# -------------------------------------------------------------------
+# ASGI middleware
+# -------------------------------------------------------------------
+# endpoint -> route path, built on the first matched request
+_endpoint_paths: dict = {}
+
+
+def route_template(scope: dict) -> str:
+    """
+    Path template of the matched route; the router stores the match in
+    the (shared) scope. Unmatched paths collapse into one label.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+
+    routes = getattr(scope.get("app"), "routes", ())
+    if not _endpoint_paths:
+        # None when one endpoint is mounted on several paths
+        for candidate in routes:
+            fn = getattr(candidate, "endpoint", None)
+            if fn is not None:
+                _endpoint_paths[fn] = None if fn in _endpoint_paths else candidate.path
+
+    path = _endpoint_paths.get(endpoint)
+    if path is not None:
+        return path
+
+    for candidate in routes:
+        if getattr(candidate, "endpoint", None) is endpoint:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                return candidate.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI (no BaseHTTPMiddleware), so streamed responses pass
+    through untouched and the timing covers the whole body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        HTTP_REQUESTS_IN_PROGRESS.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_PROGRESS.dec(method)
+            _request_stats.reset(token)
+
+            route = route_template(scope)
+            HTTP_REQUEST_SECONDS.observe(elapsed, method, route, str(status_code))
+            for dependency, (calls, seconds) in stats.timings.items():
+                REQUEST_DEPENDENCY_CALLS.observe(calls, route, dependency)
+                REQUEST_DEPENDENCY_SECONDS.observe(seconds, route, dependency)
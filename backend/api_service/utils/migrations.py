@@ -0,0 +1,231 @@
+"""
+Versioned Schema Migrations
+Migrations live in the ``migrations`` package as ``NNNN_name.py``
+modules. Each one defines:
+
+    description = "..."
+    transactional = True          # False for CREATE INDEX CONCURRENTLY
+    async def upgrade(conn): ...  # conn is an AsyncConnection
+
+Applied versions are recorded in ``schema_migrations``. A Postgres
+advisory lock serializes runners, so when several replicas start at once
+one applies the pending migrations and the others wait, then find
+nothing left to do.
+
+A transactional migration runs in one transaction together with its
+``schema_migrations`` row. A non-transactional one runs on an autocommit
+connection. It is only recorded once every statement has succeeded, so
+it must be safe to re-run from the top (IF NOT EXISTS,
+``create_index_concurrently``).
+
+Run once per deploy with ``python migration.py``. Application startup
+only checks that nothing is pending, unless DB_MIGRATE_ON_STARTUP is set.
+"""
+
+import importlib
+import logging
+import pkgutil
+import re
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from config.settings import settings
+from utils.database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PACKAGE = "migrations"
+MIGRATIONS_TABLE = "schema_migrations"
+
+# pg_advisory_lock key shared by every migration runner ("csmigrat")
+ADVISORY_LOCK_KEY = 0x63736D6967726174
+
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+
+# -------------------------------------------------------------------
+# Discovery
+# -------------------------------------------------------------------
+class Migration:
+    def __init__(self, version: int, name: str, module):
+        self.version = version
+        self.name = name
+        self.module = module
+        self.description = getattr(module, "description", name)
+        self.transactional = getattr(module, "transactional", True)
+
+    async def upgrade(self, conn: AsyncConnection) -> None:
+        await self.module.upgrade(conn)
+
+    def __repr__(self) -> str:
+        return f"{self.version:04d}_{self.name}"
+
+
+def load_migrations() -> list[Migration]:
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+
+    migrations: dict[int, Migration] = {}
+    for info in pkgutil.iter_modules(package.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise RuntimeError(
+                f"Duplicate migration version {version}: "
+                f"{migrations[version]} and {info.name}"
+            )
+        module = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{info.name}")
+        migrations[version] = Migration(version, match.group(2), module)
+
+    return [migrations[version] for version in sorted(migrations)]
+
+
+# -------------------------------------------------------------------
+# Helpers for migration modules
+# -------------------------------------------------------------------
+async def create_index_concurrently(
+    conn: AsyncConnection,
+    name: str,
+    table: str,
+    definition: str,
+    unique: bool = False,
+) -> None:
+    """
+    CREATE [UNIQUE] INDEX CONCURRENTLY IF NOT EXISTS <name> ON <table> <definition>
+
+    A failed concurrent build leaves an INVALID index behind that
+    IF NOT EXISTS would then skip, so one is dropped and rebuilt. Needs
+    an autocommit connection (``transactional = False``).
+    """
+    invalid = await conn.scalar(
+        text(
+            "SELECT NOT indisvalid FROM pg_index "
+            "WHERE indexrelid = to_regclass(:name)"
+        ),
+        {"name": name},
+    )
+    if invalid:
+        logger.warning(f"Dropping invalid index {name} left by a failed build")
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+    started = time.perf_counter()
+    await conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS "
+        f"{name} ON {table} {definition}"
+    ))
+    logger.info(f"Index {name} ready ({time.perf_counter() - started:.1f}s)")
+
+
+async def constraint_exists(conn: AsyncConnection, name: str) -> bool:
+    return bool(await conn.scalar(
+        text("SELECT 1 FROM pg_constraint WHERE conname = :name"),
+        {"name": name},
+    ))
+
+
+# -------------------------------------------------------------------
+# Runner
+# -------------------------------------------------------------------
+async def _ensure_table(conn: AsyncConnection) -> None:
+    await conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            duration_ms INTEGER NOT NULL
+        )
+    """))
+
+
+async def _applied_versions(conn: AsyncConnection) -> set[int]:
+    exists = await conn.scalar(
+        text("SELECT to_regclass(:table) IS NOT NULL"),
+        {"table": MIGRATIONS_TABLE},
+    )
+    if not exists:
+        return set()
+    result = await conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))
+    return {row[0] for row in result}
+
+
+async def _record(conn: AsyncConnection, migration: Migration, duration_ms: int) -> None:
+    await conn.execute(
+        text(
+            f"INSERT INTO {MIGRATIONS_TABLE} (version, name, duration_ms) "
+            "VALUES (:version, :name, :duration_ms)"
+        ),
+        {"version": migration.version, "name": migration.name, "duration_ms": duration_ms},
+    )
+
+
+async def pending_migrations(engine: AsyncEngine = default_engine) -> list[Migration]:
+    async with engine.connect() as conn:
+        applied = await _applied_versions(conn)
+    return [m for m in load_migrations() if m.version not in applied]
+
+
+async def run_migrations(engine: AsyncEngine = default_engine) -> list[Migration]:
+    """
+    Apply pending migrations in order; returns the ones applied here
+    """
+    migrations = load_migrations()
+    applied_now: list[Migration] = []
+
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+
+        # Session-level lock: held across the per-migration transactions
+        await lock_conn.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}
+        )
+        try:
+            await _ensure_table(lock_conn)
+            applied = await _applied_versions(lock_conn)
+
+            for migration in migrations:
+                if migration.version in applied:
+                    continue
+
+                logger.info(f"Applying migration {migration}: {migration.description}")
+                started = time.perf_counter()
+
+                if migration.transactional:
+                    async with engine.begin() as conn:
+                        await migration.upgrade(conn)
+                        await _record(conn, migration, int((time.perf_counter() - started) * 1000))
+                else:
+                    await migration.upgrade(lock_conn)
+                    await _record(lock_conn, migration, int((time.perf_counter() - started) * 1000))
+
+                applied_now.append(migration)
+                logger.info(
+                    f"Migration {migration} applied in {time.perf_counter() - started:.1f}s"
+                )
+        finally:
+            await lock_conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY}
+            )
+
+    if not applied_now:
+        logger.info("Database schema is up to date")
+    return applied_now
+
+
+async def ensure_schema() -> None:
+    """
+    Startup step: migrate (DB_MIGRATE_ON_STARTUP) or refuse to serve an
+    outdated schema. Raising keeps /ready at 503 until it passes.
+    """
+    if settings.DB_MIGRATE_ON_STARTUP:
+        await run_migrations()
+        return
+
+    pending = await pending_migrations()
+    if pending:
+        raise RuntimeError(
+            f"{len(pending)} migration(s) pending ({', '.join(map(repr, pending))}); "
+            "run `python migration.py`"
+        )
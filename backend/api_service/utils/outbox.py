@@ -0,0 +1,190 @@
+"""
+Transactional Outbox Relay
+Routes write queue messages into outbox_messages inside their own
+transaction; a background task drains the table to RabbitMQ in batches.
+The broker is therefore never on the request latency path.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import delete, func, literal_column, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from models.outbox_models import OutboxMessage
+from utils.database import AsyncSessionLocal
+from utils.queue import publish_many
+
+logger = logging.getLogger(__name__)
+
+# Cap for the exponential retry delay (seconds)
+MAX_BACKOFF_SECONDS = 300
+
+
+def enqueue(db: AsyncSession, queue_name: str, payload: dict) -> None:
+    """
+    Stage a message; it is sent only if the caller's transaction commits
+    """
+    db.add(OutboxMessage(queue_name=queue_name, payload=payload))
+
+
+# -------------------------------------------------------------------
+# Relay
+# -------------------------------------------------------------------
+class OutboxRelay:
+    def __init__(
+        self,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        backoff_base: float,
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self.stats = {
+            "batches": 0,
+            "published": 0,
+            "failed": 0,
+            "last_batch_ms": 0.0,
+            "last_lag_seconds": 0.0,
+        }
+
+    def wake(self) -> None:
+        """
+        Drain now instead of waiting for the next poll (after a commit)
+        """
+        self._wakeup.set()
+
+    async def drain_once(self) -> int:
+        """
+        Publish one batch. Rows are locked with SKIP LOCKED so several
+        replicas can relay concurrently without double sending.
+        """
+        started = time.perf_counter()
+
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(OutboxMessage)
+                    .where(
+                        OutboxMessage.available_at <= func.now(),
+                        OutboxMessage.attempts < self.max_attempts,
+                    )
+                    .order_by(OutboxMessage.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                rows = result.scalars().all()
+                if not rows:
+                    return 0
+
+                by_queue: dict[str, list[OutboxMessage]] = defaultdict(list)
+                for row in rows:
+                    by_queue[row.queue_name].append(row)
+
+                sent_ids: list[int] = []
+                failed_ids: list[int] = []
+                for queue_name, queued in by_queue.items():
+                    flags = await publish_many(queue_name, [r.payload for r in queued])
+                    for row, ok in zip(queued, flags):
+                        (sent_ids if ok else failed_ids).append(row.id)
+
+                if sent_ids:
+                    await session.execute(
+                        delete(OutboxMessage).where(OutboxMessage.id.in_(sent_ids))
+                    )
+
+                if failed_ids:
+                    delay = func.least(
+                        func.power(self.backoff_base, OutboxMessage.attempts + 1),
+                        MAX_BACKOFF_SECONDS,
+                    )
+                    await session.execute(
+                        update(OutboxMessage)
+                        .where(OutboxMessage.id.in_(failed_ids))
+                        .values(
+                            attempts=OutboxMessage.attempts + 1,
+                            available_at=func.now() + delay * literal_column("interval '1 second'"),
+                            last_error="publish not confirmed",
+                        )
+                    )
+
+        oldest = min(row.created_at for row in rows if row.created_at) if rows else None
+
+        self.stats["batches"] += 1
+        self.stats["published"] += len(sent_ids)
+        self.stats["failed"] += len(failed_ids)
+        self.stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        if oldest is not None:
+            self.stats["last_lag_seconds"] = round(
+                max(0.0, (datetime.utcnow() - oldest).total_seconds()), 3
+            )
+
+        if failed_ids:
+            logger.warning(f"Outbox: {len(failed_ids)} messages failed, will retry")
+
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            # Cleared before draining so a wake() during the batch is not lost
+            self._wakeup.clear()
+            try:
+                drained = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox relay batch failed")
+                drained = 0
+
+            # Full batch → more is probably waiting, go again right away
+            if drained >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Outbox relay started")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Outbox relay stopped")
+
+
+# -------------------------------------------------------------------
+# Global relay
+# -------------------------------------------------------------------
+outbox_relay = OutboxRelay(
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    backoff_base=settings.OUTBOX_BACKOFF_BASE,
+)
+
+
+async def start_outbox_relay():
+    await outbox_relay.start()
+
+
+async def close_outbox_relay():
+    await outbox_relay.stop()
@@ -0,0 +1,154 @@
+"""
+Pagination helpers
+Keyset (cursor) pagination on (created_at, id) and cached list totals
+"""
+
+import base64
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from utils.cache import TTLCache
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+COUNT_PREFIX = "count:"
+COUNT_VERSION_PREFIX = "count_version:"
+
+# Fallback when Redis is not available
+_local_counts = TTLCache(maxsize=10000, default_ttl=settings.COUNT_CACHE_TTL)
+_local_versions: dict[str, int] = {}
+
+
+# -------------------------------------------------------------------
+# Cursors
+# -------------------------------------------------------------------
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """
+    Opaque cursor pointing just past (created_at, id)
+    """
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+async def keyset_paginate(
+    db: AsyncSession,
+    query: Select,
+    created_col,
+    id_col,
+    cursor: Optional[str],
+    page_size: int,
+) -> tuple[list, Optional[str]]:
+    """
+    Fetch one page ordered by (created_at, id) DESC starting after ``cursor``.
+    Cost depends on page_size only, not on how deep the page is.
+    """
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.where(tuple_(created_col, id_col) < (created_at, last_id))
+
+    query = query.order_by(created_col.desc(), id_col.desc()).limit(page_size + 1)
+
+    result = await db.execute(query)
+    rows = list(result.scalars().all())
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, created_col.key),
+            getattr(last, id_col.key),
+        )
+
+    return rows, next_cursor
+
+
+# -------------------------------------------------------------------
+# Cached totals
+# Keys embed a per-scope version; writers bump the version instead of
+# hunting down every filtered count key
+# -------------------------------------------------------------------
+def _filters_digest(filters: dict) -> str:
+    raw = json.dumps(filters, sort_keys=True, default=str).encode()
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+async def cached_count(
+    db: AsyncSession,
+    scope: str,
+    query: Select,
+    filters: Optional[dict] = None,
+) -> int:
+    """
+    COUNT(*) of ``query``, cached for COUNT_CACHE_TTL seconds per
+    (scope, filters). Totals are approximate within that window.
+    """
+    redis = await get_redis()
+    digest = _filters_digest(filters or {})
+
+    if redis:
+        try:
+            version = await redis.get(COUNT_VERSION_PREFIX + scope) or "0"
+            key = f"{COUNT_PREFIX}{scope}:{version}:{digest}"
+            cached = await redis.get(key)
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            logger.warning(f"Count cache lookup failed: {e}")
+            redis = None
+
+    if not redis:
+        key = f"{COUNT_PREFIX}{scope}:{_local_versions.get(scope, 0)}:{digest}"
+        cached = _local_counts.get(key)
+        if cached is not None:
+            return cached
+
+    result = await db.execute(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    )
+    total = result.scalar() or 0
+
+    if redis:
+        try:
+            await redis.set(key, total, ex=settings.COUNT_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Count cache store failed: {e}")
+    else:
+        _local_counts.set(key, total)
+
+    return total
+
+
+async def invalidate_count(scope: str) -> None:
+    """
+    Drop all cached totals for a scope (call after inserts/deletes)
+    """
+    _local_versions[scope] = _local_versions.get(scope, 0) + 1
+
+    redis = await get_redis()
+    if redis:
+        try:
+            await redis.incr(COUNT_VERSION_PREFIX + scope)
+        except Exception as e:
+            logger.warning(f"Count cache invalidation failed: {e}")
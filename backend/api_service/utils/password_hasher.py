@@ -0,0 +1,161 @@
+"""
+Async Password Hashing Service
+Runs bcrypt on a bounded thread pool so it never blocks the event loop
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from fastapi import HTTPException, status
+
+from config.settings import settings
+from utils.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Number of recent samples kept per operation for percentiles
+_SAMPLE_WINDOW = 1024
+
+
+# -------------------------------------------------------------------
+# Per-operation timing metrics
+# -------------------------------------------------------------------
+class _OpMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.wait_total_ms = 0.0
+        self.samples: deque[float] = deque(maxlen=_SAMPLE_WINDOW)
+
+    def record(self, wait_ms: float, run_ms: float) -> None:
+        self.calls += 1
+        self.total_ms += run_ms
+        self.wait_total_ms += wait_ms
+        self.max_ms = max(self.max_ms, run_ms)
+        self.samples.append(run_ms)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            "calls": self.calls,
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "avg_wait_ms": round(self.wait_total_ms / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": round(pct(0.50), 2),
+            "p99_ms": round(pct(0.99), 2),
+        }
+
+
+# -------------------------------------------------------------------
+# Password Hasher
+# -------------------------------------------------------------------
+class PasswordHasher:
+    """
+    Bounded worker pool for CPU-heavy password hashing.
+
+    At most ``max_workers`` hashes run at once and at most ``max_queue``
+    more may wait. Anything beyond that is rejected with 503 +
+    Retry-After instead of piling up behind the pool.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self.rejected = 0
+        self._metrics: dict[str, _OpMetrics] = {
+            "hash": _OpMetrics(),
+            "verify": _OpMetrics(),
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="pwd-hash",
+            )
+        return self._executor
+
+    @staticmethod
+    def _timed(fn: Callable, args: tuple, queued_at: float):
+        started = time.perf_counter()
+        result = fn(*args)
+        finished = time.perf_counter()
+        return result, (started - queued_at) * 1000, (finished - started) * 1000
+
+    async def run(self, op: str, fn: Callable, *args):
+        """
+        Run ``fn(*args)`` on the pool, applying backpressure when saturated
+        """
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            logger.warning(
+                f"Password hasher saturated ({self._in_flight} in flight), rejecting {op}"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, please retry",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            with timed("bcrypt", op):
+                result, wait_ms, run_ms = await loop.run_in_executor(
+                    self._get_executor(),
+                    self._timed,
+                    fn,
+                    args,
+                    time.perf_counter(),
+                )
+            self._metrics[op].record(wait_ms, run_ms)
+            return result
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+            **{op: m.snapshot() for op, m in self._metrics.items()},
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("Password hasher pool closed")
+
+
+# -------------------------------------------------------------------
+# Global hasher
+# -------------------------------------------------------------------
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
+
+
+def close_password_hasher():
+    """
+    Shut down the hashing pool
+    """
+    password_hasher.shutdown()
@@ -0,0 +1,390 @@
+"""
+Query Profiler (development)
+Hooks the SQLAlchemy engine, groups statements by a normalized
+fingerprint (literals and placeholders replaced, IN / VALUES lists
+collapsed) and keeps per-fingerprint totals.
+
+Flags:
+- slow statements, over QUERY_SLOW_MS;
+- N+1 patterns, where one request runs the same SELECT fingerprint
+  QUERY_N_PLUS_ONE_THRESHOLD times or more.
+
+The first time a SELECT is slow, it is explained in the background on
+a separate connection, which is then discarded (never returned to the
+pool). ``EXPLAIN ANALYZE`` executes the statement, so it is only used
+for plain reads; a SELECT that calls a side-effecting function
+(advisory locks, nextval, ...) gets a plain ``EXPLAIN``. The plan is
+kept with the fingerprint.
+
+Enabled with QUERY_PROFILER_ENABLED (defaults to DEBUG). Results are at
+``GET /api/v1/debug/queries`` and the top statements are logged on
+shutdown.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import event
+
+from config.settings import settings
+from utils.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# Max concurrent background EXPLAINs (each holds a pooled connection)
+_MAX_EXPLAINS_IN_FLIGHT = 2
+
+
+# -------------------------------------------------------------------
+# Fingerprinting
+# -------------------------------------------------------------------
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:''|[^'])*'")
+_PLACEHOLDERS = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+\b")
+_NUMBERS = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_VALUES_ROWS = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_WHITESPACE = re.compile(r"\s+")
+_WRITES = re.compile(r"\b(?:INSERT|UPDATE|DELETE)\b", re.I)
+# Functions whose effects EXPLAIN ANALYZE would repeat
+_SIDE_EFFECTS = re.compile(
+    r"\b(?:pg_\w*lock\w*|nextval|setval|pg_notify|pg_sleep\w*|set_config|"
+    r"pg_cancel_backend|pg_terminate_backend|dblink\w*|lo_\w+)\s*\(",
+    re.I,
+)
+
+
+def normalize(statement: str) -> str:
+    """
+    "SELECT * FROM t WHERE id IN ($1, $2) AND x = 'a'"
+    → "SELECT * FROM t WHERE id IN (...) AND x = ?"
+    """
+    sql = _COMMENTS.sub(" ", statement)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _IN_LISTS.sub("IN (...)", sql)
+    sql = _VALUES_ROWS.sub(r"\1, ...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> tuple[str, str]:
+    """
+    (fingerprint id, normalized SQL); the id is stable across processes
+    """
+    normalized = normalize(statement)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def _is_select(normalized: str) -> bool:
+    head = normalized[:6].upper()
+    return head == "SELECT" or (head.startswith("WITH") and not _WRITES.search(normalized))
+
+
+def _explainable(normalized: str) -> bool:
+    return _is_select(normalized)
+
+
+def _analyzable(normalized: str) -> bool:
+    # ANALYZE runs the statement: never for row locks or side effects
+    upper = normalized.upper()
+    return (
+        " FOR UPDATE" not in upper
+        and " FOR SHARE" not in upper
+        and not _SIDE_EFFECTS.search(normalized)
+    )
+
+
+# -------------------------------------------------------------------
+# Stats
+# -------------------------------------------------------------------
+class StatementStats:
+    __slots__ = (
+        "fingerprint", "sql", "calls", "total_ms", "max_ms",
+        "slow", "n_plus_one", "routes", "plan",
+    )
+
+    def __init__(self, fp: str, sql: str):
+        self.fingerprint = fp
+        self.sql = sql
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow = 0
+        self.n_plus_one = 0
+        # last routes this was flagged on (N+1 / slow)
+        self.routes: list[str] = []
+        self.plan: Optional[str] = None
+
+    def flag_route(self, route: Optional[str]) -> None:
+        if route and route not in self.routes:
+            self.routes = (self.routes + [route])[-5:]
+
+    def to_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "slow": self.slow,
+            "n_plus_one": self.n_plus_one,
+            "routes": self.routes,
+            "plan": self.plan,
+        }
+
+
+class _RequestQueries:
+    """
+    Statements seen while serving one request
+    """
+
+    __slots__ = ("method", "scope", "counts")
+
+    def __init__(self, method: str, scope: dict):
+        self.method = method
+        self.scope = scope
+        # fingerprint -> [calls, total_ms]
+        self.counts: dict[str, list] = {}
+
+    @property
+    def route(self) -> str:
+        # Resolved on use: the router records the match in the shared scope
+        return f"{self.method} {route_template(self.scope)}"
+
+
+_current_request: ContextVar[Optional[_RequestQueries]] = ContextVar(
+    "query_profiler_request", default=None
+)
+
+
+# -------------------------------------------------------------------
+# Profiler
+# -------------------------------------------------------------------
+class QueryProfiler:
+    def __init__(
+        self,
+        slow_ms: float,
+        n_plus_one_threshold: int,
+        max_statements: int,
+        explain: bool,
+    ):
+        self.slow_ms = slow_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_statements = max_statements
+        self.explain = explain
+
+        self._engine = None
+        self._statements: dict[str, StatementStats] = {}
+        self._explain_tasks: set[asyncio.Task] = set()
+        self.requests = 0
+
+    # ---------------------------------------------------------------
+    # Engine hooks
+    # ---------------------------------------------------------------
+    def install(self, engine) -> None:
+        """
+        Attach to ``engine`` (an AsyncEngine)
+        """
+        self._engine = engine
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+        logger.info(
+            f"Query profiler on (slow > {self.slow_ms} ms, "
+            f"N+1 >= {self.n_plus_one_threshold} repeats)"
+        )
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_started", []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("profiler_started"):
+            conn.info["profiler_started"].pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["profiler_started"].pop()) * 1000
+        if statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+
+        fp, sql = fingerprint(statement)
+        stats = self._stats_for(fp, sql)
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+        request = _current_request.get()
+        if request is not None:
+            counts = request.counts.get(fp)
+            if counts is None:
+                request.counts[fp] = [1, elapsed_ms]
+            else:
+                counts[0] += 1
+                counts[1] += elapsed_ms
+
+        if elapsed_ms >= self.slow_ms:
+            stats.slow += 1
+            stats.flag_route(request.route if request else None)
+            logger.warning(
+                f"Slow query {fp} ({elapsed_ms:.1f} ms"
+                f"{', ' + request.route if request else ''}): {sql}"
+            )
+            if not executemany:
+                self._maybe_explain(stats, statement, parameters)
+
+    def _stats_for(self, fp: str, sql: str) -> StatementStats:
+        stats = self._statements.get(fp)
+        if stats is None:
+            if len(self._statements) >= self.max_statements:
+                # Make room by dropping the cheapest statement seen so far
+                cheapest = min(self._statements.values(), key=lambda s: s.total_ms)
+                del self._statements[cheapest.fingerprint]
+            stats = self._statements[fp] = StatementStats(fp, sql)
+        return stats
+
+    # ---------------------------------------------------------------
+    # Requests
+    # ---------------------------------------------------------------
+    def begin_request(self, scope: dict):
+        return _current_request.set(_RequestQueries(scope["method"], scope))
+
+    def end_request(self, token) -> None:
+        request = _current_request.get()
+        _current_request.reset(token)
+        if request is None:
+            return
+
+        self.requests += 1
+        for fp, (calls, total_ms) in request.counts.items():
+            if calls < self.n_plus_one_threshold:
+                continue
+            stats = self._statements.get(fp)
+            if stats is None or not _is_select(stats.sql):
+                continue
+            stats.n_plus_one += 1
+            stats.flag_route(request.route)
+            logger.warning(
+                f"Possible N+1 in {request.route}: {fp} ran {calls}x "
+                f"({total_ms:.1f} ms): {stats.sql}"
+            )
+
+    # ---------------------------------------------------------------
+    # EXPLAIN capture
+    # ---------------------------------------------------------------
+    def _maybe_explain(self, stats: StatementStats, statement: str, parameters) -> None:
+        if (
+            not self.explain
+            or self._engine is None
+            or stats.plan is not None
+            or len(self._explain_tasks) >= _MAX_EXPLAINS_IN_FLIGHT
+            or not _explainable(stats.sql)
+        ):
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        stats.plan = "pending"
+        task = loop.create_task(self._explain(stats, statement, parameters))
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(self, stats: StatementStats, statement: str, parameters) -> None:
+        if isinstance(parameters, list):
+            parameters = tuple(parameters)
+        options = "ANALYZE, BUFFERS" if _analyzable(stats.sql) else "COSTS"
+        try:
+            async with self._engine.connect() as conn:
+                try:
+                    result = await conn.exec_driver_sql(
+                        f"EXPLAIN ({options}) {statement}", parameters or ()
+                    )
+                    stats.plan = "\n".join(row[0] for row in result)
+                finally:
+                    # Session state (locks, settings) must not reach the pool
+                    await conn.invalidate()
+            logger.info(f"Captured plan for {stats.fingerprint}:\n{stats.plan}")
+        except Exception as e:
+            stats.plan = f"EXPLAIN failed: {e}"
+
+    # ---------------------------------------------------------------
+    # Reporting
+    # ---------------------------------------------------------------
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> list[dict]:
+        rows = [stats.to_dict() for stats in self._statements.values()]
+        rows.sort(key=lambda row: row[order_by], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        self._statements.clear()
+        self.requests = 0
+
+    def log_top(self, limit: int = 10) -> None:
+        for row in self.top(limit):
+            logger.info(
+                f"{row['fingerprint']} calls={row['calls']} total={row['total_ms']}ms "
+                f"mean={row['mean_ms']}ms slow={row['slow']} n+1={row['n_plus_one']}: "
+                f"{row['sql']}"
+            )
+
+    async def close(self) -> None:
+        for task in list(self._explain_tasks):
+            task.cancel()
+        if self._explain_tasks:
+            await asyncio.gather(*self._explain_tasks, return_exceptions=True)
+
+
+# -------------------------------------------------------------------
+# ASGI middleware
+# -------------------------------------------------------------------
+class QueryProfilerMiddleware:
+    """
+    Scopes statement counts to one HTTP request (for N+1 detection)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = query_profiler.begin_request(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            query_profiler.end_request(token)
+
+
+# -------------------------------------------------------------------
+# Global profiler
+# -------------------------------------------------------------------
+query_profiler = QueryProfiler(
+    slow_ms=settings.QUERY_SLOW_MS,
+    n_plus_one_threshold=settings.QUERY_N_PLUS_ONE_THRESHOLD,
+    max_statements=settings.QUERY_PROFILER_MAX_STATEMENTS,
+    explain=settings.QUERY_PROFILER_EXPLAIN,
+)
+
+
+async def close_query_profiler():
+    """
+    Log the most expensive statements and stop pending EXPLAINs
+    """
+    if not settings.QUERY_PROFILER_ENABLED:
+        return
+    await query_profiler.close()
+    query_profiler.log_top()
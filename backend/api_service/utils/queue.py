@@ -2,10 +2,14 @@
 RabbitMQ / Message Queue Connection (ASYNC)
 """
 
+import asyncio
 import json
 import logging
+from contextlib import asynccontextmanager
+
 import aio_pika
 from config.settings import settings
+from utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
@@ -38,77 +42,232 @@ async def get_queue_connection() -> aio_pika.RobustConnection | None:
 
 
 
-async def publish_message(queue_name: str, message: dict) -> bool:
+# -------------------------------------------------------------------
+# Publisher channel pool
+# -------------------------------------------------------------------
+class ChannelPool:
     """
-    Publish message to queue (ASYNC)
+    Fixed-size pool of confirm-mode channels on the shared connection.
+
+    ``connection_factory`` is any coroutine returning an object with an
+    async ``channel(publisher_confirms=...)`` method, so tests can pass a
+    local stand-in broker instead of RabbitMQ.
     """
-    try:
-        connection = await get_queue_connection()
-        if not connection:
-            logger.warning("Queue not available, message not sent")
-            return False
 
-        channel = await connection.channel()
+    def __init__(self, size: int, connection_factory=None):
+        self.size = size
+        self._connection_factory = connection_factory or get_queue_connection
+        self._idle: list = []
+        self._created = 0
+        # One permit per channel in use; release() always gives it back, so
+        # a waiter wakes even when the channel it frees was closed
+        self._capacity = asyncio.Semaphore(size)
+
+    async def acquire(self):
+        await self._capacity.acquire()
+        try:
+            while self._idle:
+                channel = self._idle.pop()
+                if not channel.is_closed:
+                    return channel
+                self._created -= 1
+
+            # Holding a permit with nothing idle means fewer than size
+            # channels are open: open a replacement
+            connection = await self._connection_factory()
+            if not connection:
+                self._capacity.release()
+                return None
+            channel = await connection.channel(publisher_confirms=True)
+            self._created += 1
+            return channel
+        except BaseException:
+            self._capacity.release()
+            raise
+
+    def release(self, channel) -> None:
+        if channel.is_closed:
+            self._created -= 1
+        else:
+            self._idle.append(channel)
+        self._capacity.release()
+
+    async def fill(self) -> int:
+        """
+        Open channels up to ``size`` ahead of the first publish
+        """
+        channels = []
+        for _ in range(self.size - self._created):
+            channel = await self.acquire()
+            if channel is None:
+                break
+            channels.append(channel)
+        for channel in channels:
+            self.release(channel)
+        return len(channels)
+
+    @asynccontextmanager
+    async def channel(self):
+        channel = await self.acquire()
+        try:
+            yield channel
+        finally:
+            if channel is not None:
+                self.release(channel)
+
+    async def close(self) -> None:
+        while self._idle:
+            channel = self._idle.pop()
+            self._created -= 1
+            try:
+                await channel.close()
+            except Exception:
+                pass
+
+
+class QueuePublisher:
+    """
+    Publishes JSON messages through pooled channels. Durable queues are
+    declared once per process, and publishes are pipelined so broker
+    confirms are awaited in batches rather than one round trip each.
+    """
 
-        await channel.declare_queue(
-            queue_name,
-            durable=True
+    def __init__(
+        self,
+        pool_size: int,
+        confirm_batch: int,
+        connection_factory=None,
+    ):
+        self.pool = ChannelPool(pool_size, connection_factory)
+        self.confirm_batch = confirm_batch
+        self._declared: set[str] = set()
+
+    async def _ensure_queue(self, channel, queue_name: str) -> None:
+        if queue_name in self._declared:
+            return
+        await channel.declare_queue(queue_name, durable=True)
+        self._declared.add(queue_name)
+
+    @staticmethod
+    def _build(message: dict) -> aio_pika.Message:
+        return aio_pika.Message(
+            body=json.dumps(message).encode(),
+            content_type="application/json",
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
         )
 
-        await channel.default_exchange.publish(
-            aio_pika.Message(
-                body=json.dumps(message).encode(),
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-            ),
-            routing_key=queue_name
-        )
+    async def publish_many(self, queue_name: str, messages: list[dict]) -> list[bool]:
+        """
+        Publish messages and wait for broker confirms.
+        Returns one success flag per message, in order.
+        """
+        if not messages:
+            return []
+
+        with timed("rabbitmq", queue_name):
+            return await self._publish_many(queue_name, messages)
+
+    async def _publish_many(self, queue_name: str, messages: list[dict]) -> list[bool]:
+        results: list[bool] = []
+        try:
+            async with self.pool.channel() as channel:
+                if channel is None:
+                    logger.warning("Queue not available, messages not sent")
+                    return [False] * len(messages)
+
+                await self._ensure_queue(channel, queue_name)
+
+                for start in range(0, len(messages), self.confirm_batch):
+                    chunk = messages[start:start + self.confirm_batch]
+                    confirms = await asyncio.gather(
+                        *(
+                            channel.default_exchange.publish(
+                                self._build(message),
+                                routing_key=queue_name,
+                            )
+                            for message in chunk
+                        ),
+                        return_exceptions=True,
+                    )
+                    for confirm in confirms:
+                        if isinstance(confirm, Exception):
+                            logger.error(f"Publish to {queue_name} not confirmed: {confirm}")
+                            results.append(False)
+                        else:
+                            results.append(True)
+
+        except Exception:
+            logger.exception(f"Failed to publish to {queue_name}")
+            # Queue may have been deleted / channel reset → redeclare next time
+            self._declared.discard(queue_name)
+
+        results.extend([False] * (len(messages) - len(results)))
+        return results
+
+    async def publish(self, queue_name: str, message: dict) -> bool:
+        return (await self.publish_many(queue_name, [message]))[0]
+
+    async def close(self) -> None:
+        await self.pool.close()
+        self._declared.clear()
+
+
+publisher = QueuePublisher(
+    pool_size=settings.RABBITMQ_CHANNEL_POOL_SIZE,
+    confirm_batch=settings.RABBITMQ_CONFIRM_BATCH,
+)
+
 
+async def publish_message(queue_name: str, message: dict) -> bool:
+    """
+    Publish message to queue (ASYNC)
+    """
+    published = await publisher.publish(queue_name, message)
+    if published:
         logger.info(f"Message published to {queue_name}")
-        return True
+    return published
 
-    except Exception as e:
-        logger.exception("Failed to publish message")
-        return False
+
+async def publish_many(queue_name: str, messages: list[dict]) -> list[bool]:
+    """
+    Publish many messages to one queue with batched confirms (ASYNC)
+    """
+    results = await publisher.publish_many(queue_name, messages)
+    logger.info(f"Published {sum(results)}/{len(messages)} messages to {queue_name}")
+    return results
 
 
 
 async def consume_messages(queue_name: str, callback):
     """
-    Consume messages from queue (ASYNC)
+    Consume messages from queue (ASYNC), one at a time
 
     callback signature:
         async def callback(payload: dict)
-    """
-    try:
-        connection = await get_queue_connection()
-        if not connection:
-            logger.warning("Queue not available")
-            return
-
-        channel = await connection.channel()
-        await channel.set_qos(prefetch_count=1)
-
-        queue = await channel.declare_queue(
-            queue_name,
-            durable=True
-        )
 
-        logger.info(f"Consuming messages from {queue_name}")
-
-        async with queue.iterator() as queue_iter:
-            async for message in queue_iter:
-                try:
-                    payload = json.loads(message.body)
-
-                    await callback(payload)
+    For throughput use utils.consumer.BatchConsumer directly.
+    """
+    from utils.consumer import BatchConsumer
 
-                    await message.ack()
+    async def handler(payloads: list[dict]):
+        await callback(payloads[0])
 
-                except Exception:
-                    logger.exception("Message processing failed")
-                    await message.nack(requeue=False)
+    consumer = BatchConsumer(
+        queue_name,
+        handler,
+        batch_size=1,
+        batch_timeout=0,
+        concurrency=1,
+    )
 
-    except Exception as e:
+    try:
+        if not await consumer.start():
+            return
+        await asyncio.Event().wait()
+    except asyncio.CancelledError:
+        await consumer.stop()
+        raise
+    except Exception:
         logger.exception("Failed to consume messages")
 
 
@@ -119,6 +278,8 @@ async def close_queue():
     """
     global _queue_connection
 
+    await publisher.close()
+
     if _queue_connection and not _queue_connection.is_closed:
         await _queue_connection.close()
 
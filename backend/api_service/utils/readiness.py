@@ -0,0 +1,231 @@
+"""
+Startup Warm-up & Readiness
+``warm_up`` runs once at startup, before the pod takes traffic:
+- fills the Postgres pool to pool_size, preparing the hot user lookup
+  on every connection;
+- opens Redis, RabbitMQ (plus the publisher channels) and ClickHouse
+  concurrently.
+
+``check_readiness`` backs ``GET /ready``. It pings every dependency
+concurrently and reports per-dependency latency. The pod is ready once
+warm-up has finished, no startup step is still failing and every
+dependency in READY_REQUIRED answers. It reports not ready again as
+soon as shutdown begins, so Kubernetes drains the pod before its
+connections close.
+
+A failed startup step is retried by a background task every
+STARTUP_RETRY_INTERVAL seconds, never from the probe: a step such as
+ensure_schema can take far longer than the kubelet's probe timeout.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import select, text
+
+from config.settings import settings
+from models.auth_models import User
+from utils.clickhouse_client import get_clickhouse
+from utils.database import engine
+from utils.queue import get_queue_connection, publisher
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_state = {"warm": False, "shutting_down": False}
+
+# Startup steps that raised; retried in the background until they succeed
+_failed_steps: dict[str, tuple[Callable[[], Awaitable], str]] = {}
+_retry_task: Optional[asyncio.Task] = None
+
+
+# -------------------------------------------------------------------
+# Startup steps
+# -------------------------------------------------------------------
+async def run_startup_step(name: str, step: Callable[[], Awaitable]) -> bool:
+    """
+    Run a required startup step (e.g. ensure_schema). A failure keeps the pod
+    unready instead of being swallowed, and is retried in the background.
+    """
+    global _retry_task
+
+    try:
+        await step()
+    except Exception as e:
+        logger.error(f"Startup step {name} failed: {e}")
+        _failed_steps[name] = (step, str(e))
+        if _retry_task is None or _retry_task.done():
+            _retry_task = asyncio.create_task(_retry_failed_steps())
+        return False
+    _failed_steps.pop(name, None)
+    return True
+
+
+async def _retry_failed_steps() -> None:
+    while _failed_steps and not _state["shutting_down"]:
+        await asyncio.sleep(settings.STARTUP_RETRY_INTERVAL)
+        for name, (step, _) in list(_failed_steps.items()):
+            try:
+                await step()
+            except Exception as e:
+                logger.warning(f"Startup step {name} still failing: {e}")
+                _failed_steps[name] = (step, str(e))
+                continue
+            _failed_steps.pop(name, None)
+            logger.info(f"Startup step {name} succeeded on retry")
+
+
+# -------------------------------------------------------------------
+# Warm-up
+# -------------------------------------------------------------------
+async def _fill_db_pool() -> int:
+    """
+    Open pool_size connections at once so none is created on a request.
+    Each one runs the user lookup (token auth on every request), which
+    leaves it prepared on that connection.
+    """
+    hot_lookup = select(User.id).where(User.id == "")
+
+    async def open_connection():
+        return await engine.connect()
+
+    opened = await asyncio.gather(
+        *(open_connection() for _ in range(engine.pool.size())),
+        return_exceptions=True,
+    )
+    connections = [c for c in opened if not isinstance(c, BaseException)]
+    try:
+        await asyncio.gather(*(conn.execute(hot_lookup) for conn in connections))
+    finally:
+        # back to the pool, which keeps them open
+        await asyncio.gather(*(conn.close() for conn in connections), return_exceptions=True)
+
+    failed = len(opened) - len(connections)
+    if failed:
+        raise ConnectionError(f"{failed}/{len(opened)} pool connections failed")
+    return len(connections)
+
+
+async def _open_redis():
+    if await get_redis() is None:
+        raise ConnectionError("Redis unavailable")
+
+
+async def _open_queue():
+    if await get_queue_connection() is None:
+        raise ConnectionError("RabbitMQ unavailable")
+    await publisher.pool.fill()
+
+
+async def _open_clickhouse():
+    if await get_clickhouse() is None:
+        raise ConnectionError("ClickHouse unavailable")
+
+
+async def _timed_step(name: str, step: Callable[[], Awaitable]) -> None:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(step(), timeout=settings.WARMUP_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Warm-up {name} failed: {e!r}")
+        return
+    logger.info(f"Warm-up {name} done in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+async def warm_up() -> None:
+    """
+    Open every connection pool up front. Failures are only logged here;
+    /ready keeps reporting them until the dependency is back.
+    """
+    started = time.perf_counter()
+    await asyncio.gather(
+        _timed_step("postgres", _fill_db_pool),
+        _timed_step("redis", _open_redis),
+        _timed_step("rabbitmq", _open_queue),
+        _timed_step("clickhouse", _open_clickhouse),
+    )
+    _state["warm"] = True
+    logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+def mark_shutting_down() -> None:
+    _state["shutting_down"] = True
+    if _retry_task is not None:
+        _retry_task.cancel()
+
+
+# -------------------------------------------------------------------
+# Readiness
+# -------------------------------------------------------------------
+async def _ping_postgres():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _ping_redis():
+    redis = await get_redis()
+    if redis is None:
+        raise ConnectionError("not connected")
+    await redis.ping()
+
+
+async def _ping_rabbitmq():
+    connection = await get_queue_connection()
+    if connection is None or connection.is_closed:
+        raise ConnectionError("not connected")
+
+
+async def _ping_clickhouse():
+    client = await get_clickhouse()
+    if client is None:
+        raise ConnectionError("not connected")
+    await client.query("SELECT 1")
+
+
+CHECKS = {
+    "postgres": _ping_postgres,
+    "redis": _ping_redis,
+    "rabbitmq": _ping_rabbitmq,
+    "clickhouse": _ping_clickhouse,
+}
+
+
+async def _check(ping: Callable[[], Awaitable]) -> dict:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(ping(), timeout=settings.READY_CHECK_TIMEOUT)
+        result = {"ok": True}
+    except asyncio.TimeoutError:
+        result = {"ok": False, "error": "timeout"}
+    except Exception as e:
+        result = {"ok": False, "error": str(e) or type(e).__name__}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+async def check_readiness() -> tuple[bool, dict]:
+    """
+    (ready, report) with one entry per dependency; only reports state
+    """
+    names = list(CHECKS)
+    results = await asyncio.gather(*(_check(CHECKS[name]) for name in names))
+    checks = dict(zip(names, results))
+    for name, result in checks.items():
+        result["required"] = name in settings.READY_REQUIRED
+
+    ready = (
+        _state["warm"]
+        and not _state["shutting_down"]
+        and not _failed_steps
+        and all(result["ok"] for result in checks.values() if result["required"])
+    )
+    report = {
+        "status": "ready" if ready else "not_ready",
+        "warm": _state["warm"],
+        "shutting_down": _state["shutting_down"],
+        "failed_startup_steps": {name: error for name, (_, error) in _failed_steps.items()},
+        "checks": checks,
+    }
+    return ready, report
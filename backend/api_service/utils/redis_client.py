@@ -4,10 +4,32 @@ Async Redis Connection
 
 import logging
 from redis.asyncio import Redis, ConnectionPool
+from redis.asyncio.client import Pipeline
 from config.settings import settings
+from utils.metrics import timed
 
 logger = logging.getLogger(__name__)
 
+# -------------------------------------------------------------------
+# Timed client (commands and pipelines show up in /metrics)
+# -------------------------------------------------------------------
+class _TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        with timed("redis", "pipeline"):
+            return await super().execute(raise_on_error)
+
+
+class _TimedRedis(Redis):
+    async def execute_command(self, *args, **options):
+        with timed("redis", str(args[0]).lower()):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return _TimedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
 # -------------------------------------------------------------------
 # Global Redis objects
 # -------------------------------------------------------------------
@@ -32,7 +54,7 @@ async def get_redis() -> Redis | None:
                 decode_responses=True,
             )
 
-            redis_client = Redis(connection_pool=redis_pool)
+            redis_client = _TimedRedis(connection_pool=redis_pool)
 
             # Test connection
             await redis_client.ping()
@@ -0,0 +1,132 @@
+"""
+Scan Status Event Hub
+Status / progress updates are published on Redis channels
+``vs:scan:<scan_id>``. Each API process holds ONE pattern subscription
+and fans messages out to local per-client queues, so N open SSE streams
+cost one Redis connection, not N.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "vs:scan:"
+
+# Per-client buffer; a client that falls this far behind loses old events
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+async def publish_scan_event(scan_id: str, event: dict) -> None:
+    redis = await get_redis()
+    if not redis:
+        logger.warning("Redis not available, scan event not published")
+        return
+
+    try:
+        await redis.publish(CHANNEL_PREFIX + scan_id, json.dumps(event))
+    except Exception as e:
+        logger.warning(f"Failed to publish scan event: {e}")
+
+
+class ScanEventHub:
+    def __init__(self):
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._listener: asyncio.Task | None = None
+        self.stats = {"events": 0, "dropped": 0}
+
+    def _dispatch(self, channel: str, data: str) -> None:
+        queues = self._subscribers.get(channel[len(CHANNEL_PREFIX):])
+        if not queues:
+            return
+
+        try:
+            event = json.loads(data)
+        except ValueError:
+            return
+
+        self.stats["events"] += 1
+        for queue in queues:
+            if queue.full():
+                # Slow consumer: drop the oldest, keep the newest status
+                queue.get_nowait()
+                self.stats["dropped"] += 1
+            queue.put_nowait(event)
+
+    async def _listen(self) -> None:
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                redis = await get_redis()
+                if not redis:
+                    raise ConnectionError("Redis not available")
+
+                pubsub = redis.pubsub()
+                await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                backoff = 1
+
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=1.0,
+                    )
+                    if message and message["type"] == "pmessage":
+                        self._dispatch(message["channel"], message["data"])
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Scan event listener error: {e} - retrying in {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    @asynccontextmanager
+    async def subscribe(self, scan_id: str):
+        """
+        async with scan_event_hub.subscribe(scan_id) as queue:
+            event = await queue.get()
+        """
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[scan_id].add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(scan_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[scan_id]
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+# -------------------------------------------------------------------
+# Global hub
+# -------------------------------------------------------------------
+scan_event_hub = ScanEventHub()
+
+
+async def close_scan_events():
+    await scan_event_hub.stop()
@@ -0,0 +1,147 @@
+"""
+Schedule Parsing
+INTERVAL values ("3600", "30m", "6h", "1d", "2w") and standard 5-field
+CRON expressions → next fire time. All times are naive UTC.
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+
+_INTERVAL_RE = re.compile(r"^\s*(\d+)\s*([smhdw]?)\s*$", re.IGNORECASE)
+_INTERVAL_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+# Smallest interval we accept, to keep a typo from flooding the queue
+MIN_INTERVAL = timedelta(minutes=5)
+
+# How far ahead a cron search may look before giving up (e.g. "0 0 30 2 *")
+_CRON_SEARCH_LIMIT = timedelta(days=366 * 5)
+
+
+def parse_interval(value: str) -> timedelta:
+    match = _INTERVAL_RE.match(value or "")
+    if not match:
+        raise ValueError(f"Invalid interval: {value!r}")
+
+    amount, unit = match.groups()
+    interval = timedelta(seconds=int(amount) * _INTERVAL_UNITS[unit.lower()])
+    if interval < MIN_INTERVAL:
+        raise ValueError(f"Interval must be at least {MIN_INTERVAL}")
+    return interval
+
+
+# -------------------------------------------------------------------
+# Cron
+# -------------------------------------------------------------------
+def _parse_field(field: str, low: int, high: int) -> set[int]:
+    values: set[int] = set()
+
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+            if step <= 0:
+                raise ValueError(f"Invalid step in {field!r}")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_str, end_str = part.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"Value out of range in {field!r}")
+
+        values.update(range(start, end + 1, step))
+
+    return values
+
+
+class CronExpression:
+    """
+    minute hour day-of-month month day-of-week
+
+    Supports '*', lists, ranges and steps. Day-of-week 0 and 7 are Sunday.
+    As in cron, when both day fields are restricted either may match.
+    """
+
+    def __init__(self, expression: str):
+        fields = (expression or "").split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+
+        try:
+            self.minutes = _parse_field(fields[0], 0, 59)
+            self.hours = _parse_field(fields[1], 0, 23)
+            self.days = _parse_field(fields[2], 1, 31)
+            self.months = _parse_field(fields[3], 1, 12)
+            dow = _parse_field(fields[4], 0, 7)
+        except ValueError:
+            raise
+        except Exception:
+            raise ValueError(f"Invalid cron expression: {expression!r}")
+
+        # cron: 0/7 = Sunday; Python: Monday = 0 ... Sunday = 6
+        self.weekdays = {(d - 1) % 7 for d in dow}
+        self._dom_any = fields[2] == "*"
+        self._dow_any = fields[4] == "*"
+        self._sorted_minutes = sorted(self.minutes)
+
+    def _day_matches(self, t: datetime) -> bool:
+        dom = t.day in self.days
+        dow = t.weekday() in self.weekdays
+        if self._dom_any and self._dow_any:
+            return True
+        if self._dom_any:
+            return dow
+        if self._dow_any:
+            return dom
+        return dom or dow
+
+    def next_after(self, after: datetime) -> datetime:
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = after + _CRON_SEARCH_LIMIT
+
+        while t <= limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+
+            next_minute = next((m for m in self._sorted_minutes if m >= t.minute), None)
+            if next_minute is None:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+
+            return t.replace(minute=next_minute)
+
+        raise ValueError("Cron expression never fires")
+
+
+# -------------------------------------------------------------------
+# Public helpers
+# -------------------------------------------------------------------
+def compute_next_run(
+    schedule_type: str,
+    schedule_value: Optional[str],
+    after: datetime,
+) -> Optional[datetime]:
+    """
+    Next fire time strictly after ``after``; None for one-shot (QUICK)
+    """
+    if schedule_type == "INTERVAL":
+        return after + parse_interval(schedule_value)
+    if schedule_type == "CRON":
+        return CronExpression(schedule_value).next_after(after)
+    return None
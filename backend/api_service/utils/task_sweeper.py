@@ -0,0 +1,141 @@
+"""
+Task Overdue Sweeper
+Periodically flips open tasks past their due date to "overdue" with one
+set-based UPDATE ... RETURNING (driven by ix_tasks_open_due), then
+publishes one notification batch. Safe to run on every replica: a row
+already moved by another sweep no longer matches the WHERE clause.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import func, select, update
+
+from config.settings import settings
+from models.task_models import Task as TaskModel
+from utils.database import AsyncSessionLocal
+from utils.pagination import invalidate_count
+from utils.queue import publish_many
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATIONS_QUEUE = "notifications.tasks"
+
+OPEN_STATUSES = ("pending", "in_progress")
+
+
+class TaskSweeper:
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+
+        self._task: asyncio.Task | None = None
+        self.stats = {"sweeps": 0, "marked_overdue": 0, "notify_failed": 0}
+
+    async def sweep_once(self) -> int:
+        """
+        Mark up to batch_size tasks overdue; returns how many were moved
+        """
+        due = (
+            select(TaskModel.id)
+            .where(
+                TaskModel.status.in_(OPEN_STATUSES),
+                TaskModel.due_date.is_not(None),
+                TaskModel.due_date < func.now(),
+            )
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    update(TaskModel)
+                    .where(TaskModel.id.in_(due))
+                    .values(status="overdue", updated_at=func.now())
+                    .returning(
+                        TaskModel.id,
+                        TaskModel.user_id,
+                        TaskModel.title,
+                        TaskModel.assignee_id,
+                        TaskModel.due_date,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                rows = result.all()
+
+        self.stats["sweeps"] += 1
+        if not rows:
+            return 0
+
+        self.stats["marked_overdue"] += len(rows)
+        logger.info(f"Marked {len(rows)} tasks overdue")
+
+        flags = await publish_many(NOTIFICATIONS_QUEUE, [
+            {
+                "type": "task.overdue",
+                "task_id": row.id,
+                "user_id": row.user_id,
+                "title": row.title,
+                "assignee_id": row.assignee_id,
+                "due_date": row.due_date.isoformat() if row.due_date else None,
+            }
+            for row in rows
+        ])
+        failed = len(flags) - sum(flags)
+        if failed:
+            self.stats["notify_failed"] += failed
+            logger.warning(f"{failed} overdue notifications not confirmed")
+
+        # Status filter totals changed for these users
+        for user_id in {row.user_id for row in rows}:
+            await invalidate_count(f"tasks:{user_id}")
+
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                moved = await self.sweep_once()
+                # Backlog (e.g. after downtime) → keep going without waiting
+                if moved >= self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task sweep failed")
+
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Task sweeper started")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# -------------------------------------------------------------------
+# Global sweeper
+# -------------------------------------------------------------------
+task_sweeper = TaskSweeper(
+    interval=settings.TASK_SWEEP_INTERVAL,
+    batch_size=settings.TASK_SWEEP_BATCH_SIZE,
+)
+
+
+async def start_task_sweeper():
+    if settings.TASK_SWEEPER_ENABLED:
+        await task_sweeper.start()
+
+
+async def close_task_sweeper():
+    await task_sweeper.stop()
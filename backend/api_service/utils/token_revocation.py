@@ -0,0 +1,201 @@
+"""
+Token Revocation
+Revoked token ids (jti) live in Redis with TTL = remaining token lifetime.
+Every worker mirrors them into a local bloom filter kept in sync via
+Redis pub/sub, so the common "not revoked" check never leaves the process.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+
+from config.settings import settings
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+REVOKED_PREFIX = "auth:revoked:"
+REVOCATION_CHANNEL = "auth:revocations"
+
+
+# -------------------------------------------------------------------
+# Bloom filter
+# -------------------------------------------------------------------
+class BloomFilter:
+    """
+    Fixed-size bloom filter using double hashing over one blake2b digest
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(item)
+        )
+
+
+# -------------------------------------------------------------------
+# Revocation list
+# -------------------------------------------------------------------
+class TokenRevocationList:
+    def __init__(self, capacity: int, error_rate: float, rebuild_seconds: int):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_seconds = rebuild_seconds
+
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._listener: asyncio.Task | None = None
+        self._last_rebuild = 0.0
+        self.stats = {"checks": 0, "bloom_positives": 0, "revoked": 0}
+
+    # ---------------- sync from Redis ----------------
+    async def _rebuild(self, redis) -> None:
+        """
+        Replace the bloom filter with the current Redis state. Expired
+        revocations drop out here, which keeps the filter from saturating.
+        """
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        async for key in redis.scan_iter(match=REVOKED_PREFIX + "*", count=1000):
+            bloom.add(key[len(REVOKED_PREFIX):])
+
+        self._bloom = bloom
+        self._last_rebuild = time.monotonic()
+        logger.info(f"Revocation filter rebuilt with {bloom.count} entries")
+
+    async def _listen(self) -> None:
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                redis = await get_redis()
+                if not redis:
+                    raise ConnectionError("Redis not available")
+
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                # Subscribe first, then rebuild → nothing published in
+                # between can be missed
+                await self._rebuild(redis)
+                backoff = 1
+
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=1.0,
+                    )
+                    if message and message["type"] == "message":
+                        self._bloom.add(message["data"])
+
+                    if time.monotonic() - self._last_rebuild > self.rebuild_seconds:
+                        await self._rebuild(redis)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Revocation listener error: {e} - retrying in {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    # ---------------- public API ----------------
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """
+        Revoke a token id until the token would have expired anyway
+        """
+        self._bloom.add(jti)
+        self.stats["revoked"] += 1
+
+        ttl = int(expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        redis = await get_redis()
+        if not redis:
+            logger.warning("Redis not available, revocation is local to this worker")
+            return
+
+        try:
+            await redis.set(REVOKED_PREFIX + jti, "1", ex=ttl)
+            await redis.publish(REVOCATION_CHANNEL, jti)
+        except Exception as e:
+            logger.warning(f"Failed to publish revocation: {e}")
+
+    async def is_revoked(self, jti: str) -> bool:
+        self.stats["checks"] += 1
+        if jti not in self._bloom:
+            return False
+
+        # Possible hit → confirm against Redis (false positives are rare)
+        self.stats["bloom_positives"] += 1
+        redis = await get_redis()
+        if not redis:
+            # Fail closed: a bloom hit without confirmation counts as revoked
+            return True
+
+        try:
+            return bool(await redis.exists(REVOKED_PREFIX + jti))
+        except Exception as e:
+            logger.warning(f"Revocation lookup failed: {e}")
+            return True
+
+
+# -------------------------------------------------------------------
+# Global revocation list
+# -------------------------------------------------------------------
+revocation_list = TokenRevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+    rebuild_seconds=settings.REVOCATION_BLOOM_REBUILD_SECONDS,
+)
+
+
+async def start_token_revocation():
+    """
+    Start syncing the local revocation filter from Redis
+    """
+    await revocation_list.start()
+
+
+async def close_token_revocation():
+    """
+    Stop the revocation listener
+    """
+    await revocation_list.stop()
+    logger.info("Token revocation listener stopped")
@@ -0,0 +1,109 @@
+"""
+User / Profile Lookups
+The token only carries email + user_id; role, company and profile come
+from here (async, one indexed primary/unique key lookup each).
+
+``get_user_view`` / ``get_profile_view`` serve plain dicts from a
+read-through cache (local LRU → Redis → Postgres). Every write to a
+user or profile must call ``invalidate_user`` after committing.
+"""
+
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from config.settings import settings
+from models.auth_models import Profile, User
+from utils.cache import ReadThroughCache
+
+user_cache = ReadThroughCache(
+    "user",
+    maxsize=settings.USER_CACHE_SIZE,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    redis_ttl=settings.USER_CACHE_TTL,
+)
+profile_cache = ReadThroughCache(
+    "profile",
+    maxsize=settings.USER_CACHE_SIZE,
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    redis_ttl=settings.USER_CACHE_TTL,
+)
+
+
+# -------------------------------------------------------------------
+# ORM lookups (for writes)
+# -------------------------------------------------------------------
+async def get_user_by_id(
+    db: AsyncSession,
+    user_id: str,
+    with_profile: bool = False,
+) -> Optional[User]:
+    """
+    ``with_profile`` eager-loads User.profile; async sessions cannot
+    lazy-load it later (e.g. when deleting the user)
+    """
+    query = select(User).where(User.id == user_id)
+    if with_profile:
+        query = query.options(selectinload(User.profile))
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def get_profile_by_user_id(db: AsyncSession, user_id: str) -> Optional[Profile]:
+    result = await db.execute(select(Profile).where(Profile.user_id == user_id))
+    return result.scalar_one_or_none()
+
+
+# -------------------------------------------------------------------
+# Cached read model
+# -------------------------------------------------------------------
+def user_view(user: User) -> dict:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "name": user.name,
+        "role": user.role,
+        "company_id": user.company_id,
+        "is_active": user.is_active,
+    }
+
+
+def profile_view(profile: Profile) -> dict:
+    return {
+        "id": profile.id,
+        "user_id": profile.user_id,
+        "full_name": profile.full_name,
+        "email": profile.email,
+        "role": profile.role,
+        "country": profile.country,
+        "phone": profile.phone,
+        "avatar_url": profile.avatar_url,
+        "created_at": profile.created_at.isoformat() if profile.created_at else None,
+        "updated_at": profile.updated_at.isoformat() if profile.updated_at else None,
+    }
+
+
+async def get_user_view(db: AsyncSession, user_id: str) -> Optional[dict]:
+    async def load():
+        user = await get_user_by_id(db, user_id)
+        return user_view(user) if user else None
+
+    return await user_cache.get(user_id, load)
+
+
+async def get_profile_view(db: AsyncSession, user_id: str) -> Optional[dict]:
+    async def load():
+        profile = await get_profile_by_user_id(db, user_id)
+        return profile_view(profile) if profile else None
+
+    return await profile_cache.get(user_id, load)
+
+
+async def invalidate_user(user_id: str) -> None:
+    """
+    Drop cached user + profile (call after commit)
+    """
+    await user_cache.invalidate(user_id)
+    await profile_cache.invalidate(user_id)
@@ -0,0 +1,283 @@
+"""
+VS Remediation & Coverage Analytics
+
+The open findings of each target live in Postgres (vs_open_findings).
+Each completed scan is diffed against them in the results transaction,
+under a per-(user, target) advisory lock, so concurrent workers and pods
+always see the previous scan's state.
+
+The rest is ClickHouse, maintained at ingest time and read at constant
+cost:
+
+vs_remediations     one row per finding that disappeared from a rescan
+vs_mttr             AggregatingMergeTree of avg / quantiles(0.5, 0.9)
+                    states over time-to-remediate, per user + severity
+vs_scan_targets     one row per completed scan
+vs_coverage_daily   AggregatingMergeTree of uniq(target) states per day
+"""
+
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from models.vs_models import VsOpenFinding
+from utils.clickhouse_client import get_clickhouse
+from utils.clickhouse_writer import clickhouse_writer
+from utils.vs_findings import record_findings
+
+logger = logging.getLogger(__name__)
+
+REMEDIATION_TABLE = "vs_remediations"
+MTTR_TABLE = "vs_mttr"
+SCAN_TARGETS_TABLE = "vs_scan_targets"
+COVERAGE_TABLE = "vs_coverage_daily"
+
+SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {REMEDIATION_TABLE} (
+        user_id String,
+        target String,
+        cve String,
+        severity LowCardinality(String),
+        first_seen DateTime64(3, 'UTC'),
+        resolved_at DateTime64(3, 'UTC')
+    )
+    ENGINE = MergeTree
+    PARTITION BY toYYYYMM(resolved_at)
+    ORDER BY (user_id, resolved_at)
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {MTTR_TABLE} (
+        user_id String,
+        severity LowCardinality(String),
+        ttr_avg AggregateFunction(avg, Float64),
+        ttr_quantiles AggregateFunction(quantiles(0.5, 0.9), Float64)
+    )
+    ENGINE = AggregatingMergeTree
+    ORDER BY (user_id, severity)
+    """,
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {MTTR_TABLE}_mv
+    TO {MTTR_TABLE} AS
+    SELECT
+        user_id,
+        severity,
+        avgState(toFloat64(dateDiff('second', first_seen, resolved_at))) AS ttr_avg,
+        quantilesState(0.5, 0.9)(toFloat64(dateDiff('second', first_seen, resolved_at))) AS ttr_quantiles
+    FROM {REMEDIATION_TABLE}
+    GROUP BY user_id, severity
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {SCAN_TARGETS_TABLE} (
+        user_id String,
+        scan_id String,
+        target String,
+        completed_at DateTime64(3, 'UTC')
+    )
+    ENGINE = MergeTree
+    PARTITION BY toYYYYMM(completed_at)
+    ORDER BY (user_id, completed_at)
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {COVERAGE_TABLE} (
+        user_id String,
+        day Date,
+        targets AggregateFunction(uniq, String)
+    )
+    ENGINE = AggregatingMergeTree
+    ORDER BY (user_id, day)
+    """,
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {COVERAGE_TABLE}_mv
+    TO {COVERAGE_TABLE} AS
+    SELECT user_id, toDate(completed_at) AS day, uniqState(target) AS targets
+    FROM {SCAN_TARGETS_TABLE}
+    GROUP BY user_id, day
+    """,
+]
+
+clickhouse_writer.register_table(
+    REMEDIATION_TABLE,
+    ["user_id", "target", "cve", "severity", "first_seen", "resolved_at"],
+)
+clickhouse_writer.register_table(
+    SCAN_TARGETS_TABLE,
+    ["user_id", "scan_id", "target", "completed_at"],
+)
+
+
+async def ensure_vs_analytics_schema() -> bool:
+    client = await get_clickhouse()
+    if client is None:
+        logger.warning("ClickHouse not available, VS analytics schema not ensured")
+        return False
+
+    try:
+        for statement in SCHEMA:
+            await client.command(statement)
+    except Exception as e:
+        logger.error(f"Failed to create VS analytics schema: {e}")
+        return False
+    return True
+
+
+# -------------------------------------------------------------------
+# Ingest
+# -------------------------------------------------------------------
+async def lock_targets(session: AsyncSession, keys: Iterable[tuple[str, str]]) -> None:
+    """
+    Serialize diffs per (user_id, target) until the transaction ends.
+    Taken in sorted order, so batches sharing targets cannot deadlock.
+    """
+    for user_id, target in sorted(set(keys)):
+        await session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"vs:{user_id}:{target}"},
+        )
+
+
+async def diff_open_findings(
+    session: AsyncSession,
+    user_id: str,
+    target: str,
+    findings: list[dict],
+    completed_at: datetime,
+) -> list[dict]:
+    """
+    Apply a completed scan to the target's open findings, in the caller's
+    transaction (after ``lock_targets``).
+
+    Findings that were open before and are missing from this scan count
+    as remediated at ``completed_at``; their rows are returned for
+    ``record_scan_results``.
+    """
+    result = await session.execute(
+        select(VsOpenFinding.cve, VsOpenFinding.severity, VsOpenFinding.first_seen)
+        .where(VsOpenFinding.user_id == user_id, VsOpenFinding.target == target)
+    )
+    previous = {cve: (severity, first_seen) for cve, severity, first_seen in result}
+    current = {
+        f.get("cve", ""): (f.get("severity") or "").lower()
+        for f in findings
+    }
+
+    opened = [
+        {
+            "user_id": user_id, "target": target, "cve": cve,
+            "severity": severity, "first_seen": completed_at,
+        }
+        for cve, severity in current.items()
+        if cve not in previous
+    ]
+    closed = [cve for cve in previous if cve not in current]
+
+    if opened:
+        await session.execute(insert(VsOpenFinding), opened)
+    if closed:
+        await session.execute(
+            delete(VsOpenFinding).where(
+                VsOpenFinding.user_id == user_id,
+                VsOpenFinding.target == target,
+                VsOpenFinding.cve.in_(closed),
+            )
+        )
+
+    return [
+        {
+            "user_id": user_id, "target": target, "cve": cve,
+            "severity": previous[cve][0], "first_seen": previous[cve][1],
+            "resolved_at": completed_at,
+        }
+        for cve in closed
+    ]
+
+
+async def record_scan_results(
+    user_id: str,
+    scan_id: str,
+    target: str,
+    findings: list[dict],
+    remediations: list[dict],
+    completed_at: Optional[datetime] = None,
+) -> None:
+    """
+    Buffer a completed scan, its scan-target row and the remediations
+    from ``diff_open_findings`` for ClickHouse
+    """
+    completed_at = completed_at or datetime.utcnow()
+
+    await record_findings(user_id, scan_id, target, findings, found_at=completed_at)
+    await clickhouse_writer.write(SCAN_TARGETS_TABLE, {
+        "user_id": user_id,
+        "scan_id": scan_id,
+        "target": target,
+        "completed_at": completed_at,
+    })
+    if remediations:
+        await clickhouse_writer.write_many(REMEDIATION_TABLE, remediations)
+
+
+# -------------------------------------------------------------------
+# Reads
+# -------------------------------------------------------------------
+async def get_mttr(user_id: str) -> Optional[dict]:
+    """
+    Mean / p50 / p90 time-to-remediate in days (None if ClickHouse is down)
+    """
+    client = await get_clickhouse()
+    if client is None:
+        return None
+
+    result = await client.query(
+        f"""
+        SELECT
+            avgMerge(ttr_avg),
+            quantilesMerge(0.5, 0.9)(ttr_quantiles)
+        FROM {MTTR_TABLE}
+        WHERE user_id = {{user_id:String}}
+        """,
+        parameters={"user_id": user_id},
+    )
+
+    avg_seconds, quantiles = result.result_rows[0] if result.result_rows else (None, None)
+    # avgMerge over no rows is NaN
+    if avg_seconds is None or avg_seconds != avg_seconds:
+        return {"avg_days": 0.0, "p50_days": 0.0, "p90_days": 0.0}
+
+    p50, p90 = (quantiles or [0.0, 0.0])[:2]
+    return {
+        "avg_days": round(avg_seconds / 86400, 1),
+        "p50_days": round(p50 / 86400, 1),
+        "p90_days": round(p90 / 86400, 1),
+    }
+
+
+async def get_scanned_target_count(user_id: str) -> Optional[int]:
+    """
+    Distinct targets scanned within VS_COVERAGE_WINDOW_DAYS
+    """
+    client = await get_clickhouse()
+    if client is None:
+        return None
+
+    result = await client.query(
+        f"""
+        SELECT uniqMerge(targets)
+        FROM {COVERAGE_TABLE}
+        WHERE user_id = {{user_id:String}}
+          AND day >= today() - {{days:UInt32}}
+        """,
+        parameters={"user_id": user_id, "days": settings.VS_COVERAGE_WINDOW_DAYS},
+    )
+    return int(result.result_rows[0][0]) if result.result_rows else 0
+
+
+def coverage_percent(scanned_targets: int, asset_count: int) -> int:
+    if asset_count <= 0:
+        return 0
+    # Targets outside the inventory can push the ratio past 100
+    return min(100, round(scanned_targets * 100 / asset_count))
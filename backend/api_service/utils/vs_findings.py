@@ -0,0 +1,217 @@
+"""
+Vulnerability Findings Store (ClickHouse)
+
+vs_findings         MergeTree, one row per finding
+vs_severity_counts  SummingMergeTree fed by a materialized view, so the
+                    dashboard reads a handful of pre-aggregated rows per
+                    tenant instead of scanning findings.
+
+Partitioning is (tenant bucket, month), not (tenant, month): one
+partition per tenant per month would give thousands of tiny partitions
+and too many parts. Sixteen hash buckets keep the partition count
+bounded; ORDER BY (user_id, scan_id, ...) does the per-tenant pruning.
+"""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from utils.clickhouse_client import get_clickhouse
+from utils.clickhouse_writer import clickhouse_writer
+
+logger = logging.getLogger(__name__)
+
+FINDINGS_TABLE = "vs_findings"
+SEVERITY_TABLE = "vs_severity_counts"
+
+FINDING_COLUMNS = [
+    "user_id",
+    "scan_id",
+    "target",
+    "cve",
+    "severity",
+    "exploitability_score",
+    "description",
+    "remediation",
+    "found_at",
+]
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {FINDINGS_TABLE} (
+        user_id String,
+        scan_id String,
+        target String,
+        cve String,
+        severity LowCardinality(String),
+        exploitability_score Float32,
+        description String,
+        remediation String,
+        found_at DateTime64(3, 'UTC')
+    )
+    ENGINE = MergeTree
+    PARTITION BY (cityHash64(user_id) % 16, toYYYYMM(found_at))
+    ORDER BY (user_id, scan_id, severity, cve)
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {SEVERITY_TABLE} (
+        user_id String,
+        severity LowCardinality(String),
+        findings Int64
+    )
+    ENGINE = SummingMergeTree(findings)
+    ORDER BY (user_id, severity)
+    """,
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {SEVERITY_TABLE}_mv
+    TO {SEVERITY_TABLE} AS
+    SELECT user_id, severity, toInt64(count()) AS findings
+    FROM {FINDINGS_TABLE}
+    GROUP BY user_id, severity
+    """,
+]
+
+clickhouse_writer.register_table(FINDINGS_TABLE, FINDING_COLUMNS)
+
+
+async def ensure_vs_schema() -> bool:
+    """
+    Create findings tables / view if missing (startup)
+    """
+    client = await get_clickhouse()
+    if client is None:
+        logger.warning("ClickHouse not available, VS schema not ensured")
+        return False
+
+    try:
+        for statement in SCHEMA:
+            await client.command(statement)
+    except Exception as e:
+        logger.error(f"Failed to create VS schema: {e}")
+        return False
+    return True
+
+
+# -------------------------------------------------------------------
+# Writes
+# -------------------------------------------------------------------
+async def record_findings(
+    user_id: str,
+    scan_id: str,
+    target: str,
+    findings: list[dict],
+    found_at: Optional[datetime] = None,
+) -> None:
+    """
+    Buffer a scan's findings for the batched writer
+    """
+    found_at = found_at or datetime.utcnow()
+    await clickhouse_writer.write_many(FINDINGS_TABLE, [
+        {
+            "user_id": user_id,
+            "scan_id": scan_id,
+            "target": target,
+            "cve": f.get("cve", ""),
+            "severity": (f.get("severity") or "").lower(),
+            "exploitability_score": float(f.get("exploitability_score") or 0.0),
+            "description": f.get("description", ""),
+            "remediation": f.get("remediation", ""),
+            "found_at": found_at,
+        }
+        for f in findings
+    ])
+
+
+async def delete_scan_findings(user_id: str, scan_id: str) -> bool:
+    """
+    Drop a scan's findings and take them back out of the rollup.
+    Lightweight deletes do not fire materialized views, so negative
+    counts are inserted first; SummingMergeTree drops rows summing to 0.
+    """
+    client = await get_clickhouse()
+    if client is None:
+        return False
+
+    params = {"user_id": user_id, "scan_id": scan_id}
+    result = await client.query(
+        f"""
+        SELECT severity, count()
+        FROM {FINDINGS_TABLE}
+        WHERE user_id = {{user_id:String}} AND scan_id = {{scan_id:String}}
+        GROUP BY severity
+        """,
+        parameters=params,
+    )
+    rows = result.result_rows
+    if not rows:
+        return True
+
+    await client.insert(
+        SEVERITY_TABLE,
+        [[user_id, severity, -int(count)] for severity, count in rows],
+        column_names=["user_id", "severity", "findings"],
+    )
+    await client.command(
+        f"DELETE FROM {FINDINGS_TABLE} "
+        f"WHERE user_id = {{user_id:String}} AND scan_id = {{scan_id:String}}",
+        parameters=params,
+    )
+    return True
+
+
+# -------------------------------------------------------------------
+# Reads
+# -------------------------------------------------------------------
+async def get_scan_findings(user_id: str, scan_id: str) -> Optional[list[dict]]:
+    """
+    Findings of one scan, most severe first; None if ClickHouse is down
+    """
+    client = await get_clickhouse()
+    if client is None:
+        return None
+
+    result = await client.query(
+        f"""
+        SELECT cve, severity, exploitability_score, description, remediation
+        FROM {FINDINGS_TABLE}
+        WHERE user_id = {{user_id:String}} AND scan_id = {{scan_id:String}}
+        ORDER BY exploitability_score DESC, cve
+        """,
+        parameters={"user_id": user_id, "scan_id": scan_id},
+    )
+    return [
+        {
+            "cve": cve,
+            "severity": severity,
+            "exploitability_score": float(score),
+            "description": description,
+            "remediation": remediation,
+        }
+        for cve, severity, score, description, remediation in result.result_rows
+    ]
+
+
+async def get_severity_counts(user_id: str) -> Optional[dict[str, int]]:
+    """
+    Per-severity totals from the rollup; sum() covers unmerged parts
+    """
+    client = await get_clickhouse()
+    if client is None:
+        return None
+
+    result = await client.query(
+        f"""
+        SELECT severity, sum(findings)
+        FROM {SEVERITY_TABLE}
+        WHERE user_id = {{user_id:String}}
+        GROUP BY severity
+        """,
+        parameters={"user_id": user_id},
+    )
+    counts = {severity: 0 for severity in SEVERITIES}
+    for severity, total in result.result_rows:
+        if severity in counts:
+            counts[severity] = max(0, int(total))
+    return counts
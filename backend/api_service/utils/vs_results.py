@@ -0,0 +1,140 @@
+"""
+VS Results Consumer
+Workers report on ``results.vs``:
+
+    {"type": "status", "scan_id": ..., "status": "running", "progress": 40}
+    {"type": "result", "scan_id": ..., "findings": [...]}
+    {"type": "error",  "scan_id": ..., "error": "..."}
+
+Each batch is applied in one transaction. Findings go to ClickHouse
+only after it commits: a redelivered result then finds its scan already
+completed and is skipped, so findings are never written twice. Every
+change is pushed to SSE clients through the scan event hub.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import select
+
+from models.vs_models import VsScan
+from utils.consumer import BatchConsumer
+from utils.database import AsyncSessionLocal
+from utils.scan_events import publish_scan_event
+from utils.vs_analytics import diff_open_findings, lock_targets, record_scan_results
+from utils.vs_findings import delete_scan_findings
+
+logger = logging.getLogger(__name__)
+
+VS_JOBS_QUEUE = "jobs.vs"
+VS_RESULTS_QUEUE = "results.vs"
+
+SCAN_STATUSES = ("queued", "running", "completed", "failed")
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def scan_event(scan: VsScan) -> dict:
+    return {
+        "scan_id": scan.id,
+        "status": scan.status,
+        "progress": scan.progress,
+        "error": scan.error,
+    }
+
+
+async def _handle_batch(payloads: list[dict]) -> None:
+    scan_ids = {p.get("scan_id") for p in payloads if p.get("scan_id")}
+    if not scan_ids:
+        return
+
+    events: list[dict] = []
+    # (user_id, scan_id, target, findings, remediations, completed_at, retest)
+    results: list[tuple] = []
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(VsScan).where(VsScan.id.in_(scan_ids)))
+        scans = {scan.id: scan for scan in result.scalars().all()}
+
+        # Open-findings diffs of a target must not interleave
+        targets = []
+        for payload in payloads:
+            scan = scans.get(payload.get("scan_id"))
+            if payload.get("type") == "result" and scan is not None:
+                targets.append((scan.user_id, scan.target))
+        await lock_targets(session, targets)
+
+        for payload in payloads:
+            scan = scans.get(payload.get("scan_id"))
+            if scan is None:
+                logger.warning(f"Result for unknown scan {payload.get('scan_id')}, ignored")
+                continue
+
+            # Redelivered after the scan finished → nothing to do
+            if scan.status in TERMINAL_STATUSES:
+                continue
+
+            kind = payload.get("type")
+            now = datetime.utcnow()
+
+            if kind == "status":
+                status = payload.get("status") or scan.status
+                if status not in SCAN_STATUSES:
+                    # would fail the enum cast and the commit for the whole batch
+                    logger.warning(f"Invalid status {status!r} for scan {scan.id}, ignored")
+                    continue
+                scan.status = status
+                scan.progress = max(scan.progress or 0, int(payload.get("progress") or 0))
+                if scan.status == "running" and scan.started_at is None:
+                    scan.started_at = now
+
+            elif kind == "result":
+                findings = payload.get("findings") or []
+                remediations = await diff_open_findings(
+                    session, scan.user_id, scan.target, findings, now
+                )
+                # Retest: the latest run replaces the previous findings
+                results.append((
+                    scan.user_id, scan.id, scan.target, findings, remediations, now,
+                    scan.completed_at is not None,
+                ))
+                scan.status = "completed"
+                scan.progress = 100
+                scan.completed_at = now
+
+            elif kind == "error":
+                scan.status = "failed"
+                scan.error = str(payload.get("error") or "scan failed")[:1000]
+                scan.completed_at = now
+
+            else:
+                logger.warning(f"Unknown VS result type {kind!r}, ignored")
+                continue
+
+            events.append(scan_event(scan))
+
+        await session.commit()
+
+    for user_id, scan_id, target, findings, remediations, completed_at, retest in results:
+        if retest:
+            await delete_scan_findings(user_id, scan_id)
+        await record_scan_results(
+            user_id, scan_id, target, findings, remediations, completed_at=completed_at
+        )
+
+    # After commit, so clients never see a state that could roll back
+    for event in events:
+        await publish_scan_event(event["scan_id"], event)
+
+
+# -------------------------------------------------------------------
+# Global consumer
+# -------------------------------------------------------------------
+vs_results_consumer = BatchConsumer(VS_RESULTS_QUEUE, _handle_batch)
+
+
+async def start_vs_results_consumer():
+    await vs_results_consumer.start()
+
+
+async def close_vs_results_consumer():
+    await vs_results_consumer.stop()